@@ -1,8 +1,11 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header, Query, Response
 from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from pymongo import CursorType, ReturnDocument, ReplaceOne, UpdateOne
+from pymongo.errors import CollectionInvalid
 import os
 import logging
 import asyncio
@@ -12,17 +15,33 @@ from typing import List, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
 import base64
+import binascii
+import hashlib
+import json
+import mimetypes
+import zipfile
+import random
 import resend
 import bcrypt
 import jwt
 from io import BytesIO
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import secrets
 import string
+from PIL import Image, ImageOps
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch, cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+from reportlab.platypus import Paragraph
+from reportlab.pdfgen import canvas
+from reportlab.graphics.barcode import qrencoder
+from reportlab.lib.utils import ImageReader, simpleSplit
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.enums import TA_CENTER
@@ -41,11 +60,58 @@ resend.api_key = os.environ.get('RESEND_API_KEY')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
 ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'info@haggai.se')
 
+# Email outbox configuration
+EMAIL_TRANSPORT = os.environ.get('EMAIL_TRANSPORT', 'resend')  # "resend" or "fake"
+EMAIL_OUTBOX_WORKERS = int(os.environ.get('EMAIL_OUTBOX_WORKERS', '4'))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', '6'))
+EMAIL_RETRY_BASE_SECONDS = float(os.environ.get('EMAIL_RETRY_BASE_SECONDS', '30'))
+EMAIL_RETRY_MAX_SECONDS = float(os.environ.get('EMAIL_RETRY_MAX_SECONDS', '3600'))
+EMAIL_RATE_LIMIT_PER_SECOND = float(os.environ.get('EMAIL_RATE_LIMIT_PER_SECOND', '2'))  # Resend default; 0 disables
+EMAIL_BULK_CONCURRENCY = int(os.environ.get('EMAIL_BULK_CONCURRENCY', '4'))
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', '100'))  # Resend batch endpoint maximum
+
 # JWT configuration
 JWT_SECRET = os.environ.get('JWT_SECRET', 'haggai-sweden-board-secret-key-2026')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24 * 7  # 1 week
 
+# Password hashing configuration
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '64'))
+
+# PDF rendering configuration (diplomas and name badges)
+PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', '2'))
+PDF_RENDER_MAX_PENDING = int(os.environ.get('PDF_RENDER_MAX_PENDING', '16'))
+PDF_RENDER_TIMEOUT_SECONDS = float(os.environ.get('PDF_RENDER_TIMEOUT_SECONDS', '30'))
+PDF_CACHE_DIR = Path(os.environ.get('PDF_CACHE_DIR', str(ROOT_DIR / 'pdf_cache')))
+PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+QR_MATRIX_CACHE_SIZE = int(os.environ.get('QR_MATRIX_CACHE_SIZE', '4096'))
+
+# Check-in configuration (badge QR scanning at the door)
+CHECKIN_FLUSH_INTERVAL_SECONDS = float(os.environ.get('CHECKIN_FLUSH_INTERVAL_SECONDS', '1'))
+CHECKIN_FLUSH_BATCH_SIZE = int(os.environ.get('CHECKIN_FLUSH_BATCH_SIZE', '200'))
+CHECKIN_DUPLICATE_WINDOW_SECONDS = float(os.environ.get('CHECKIN_DUPLICATE_WINDOW_SECONDS', '300'))
+CHECKIN_ROSTER_TTL_SECONDS = float(os.environ.get('CHECKIN_ROSTER_TTL_SECONDS', '300'))
+CHECKIN_ROSTER_REFRESH_SECONDS = float(os.environ.get('CHECKIN_ROSTER_REFRESH_SECONDS', '15'))  # unknown badges reload at most this often
+
+# Realtime events (push channel for messages and forum activity)
+REALTIME_BACKEND = os.environ.get('REALTIME_BACKEND', 'memory')  # "memory" or "mongo" (shared between workers)
+REALTIME_QUEUE_SIZE = int(os.environ.get('REALTIME_QUEUE_SIZE', '100'))  # per connection; slower clients are disconnected
+REALTIME_KEEPALIVE_SECONDS = float(os.environ.get('REALTIME_KEEPALIVE_SECONDS', '15'))
+REALTIME_EVENTS_MAX_BYTES = int(os.environ.get('REALTIME_EVENTS_MAX_BYTES', str(16 * 1024 * 1024)))
+
+# Leader document storage (GridFS)
+LEADER_DOCUMENT_MAX_BYTES = int(os.environ.get('LEADER_DOCUMENT_MAX_BYTES', str(25 * 1024 * 1024)))
+DOCUMENT_CHUNK_BYTES = int(os.environ.get('DOCUMENT_CHUNK_BYTES', str(255 * 1024)))  # GridFS chunk and upload read size
+
+# Image service (profile images)
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', str(10 * 1024 * 1024)))
+IMAGE_WEBP_QUALITY = int(os.environ.get('IMAGE_WEBP_QUALITY', '82'))
+IMAGE_SIZES = {"sm": 96, "md": 320, "lg": 800}  # longest edge in pixels
+IMAGE_DEFAULT_SIZE = "md"  # size stored in profile fields; swap the last URL segment for another
+
 # Create the main app without a prefix
 app = FastAPI()
 
@@ -397,7 +463,7 @@ class LeaderRegistration(BaseModel):
     bank_swift: Optional[str] = None
     
     # Documents
-    documents: List[dict] = []  # [{filename, url, type, uploaded_at}]
+    documents: List[dict] = []  # [{id, filename, type, content_type, size, uploaded_at}], content in GridFS
     # Types: "topic_material", "receipt", "travel_ticket", "other"
     
     # Authentication
@@ -482,6 +548,644 @@ class LeaderLogin(BaseModel):
     password: str
 
 
+# ==================== PAGINATION ====================
+
+# List endpoints return one page as a plain JSON array. When more rows exist
+# the opaque cursor for the next page is returned in the X-Next-Cursor header
+# and passed back as ?cursor=... to continue.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(doc: dict, sort_field: str) -> str:
+    """Encode the sort key and id of the last row of a page"""
+    raw = json.dumps([doc.get(sort_field), doc["id"]], default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor produced by encode_cursor into (sort_value, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, last_id
+
+
+def keyset_filter(sort_field: str, direction: int, value, last_id: str) -> dict:
+    """Filter matching the rows that sort strictly after (value, last_id)"""
+    op = "$gt" if direction == 1 else "$lt"
+    if value is None:
+        # Missing/null sort keys sort first ascending and last descending
+        after = {sort_field: None, "id": {op: last_id}}
+        if direction == 1:
+            after = {"$or": [after, {sort_field: {"$ne": None}}]}
+        return after
+    
+    clauses = [
+        {sort_field: {op: value}},
+        {sort_field: value, "id": {op: last_id}},
+    ]
+    if direction == -1:
+        clauses.append({sort_field: None})
+    return {"$or": clauses}
+
+
+async def paginate(
+    collection,
+    query: dict,
+    projection: dict,
+    sort_field: str,
+    direction: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    response: Optional[Response] = None,
+) -> list:
+    """Fetch one page ordered by (sort_field, id) and set the next cursor header"""
+    if cursor:
+        after = keyset_filter(sort_field, direction, *decode_cursor(cursor))
+        query = {"$and": [query, after]} if query else after
+    
+    docs = await collection.find(query, projection).sort(
+        [(sort_field, direction), ("id", direction)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    if len(docs) > limit:
+        docs = docs[:limit]
+        if response is not None:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(docs[-1], sort_field)
+    return docs
+
+
+# ==================== BATCHED LOOKUPS ====================
+
+class DocumentLoader:
+    """Looks documents up by a key field with one $in query per batch.
+    
+    Create one per request: documents are memoised, so ids repeated across
+    a loop are only fetched once.
+    """
+    
+    def __init__(self, collection, projection: Optional[dict] = None, key: str = "id"):
+        self.collection = collection
+        self.key = key
+        self.projection = {"_id": 0, **(projection or {})}
+        if any(v for field, v in self.projection.items() if field != "_id"):
+            # Inclusion projection: the key is needed to match documents to ids
+            self.projection[key] = 1
+        self._docs = {}
+    
+    async def load_many(self, values) -> dict:
+        """Map each value to its document, or None when there is none"""
+        values = [value for value in dict.fromkeys(values) if value is not None]
+        missing = [value for value in values if value not in self._docs]
+        if missing:
+            docs = await self.collection.find({self.key: {"$in": missing}}, self.projection).to_list(None)
+            self._docs.update(dict.fromkeys(missing))
+            self._docs.update((doc[self.key], doc) for doc in docs)
+        return {value: self._docs[value] for value in values}
+    
+    async def load(self, value) -> Optional[dict]:
+        return (await self.load_many([value])).get(value)
+
+
+# ==================== IMAGE SERVICE ====================
+# Profile images arrive as data: URLs or uploads. Each is decoded once, on
+# a worker thread, into WebP thumbnails at IMAGE_SIZES. The thumbnails are
+# stored under the sha256 of the original bytes, and the profile field keeps
+# a short URL instead of the image. Stored images never change, so they are
+# served with immutable cache headers.
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="images")
+
+
+def image_url(image_id: str, size: str = IMAGE_DEFAULT_SIZE) -> str:
+    return f"/api/images/{image_id}/{size}"
+
+
+def render_image_variants(data: bytes) -> dict:
+    """Decode an image and encode one WebP thumbnail per size, largest first"""
+    largest = max(IMAGE_SIZES.values())
+    with Image.open(BytesIO(data)) as source:
+        # JPEG only: let the decoder scale down while decoding
+        source.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    
+    variants = {}
+    for name, size in sorted(IMAGE_SIZES.items(), key=lambda item: -item[1]):
+        image.thumbnail((size, size), Image.LANCZOS)  # in place; never enlarges
+        buffer = BytesIO()
+        image.save(buffer, "WEBP", quality=IMAGE_WEBP_QUALITY, method=4)
+        variants[name] = buffer.getvalue()
+    return variants
+
+
+async def store_image(data: bytes) -> str:
+    """Store the thumbnails of an image and return the URL of the default size"""
+    if len(data) > IMAGE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Bilden är för stor (max {IMAGE_MAX_BYTES // (1024 * 1024)} MB)")
+    
+    image_id = hashlib.sha256(data).hexdigest()
+    if not await db.images.find_one({"id": image_id}, {"_id": 1}):
+        try:
+            variants = await asyncio.get_running_loop().run_in_executor(image_executor, render_image_variants, data)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logging.warning(f"Rejected image {image_id}: {e}")
+            raise HTTPException(status_code=400, detail="Ogiltig bild")
+        await db.images.update_one(
+            {"id": image_id},
+            {"$setOnInsert": {
+                "id": image_id,
+                "variants": variants,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }},
+            upsert=True
+        )
+    return image_url(image_id)
+
+
+async def store_image_data_url(value: Optional[str]) -> Optional[str]:
+    """Replace a data: URL with the URL of its stored thumbnails. Other values are returned as they are."""
+    if not value or not value.startswith("data:"):
+        return value
+    header, _, encoded = value.partition(",")
+    if not header.endswith(";base64"):
+        raise HTTPException(status_code=400, detail="Ogiltig bild: data-URL måste vara base64-kodad")
+    try:
+        data = base64.b64decode(encoded)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Ogiltig bild: felaktig base64")
+    return await store_image(data)
+
+
+@api_router.get("/images/{image_id}/{size}")
+async def get_image(image_id: str, size: str, if_none_match: Optional[str] = Header(None)):
+    """Serve one thumbnail size of a stored image"""
+    if size not in IMAGE_SIZES:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    key = f"{image_id}-{size}"
+    headers = {"ETag": f'"{key}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(if_none_match, key):
+        return Response(status_code=304, headers=headers)
+    
+    image = await db.images.find_one({"id": image_id}, {"_id": 0, f"variants.{size}": 1})
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return Response(content=image["variants"][size], media_type="image/webp", headers=headers)
+
+
+# Fields that may still hold data: URLs written before the image service
+DATA_URL_IMAGE_FIELDS = [
+    ("leaders", "image_url"),
+    ("leader_registrations", "image_url"),
+    ("nominations", "registration_data.profile_image"),
+    ("participants", "profile_image"),
+    ("members", "profile_image"),
+    # Copied from the member profile when posting
+    ("forum_posts", "author_image"),
+    ("forum_replies", "author_image"),
+]
+
+
+async def migrate_data_url_images() -> int:
+    """Replace data: URL images in DATA_URL_IMAGE_FIELDS with stored thumbnails. Returns the number of fields replaced."""
+    replaced = 0
+    for collection, field in DATA_URL_IMAGE_FIELDS:
+        async for doc in db[collection].find({field: {"$regex": "^data:"}}, {"_id": 1, field: 1}):
+            value = doc
+            for part in field.split("."):
+                value = value[part]
+            try:
+                url = await store_image_data_url(value)
+            except HTTPException as e:
+                logging.error(f"Skipping image in {collection}.{field} of {doc['_id']}: {e.detail}")
+                continue
+            # Only if the field was not changed meanwhile
+            await db[collection].update_one({"_id": doc["_id"], field: value}, {"$set": {field: url}})
+            replaced += 1
+    logging.info(f"Replaced {replaced} data URL images with stored thumbnails")
+    return replaced
+
+
+# ==================== EMAIL OUTBOX ====================
+
+# Emails are written to the email_outbox collection and delivered by a small
+# pool of background workers, so request handlers never wait on Resend.
+# Status flow: pending -> sending -> sent, or back to pending with a delay
+# after a failure, and finally dead once EMAIL_MAX_ATTEMPTS is reached.
+EMAIL_SEND_TIMEOUT_SECONDS = 30
+EMAIL_POLL_SECONDS = 5
+
+
+class RateLimiter:
+    """Spaces out calls so at most `rate` start per second (0 disables the limit)"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# Shared by the outbox workers and broadcasts so together they stay under
+# the provider's request limit.
+provider_rate_limiter = RateLimiter(EMAIL_RATE_LIMIT_PER_SECOND)
+
+
+class ResendTransport:
+    """Delivers messages through the Resend API"""
+    
+    supports_batch = hasattr(resend, "Batch")
+    
+    async def send(self, params: dict) -> dict:
+        if not resend.api_key:
+            raise RuntimeError("Resend API key not configured")
+        await provider_rate_limiter.acquire()
+        return await asyncio.to_thread(resend.Emails.send, params)
+    
+    async def send_batch(self, messages: List[dict]) -> list:
+        """Send up to EMAIL_BATCH_SIZE messages in one request (no attachments)"""
+        if not resend.api_key:
+            raise RuntimeError("Resend API key not configured")
+        await provider_rate_limiter.acquire()
+        result = await asyncio.to_thread(resend.Batch.send, messages)
+        return result.get("data", []) if isinstance(result, dict) else result
+
+
+class FakeEmailTransport:
+    """Records messages instead of sending them. Used for tests and local development."""
+    
+    supports_batch = True
+    
+    def __init__(self, fail_times: int = 0):
+        self.sent = []
+        self.fail_times = fail_times
+    
+    async def send(self, params: dict) -> dict:
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("Simulated delivery failure")
+        self.sent.append(params)
+        return {"id": f"fake-{uuid.uuid4()}"}
+    
+    async def send_batch(self, messages: List[dict]) -> list:
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("Simulated delivery failure")
+        self.sent.extend(messages)
+        return [{"id": f"fake-{uuid.uuid4()}"} for _ in messages]
+
+
+def create_email_transport():
+    if EMAIL_TRANSPORT == "fake":
+        return FakeEmailTransport()
+    return ResendTransport()
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter for the given number of failed attempts"""
+    delay = min(EMAIL_RETRY_BASE_SECONDS * (2 ** (attempts - 1)), EMAIL_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class EmailOutbox:
+    """Mongo-backed outbox with an in-process delivery worker pool"""
+    
+    def __init__(self, collection, transport, workers: int = EMAIL_OUTBOX_WORKERS,
+                 max_attempts: int = EMAIL_MAX_ATTEMPTS):
+        self.collection = collection
+        self.transport = transport
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+    
+    async def enqueue(self, params: dict, tag: Optional[str] = None) -> str:
+        """Store a message for delivery and return its outbox id"""
+        now = datetime.now(timezone.utc).isoformat()
+        message = {
+            "id": str(uuid.uuid4()),
+            "params": params,
+            "to": params.get("to", []),
+            "subject": params.get("subject"),
+            "tag": tag,
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "next_attempt_at": now,
+            "locked_until": None,
+            "last_error": None,
+            "provider_id": None,
+            "created_at": now,
+            "updated_at": now,
+            "sent_at": None,
+        }
+        await self.collection.insert_one(message)
+        self.wake()
+        return message["id"]
+    
+    def wake(self):
+        """Let idle workers look for due messages right away"""
+        self._wakeup.set()
+    
+    async def claim(self) -> Optional[dict]:
+        """Lease the next due message. Expired leases from crashed workers are picked up again."""
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now_iso}},
+                {"status": "sending", "locked_until": {"$lte": now_iso}},
+            ]},
+            {
+                "$set": {
+                    "status": "sending",
+                    "locked_until": (now + timedelta(seconds=EMAIL_SEND_TIMEOUT_SECONDS * 2)).isoformat(),
+                    "updated_at": now_iso,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+    
+    async def deliver(self, message: dict):
+        """Send one claimed message and record the outcome"""
+        try:
+            result = await asyncio.wait_for(
+                self.transport.send(message["params"]), EMAIL_SEND_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            await self._record_failure(message, e)
+            return
+        
+        now = datetime.now(timezone.utc).isoformat()
+        await self.collection.update_one(
+            {"id": message["id"]},
+            {
+                "$set": {
+                    "status": "sent",
+                    "sent_at": now,
+                    "updated_at": now,
+                    "locked_until": None,
+                    "provider_id": (result or {}).get("id"),
+                },
+                # Bodies can hold reset links and passwords; only keep them until delivered
+                "$unset": {"params.html": "", "params.text": "", "params.attachments": ""},
+            }
+        )
+        logging.info(f"Email {message['id']} ({message.get('tag')}) sent to {message.get('to')}")
+    
+    async def _record_failure(self, message: dict, error: Exception):
+        now = datetime.now(timezone.utc)
+        attempts = message.get("attempts", 1)
+        update = {
+            "last_error": str(error) or error.__class__.__name__,
+            "updated_at": now.isoformat(),
+            "locked_until": None,
+        }
+        if attempts >= message.get("max_attempts", self.max_attempts):
+            update["status"] = "dead"
+            logging.error(f"Email {message['id']} to {message.get('to')} dead after {attempts} attempts: {error}")
+        else:
+            update["status"] = "pending"
+            update["next_attempt_at"] = (now + timedelta(seconds=retry_delay_seconds(attempts))).isoformat()
+            logging.warning(f"Email {message['id']} to {message.get('to')} failed (attempt {attempts}): {error}")
+        await self.collection.update_one({"id": message["id"]}, {"$set": update})
+    
+    async def process_due(self) -> int:
+        """Deliver every message that is currently due. Returns the number processed."""
+        processed = 0
+        while True:
+            message = await self.claim()
+            if message is None:
+                return processed
+            await self.deliver(message)
+            processed += 1
+    
+    async def _worker(self):
+        while True:
+            try:
+                self._wakeup.clear()
+                if await self.process_due():
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), EMAIL_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Email outbox worker error: {e}")
+                await asyncio.sleep(EMAIL_POLL_SECONDS)
+    
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+email_transport = create_email_transport()
+email_outbox = EmailOutbox(db.email_outbox, email_transport)
+
+
+async def enqueue_email(params: dict, tag: Optional[str] = None) -> str:
+    """Queue an email for background delivery"""
+    return await email_outbox.enqueue(params, tag)
+
+
+# ==================== EMAIL BROADCASTS ====================
+
+# A broadcast sends the same kind of email to many recipients. Its messages
+# are stored as chunks (one provider request each) in email_broadcast_chunks
+# and delivered in the background with bounded concurrency, using the
+# provider's batch endpoint when possible. Chunks are leased like outbox
+# messages, so a broadcast cut off by a restart is resumed from the chunks
+# not yet done; a chunk in flight during a crash may be sent twice. Progress
+# is recorded in email_broadcasts so the admin UI can poll it. Recipients
+# whose chunk fails are handed to the outbox, which retries them with backoff.
+_broadcast_tasks = set()
+
+
+def broadcast_chunks(messages: List[dict], transport) -> List[List[dict]]:
+    """Split messages into provider requests: batches when supported, otherwise one per message"""
+    if getattr(transport, "supports_batch", False) and not any(m.get("attachments") for m in messages):
+        return [messages[i:i + EMAIL_BATCH_SIZE] for i in range(0, len(messages), EMAIL_BATCH_SIZE)]
+    return [[m] for m in messages]
+
+
+async def start_broadcast(kind: str, messages: List[dict], reference: Optional[dict] = None) -> dict:
+    """Record a broadcast and start delivering it in the background"""
+    # One email per address, even if someone appears twice in the source lists
+    unique = {}
+    for message in messages:
+        unique.setdefault(message["to"][0].strip().lower(), message)
+    messages = list(unique.values())
+    
+    now = datetime.now(timezone.utc).isoformat()
+    broadcast = {
+        "id": str(uuid.uuid4()),
+        "kind": kind,
+        "reference": reference or {},
+        "subject": messages[0]["subject"] if messages else None,
+        "total": len(messages),
+        "sent": 0,
+        "deferred": 0,
+        "failed": 0,
+        "errors": [],
+        "status": "running" if messages else "completed",
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None if messages else now,
+    }
+    if messages:
+        await db.email_broadcast_chunks.insert_many([
+            {
+                "id": str(uuid.uuid4()),
+                "broadcast_id": broadcast["id"],
+                "index": index,
+                "messages": chunk,
+                "status": "pending",
+                "locked_until": None,
+                "created_at": now,
+            }
+            for index, chunk in enumerate(broadcast_chunks(messages, email_transport))
+        ])
+    await db.email_broadcasts.insert_one(broadcast)
+    broadcast.pop("_id", None)
+    
+    if messages:
+        launch_broadcast(broadcast["id"], kind)
+    return broadcast
+
+
+def launch_broadcast(broadcast_id: str, kind: str):
+    task = asyncio.create_task(run_broadcast(broadcast_id, kind))
+    _broadcast_tasks.add(task)
+    task.add_done_callback(_broadcast_tasks.discard)
+
+
+async def claim_broadcast_chunk(broadcast_id: str) -> Optional[dict]:
+    """Lease the next chunk of a broadcast. Expired leases from crashed processes are picked up again."""
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
+    return await db.email_broadcast_chunks.find_one_and_update(
+        {
+            "broadcast_id": broadcast_id,
+            "$or": [
+                {"status": "pending"},
+                {"status": "sending", "locked_until": {"$lte": now_iso}},
+            ],
+        },
+        {"$set": {
+            "status": "sending",
+            "locked_until": (now + timedelta(seconds=EMAIL_SEND_TIMEOUT_SECONDS * 2)).isoformat(),
+        }},
+        sort=[("index", 1)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def run_broadcast(broadcast_id: str, kind: str, transport=None):
+    """Deliver the remaining chunks of a broadcast and keep its progress record up to date"""
+    transport = transport or email_transport
+    
+    async def deliver(chunk: List[dict]) -> dict:
+        try:
+            if len(chunk) > 1:
+                await asyncio.wait_for(transport.send_batch(chunk), EMAIL_SEND_TIMEOUT_SECONDS)
+            else:
+                await asyncio.wait_for(transport.send(chunk[0]), EMAIL_SEND_TIMEOUT_SECONDS)
+            return {"$inc": {"sent": len(chunk)}}
+        except Exception as e:
+            logging.warning(f"Broadcast {broadcast_id} chunk of {len(chunk)} failed, deferring to outbox: {e}")
+            deferred = 0
+            for message in chunk:
+                try:
+                    await enqueue_email(message, tag=f"broadcast:{kind}")
+                    deferred += 1
+                except Exception as enqueue_error:
+                    logging.error(f"Broadcast {broadcast_id} could not queue {message['to']}: {enqueue_error}")
+            return {
+                "$inc": {"deferred": deferred, "failed": len(chunk) - deferred},
+                "$push": {"errors": {"$each": [str(e)], "$slice": -20}},
+            }
+    
+    async def worker():
+        while (chunk := await claim_broadcast_chunk(broadcast_id)) is not None:
+            progress = await deliver(chunk["messages"])
+            progress.setdefault("$set", {})["updated_at"] = datetime.now(timezone.utc).isoformat()
+            await db.email_broadcasts.update_one({"id": broadcast_id}, progress)
+            await db.email_broadcast_chunks.update_one(
+                {"id": chunk["id"]},
+                {"$set": {"status": "done", "locked_until": None}, "$unset": {"messages": ""}}
+            )
+    
+    try:
+        await asyncio.gather(*(worker() for _ in range(EMAIL_BULK_CONCURRENCY)))
+        if await db.email_broadcast_chunks.find_one(
+            {"broadcast_id": broadcast_id, "status": {"$ne": "done"}}, {"_id": 1}
+        ):
+            # Chunks leased by another process are finished there
+            return
+        status = "completed"
+    except Exception as e:
+        logging.error(f"Broadcast {broadcast_id} aborted: {e}")
+        status = "failed"
+    
+    now = datetime.now(timezone.utc).isoformat()
+    result = await db.email_broadcasts.update_one(
+        {"id": broadcast_id, "status": "running"},
+        {"$set": {"status": status, "finished_at": now, "updated_at": now}}
+    )
+    if status == "completed":
+        await db.email_broadcast_chunks.delete_many({"broadcast_id": broadcast_id})
+    if result.modified_count:
+        logging.info(f"Broadcast {broadcast_id} ({kind}) {status}")
+
+
+async def resume_broadcasts() -> int:
+    """Restart delivery of broadcasts cut off by a restart. Returns the number resumed."""
+    resumed = 0
+    async for broadcast in db.email_broadcasts.find({"status": "running"}, {"_id": 0, "id": 1, "kind": 1}):
+        if await db.email_broadcast_chunks.find_one({"broadcast_id": broadcast["id"]}, {"_id": 1}):
+            launch_broadcast(broadcast["id"], broadcast["kind"])
+            resumed += 1
+        else:
+            # Recorded before chunks were stored, the remaining recipients are unknown
+            await db.email_broadcasts.update_one(
+                {"id": broadcast["id"]},
+                {"$set": {"status": "interrupted", "updated_at": datetime.now(timezone.utc).isoformat()}}
+            )
+    if resumed:
+        logging.info(f"Resumed {resumed} email broadcasts")
+    return resumed
+
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
@@ -500,9 +1204,15 @@ async def create_status_check(input: StatusCheckCreate):
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
+async def get_status_checks(
+    response: Response,
+    limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     # Exclude MongoDB's _id field from the query results
-    status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(1000)
+    status_checks = await paginate(
+        db.status_checks, {}, {"_id": 0}, "timestamp", 1, limit, cursor, response
+    )
     
     # Convert ISO string timestamps back to datetime objects
     for check in status_checks:
@@ -561,12 +1271,15 @@ async def update_current_leader(input: LeaderRegistrationUpdate = None, authoriz
     leader_id = payload['sub']
     
     update_data = {k: v for k, v in input.model_dump().items() if v is not None}
+    if "image_url" in update_data:
+        update_data["image_url"] = await store_image_data_url(update_data["image_url"])
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.leader_registrations.update_one(
         {"id": leader_id},
         {"$set": update_data}
     )
+    await pdf_cache.invalidate(leader_id)
     
     # Also update main leaders collection if approved
     leader = await db.leader_registrations.find_one({"id": leader_id})
@@ -625,6 +1338,7 @@ async def get_leader(leader_id: str):
 @api_router.post("/leaders", response_model=Leader)
 async def create_leader(input: LeaderCreate):
     """Create a new leader/facilitator"""
+    input.image_url = await store_image_data_url(input.image_url)
     leader = Leader(**input.model_dump())
     doc = leader.model_dump()
     await db.leaders.insert_one(doc)
@@ -639,6 +1353,8 @@ async def update_leader(leader_id: str, input: LeaderUpdate):
         raise HTTPException(status_code=404, detail="Leader not found")
     
     update_data = {k: v for k, v in input.model_dump().items() if v is not None}
+    if "image_url" in update_data:
+        update_data["image_url"] = await store_image_data_url(update_data["image_url"])
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.leaders.update_one({"id": leader_id}, {"$set": update_data})
@@ -877,29 +1593,33 @@ async def create_contact_request(request: ContactRequest):
         </html>
         """
         
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [ADMIN_EMAIL],
             "subject": f"📩 طلب تواصل جديد: {request.name}",
             "html": admin_html
-        })
+        }, tag="contact_request")
     except Exception as e:
-        logging.error(f"Failed to send admin notification: {e}")
+        logging.error(f"Failed to queue admin notification: {e}")
     
     contact_doc.pop('_id', None)
     return contact_doc
 
 @api_router.get("/contact-requests")
-async def get_contact_requests(status: Optional[str] = None):
+async def get_contact_requests(
+    response: Response,
+    status: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """Get all contact requests"""
     query = {}
     if status:
         query["status"] = status
     
-    requests = await db.contact_requests.find(query).sort("created_at", -1).to_list(500)
-    for r in requests:
-        r.pop('_id', None)
-    return requests
+    return await paginate(
+        db.contact_requests, query, {"_id": 0}, "created_at", -1, limit, cursor, response
+    )
 
 
 # ==================== BOARD MEMBER AUTHENTICATION ====================
@@ -923,12 +1643,81 @@ class BoardMemberResponse(BaseModel):
     is_account_active: bool
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread pool so hashing never blocks the event loop.
+    
+    Calls beyond max_pending (running + queued) are rejected with 503 right
+    away instead of piling up behind a burst of logins.
+    """
+    
+    def __init__(self, rounds: int, workers: int, max_pending: int):
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+    
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="Servern är upptagen, försök igen om en stund",
+                headers={"Retry-After": "2"}
+            )
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+    
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+    
+    async def verify(self, password: str, password_hash: str) -> bool:
+        try:
+            return await self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+        except ValueError:
+            # Malformed hash in the database
+            return False
+    
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when the hash was made with a different cost factor than configured"""
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
 
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await password_hasher.verify(password, password_hash)
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+async def verify_and_upgrade_password(collection, user: dict, password: str) -> bool:
+    """Verify a login password and rehash it if BCRYPT_ROUNDS has changed since it was stored"""
+    if not await verify_password(password, user["password_hash"]):
+        return False
+    
+    if password_hasher.needs_rehash(user["password_hash"]):
+        try:
+            new_hash = await hash_password(password)
+        except HTTPException:
+            # Overloaded; upgrade on a later login instead of failing this one
+            return True
+        await collection.update_one(
+            {"id": user["id"], "password_hash": user["password_hash"]},
+            {"$set": {"password_hash": new_hash}}
+        )
+    return True
 
 
 def create_board_token(member_id: str, email: str, name: str, role: str) -> str:
@@ -955,6 +1744,15 @@ def verify_board_token(token: str) -> dict:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
+def require_board_member(token: Optional[str], authorization: Optional[str]) -> dict:
+    """Admin-only endpoints: a board member token as ?token= or Bearer header"""
+    if not token and authorization and authorization.startswith("Bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=401, detail="Token required")
+    return verify_board_token(token)
+
+
 @api_router.post("/board-auth/set-password")
 async def set_board_member_password(input: BoardMemberSetPassword):
     """Set password for a board member (first time setup)"""
@@ -962,7 +1760,7 @@ async def set_board_member_password(input: BoardMemberSetPassword):
     if not member:
         raise HTTPException(status_code=404, detail="Ingen styrelsemedlem hittades med denna e-post")
     
-    password_hash = hash_password(input.password)
+    password_hash = await hash_password(input.password)
     await db.board_members.update_one(
         {"email": input.email.lower()},
         {"$set": {"password_hash": password_hash, "is_account_active": True}}
@@ -981,7 +1779,7 @@ async def login_board_member(input: BoardMemberLogin):
     if not member.get("password_hash"):
         raise HTTPException(status_code=400, detail="Inget lösenord är satt. Vänligen skapa ett konto först.")
     
-    if not verify_password(input.password, member["password_hash"]):
+    if not await verify_and_upgrade_password(db.board_members, member, input.password):
         raise HTTPException(status_code=401, detail="Felaktig e-post eller lösenord")
     
     # Update last login
@@ -1099,18 +1897,12 @@ async def send_meeting_invitation_email(meeting: dict, recipients: List[str]):
     </html>
     """
     
-    for email in recipients:
-        params = {
-            "from": SENDER_EMAIL,
-            "to": [email],
-            "subject": f"📅 Kallelse: {meeting.get('title', 'Styrelsemöte')} - {meeting.get('date', '')}",
-            "html": html_content
-        }
-        try:
-            await asyncio.to_thread(resend.Emails.send, params)
-            logging.info(f"Meeting invitation sent to {email}")
-        except Exception as e:
-            logging.error(f"Failed to send meeting invitation to {email}: {str(e)}")
+    subject = f"📅 Kallelse: {meeting.get('title', 'Styrelsemöte')} - {meeting.get('date', '')}"
+    messages = [
+        {"from": SENDER_EMAIL, "to": [email], "subject": subject, "html": html_content}
+        for email in recipients
+    ]
+    return await start_broadcast("meeting_invitation", messages, {"meeting_id": meeting.get("id")})
 
 
 async def send_meeting_reminder_email(meeting: dict, recipients: List[str], days_until: int):
@@ -1148,18 +1940,12 @@ async def send_meeting_reminder_email(meeting: dict, recipients: List[str], days
     </html>
     """
     
-    for email in recipients:
-        params = {
-            "from": SENDER_EMAIL,
-            "to": [email],
-            "subject": f"⏰ Påminnelse: {meeting.get('title', 'Styrelsemöte')} om {days_until} dag{'ar' if days_until > 1 else ''}",
-            "html": html_content
-        }
-        try:
-            await asyncio.to_thread(resend.Emails.send, params)
-            logging.info(f"Meeting reminder sent to {email}")
-        except Exception as e:
-            logging.error(f"Failed to send meeting reminder to {email}: {str(e)}")
+    subject = f"⏰ Påminnelse: {meeting.get('title', 'Styrelsemöte')} om {days_until} dag{'ar' if days_until > 1 else ''}"
+    messages = [
+        {"from": SENDER_EMAIL, "to": [email], "subject": subject, "html": html_content}
+        for email in recipients
+    ]
+    return await start_broadcast("meeting_reminder", messages, {"meeting_id": meeting.get("id")})
 
 
 async def get_board_member_emails() -> List[str]:
@@ -1561,11 +2347,11 @@ async def send_nomination_email_to_nominee(nomination: Nomination):
     }
     
     try:
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logging.info(f"Nomination email sent to nominee {nomination.nominee_email}, id: {email.get('id')}")
+        email_id = await enqueue_email(params, tag="nomination_nominee")
+        logging.info(f"Nomination email queued for nominee {nomination.nominee_email}, id: {email_id}")
         return True
     except Exception as e:
-        logging.error(f"Failed to send email to nominee: {str(e)}")
+        logging.error(f"Failed to queue email to nominee: {str(e)}")
         return False
 
 
@@ -1642,11 +2428,11 @@ async def send_nomination_email_to_admin(nomination: Nomination):
     }
     
     try:
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logging.info(f"Nomination notification sent to admin {ADMIN_EMAIL}, id: {email.get('id')}")
+        email_id = await enqueue_email(params, tag="nomination_admin")
+        logging.info(f"Nomination notification queued for admin {ADMIN_EMAIL}, id: {email_id}")
         return True
     except Exception as e:
-        logging.error(f"Failed to send email to admin: {str(e)}")
+        logging.error(f"Failed to queue email to admin: {str(e)}")
         return False
 
 
@@ -1668,11 +2454,11 @@ async def create_nomination(input: NominationCreate):
     # Only send emails for traditional nominations (not direct invitations)
     if not input.direct_invitation and input.status != 'approved':
         # Notify admin about new nomination
-        asyncio.create_task(send_nomination_email_to_admin(nomination))
+        await send_nomination_email_to_admin(nomination)
         
         # Send confirmation to nominator if they provided an email
         if nomination.nominator_email:
-            asyncio.create_task(send_nomination_confirmation_to_nominator(nomination))
+            await send_nomination_confirmation_to_nominator(nomination)
     
     return nomination
 
@@ -1711,26 +2497,33 @@ async def send_nomination_confirmation_to_nominator(nomination: Nomination):
     """
     
     try:
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [nomination.nominator_email],
             "subject": f"✅ تم استلام ترشيحك لـ {nomination.nominee_name}",
             "html": html_content
-        })
+        }, tag="nomination_nominator")
     except Exception as e:
-        logging.error(f"Failed to send nominator confirmation: {str(e)}")
+        logging.error(f"Failed to queue nominator confirmation: {str(e)}")
 
 
 @api_router.get("/nominations", response_model=List[Nomination])
-async def get_nominations(status: Optional[str] = None, event_id: Optional[str] = None):
+async def get_nominations(
+    response: Response,
+    status: Optional[str] = None,
+    event_id: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """Get all nominations with optional filtering"""
     query = {}
     if status:
         query["status"] = status
     if event_id:
         query["event_id"] = event_id
-    nominations = await db.nominations.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return nominations
+    return await paginate(
+        db.nominations, query, {"_id": 0}, "created_at", -1, limit, cursor, response
+    )
 
 
 @api_router.get("/nominations/stats")
@@ -1788,6 +2581,8 @@ async def update_nomination(nomination_id: str, input: NominationUpdate):
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
     await db.nominations.update_one({"id": nomination_id}, {"$set": update_data})
+    await pdf_cache.invalidate(nomination_id)
+    checkin_service.invalidate(existing.get("event_id"))
     updated = await db.nominations.find_one({"id": nomination_id}, {"_id": 0})
     return updated
 
@@ -1795,9 +2590,11 @@ async def update_nomination(nomination_id: str, input: NominationUpdate):
 @api_router.delete("/nominations/{nomination_id}")
 async def delete_nomination(nomination_id: str):
     """Delete a nomination"""
-    result = await db.nominations.delete_one({"id": nomination_id})
-    if result.deleted_count == 0:
+    deleted = await db.nominations.find_one_and_delete({"id": nomination_id}, {"_id": 0, "event_id": 1})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Nomination not found")
+    await pdf_cache.invalidate(nomination_id)
+    checkin_service.invalidate(deleted.get("event_id"))
     return {"message": "Nomination deleted successfully"}
 
 
@@ -1820,6 +2617,7 @@ async def approve_nomination(nomination_id: str, admin_notes: Optional[str] = No
     }
     
     await db.nominations.update_one({"id": nomination_id}, {"$set": update_data})
+    checkin_service.invalidate(nomination.get("event_id"))
     
     # Create nomination object for email
     nomination_obj = Nomination(**{**nomination, **update_data})
@@ -1849,6 +2647,7 @@ async def reject_nomination(nomination_id: str, reason: Optional[str] = None):
     }
     
     await db.nominations.update_one({"id": nomination_id}, {"$set": update_data})
+    checkin_service.invalidate(nomination.get("event_id"))
     
     # Optionally notify nominator
     # await send_nomination_rejected_to_nominator(nomination, reason)
@@ -1916,15 +2715,15 @@ async def send_nomination_invitation_to_nominee(nomination: Nomination):
     """
     
     try:
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [nomination.nominee_email],
             "subject": f"🎓 {nomination.nominator_name} قام بترشيحك لـ {nomination.event_title}",
             "html": html_content
-        })
-        logging.info(f"Invitation email sent to nominee: {nomination.nominee_email}")
+        }, tag="nomination_invitation")
+        logging.info(f"Invitation email queued for nominee: {nomination.nominee_email}")
     except Exception as e:
-        logging.error(f"Failed to send invitation to nominee: {str(e)}")
+        logging.error(f"Failed to queue invitation to nominee: {str(e)}")
 
 
 async def send_nomination_approved_to_nominator(nomination: Nomination):
@@ -1956,14 +2755,14 @@ async def send_nomination_approved_to_nominator(nomination: Nomination):
     """
     
     try:
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [nomination.nominator_email],
             "subject": f"✅ تمت الموافقة على ترشيحك لـ {nomination.nominee_name}!",
             "html": html_content
-        })
+        }, tag="nomination_approved")
     except Exception as e:
-        logging.error(f"Failed to send approval notification to nominator: {str(e)}")
+        logging.error(f"Failed to queue approval notification to nominator: {str(e)}")
 
 
 @api_router.post("/nominations/{nomination_id}/register")
@@ -1978,6 +2777,8 @@ async def register_nominee(nomination_id: str, registration: NomineeRegistration
     if nomination.get("registration_completed"):
         raise HTTPException(status_code=400, detail="Already registered")
     
+    registration.profile_image = await store_image_data_url(registration.profile_image)
+    
     # Update nomination with registration data
     update_data = {
         "registration_completed": True,
@@ -1987,6 +2788,8 @@ async def register_nominee(nomination_id: str, registration: NomineeRegistration
     }
     
     await db.nominations.update_one({"id": nomination_id}, {"$set": update_data})
+    await pdf_cache.invalidate(nomination_id)
+    checkin_service.invalidate(nomination.get("event_id"))
     
     # Send notification email to admin about the registration
     try:
@@ -2028,6 +2831,7 @@ async def approve_or_reject_registration(nomination_id: str, approval: Registrat
                 "updated_at": datetime.now(timezone.utc).isoformat()
             }}
         )
+        checkin_service.invalidate(nomination.get("event_id"))
         
         # Send approval email with login credentials
         await send_participant_approval_email(
@@ -2050,6 +2854,7 @@ async def approve_or_reject_registration(nomination_id: str, approval: Registrat
                 "updated_at": datetime.now(timezone.utc).isoformat()
             }}
         )
+        checkin_service.invalidate(nomination.get("event_id"))
         
         # Send rejection email
         await send_participant_rejection_email(
@@ -2079,7 +2884,7 @@ async def create_participant_account(nomination: dict, registration_data: dict):
     
     # Generate password
     password = generate_password()
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    password_hash = await hash_password(password)
     
     participant = {
         "id": str(uuid.uuid4()),
@@ -2161,15 +2966,15 @@ async def send_participant_approval_email(email: str, name: str, password: str,
     """
     
     try:
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [email],
             "subject": f"✅ تمت الموافقة على تسجيلك في {workshop_title}",
             "html": html_content
-        })
-        logging.info(f"Approval email sent to participant {email}")
+        }, tag="registration_approved")
+        logging.info(f"Approval email queued for participant {email}")
     except Exception as e:
-        logging.error(f"Failed to send approval email: {str(e)}")
+        logging.error(f"Failed to queue approval email: {str(e)}")
 
 
 async def send_participant_rejection_email(email: str, name: str, reason: str, workshop_title: str):
@@ -2205,15 +3010,15 @@ async def send_participant_rejection_email(email: str, name: str, reason: str, w
     """
     
     try:
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [email],
             "subject": f"بخصوص تسجيلك في {workshop_title}",
             "html": html_content
-        })
-        logging.info(f"Rejection email sent to {email}")
+        }, tag="registration_rejected")
+        logging.info(f"Rejection email queued for {email}")
     except Exception as e:
-        logging.error(f"Failed to send rejection email: {str(e)}")
+        logging.error(f"Failed to queue rejection email: {str(e)}")
 
 
 
@@ -2277,15 +3082,15 @@ async def send_registration_email_to_admin(nomination: dict, registration: Nomin
     """
     
     try:
-        email = resend.Emails.send({
+        email_id = await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [ADMIN_EMAIL],
             "subject": f"✅ تسجيل جديد: {registration.full_name} - {nomination.get('event_title', 'N/A')}",
             "html": html_content
-        })
-        logging.info(f"Registration email sent to admin, id: {email.get('id')}")
+        }, tag="registration_admin")
+        logging.info(f"Registration email queued for admin, id: {email_id}")
     except Exception as e:
-        logging.error(f"Failed to send registration email to admin: {e}")
+        logging.error(f"Failed to queue registration email to admin: {e}")
 
 
 # ==================== BOARD MEETING ENDPOINTS ====================
@@ -2560,6 +3365,7 @@ class WorkshopAgenda(BaseModel):
 
 
 class AgendaSessionCreate(BaseModel):
+    id: Optional[str] = None  # Kept when re-saving an existing session
     start_time: str
     end_time: str
     title: str
@@ -2572,6 +3378,7 @@ class AgendaSessionCreate(BaseModel):
 
 
 class AgendaDayCreate(BaseModel):
+    id: Optional[str] = None  # Kept when re-saving an existing day
     date: str
     day_number: int
     title: Optional[str] = None
@@ -2583,6 +3390,7 @@ class WorkshopAgendaCreate(BaseModel):
     days: List[AgendaDayCreate] = []
     is_published: bool = False
     notify_participants: bool = True
+    version: Optional[int] = None  # When given, the save fails if the agenda changed since
 
 
 class WorkshopAgendaUpdate(BaseModel):
@@ -2591,6 +3399,42 @@ class WorkshopAgendaUpdate(BaseModel):
     notify_participants: Optional[bool] = None
 
 
+# Single day/session edits. Every edit carries the agenda version it was based
+# on and is rejected with 409 if someone else saved the agenda in between.
+class AgendaDayAdd(AgendaDayCreate):
+    version: int
+
+
+class AgendaDayPatch(BaseModel):
+    version: int
+    date: Optional[str] = None
+    day_number: Optional[int] = None
+    title: Optional[str] = None
+
+
+class AgendaSessionAdd(AgendaSessionCreate):
+    version: int
+
+
+class AgendaSessionPatch(BaseModel):
+    version: int
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    title: Optional[str] = None
+    title_en: Optional[str] = None
+    title_ar: Optional[str] = None
+    description: Optional[str] = None
+    leader_id: Optional[str] = None
+    session_type: Optional[str] = None
+    order: Optional[int] = None
+
+
+class AgendaSessionMove(BaseModel):
+    version: int
+    day_id: str  # Target day, may be the session's current day
+    position: int = Field(ge=0)
+
+
 @api_router.post("/board-meetings", response_model=BoardMeeting)
 async def create_board_meeting(input: BoardMeetingCreate, send_invitation: bool = True):
     """Create a new board meeting and optionally send invitations"""
@@ -2612,7 +3456,7 @@ async def create_board_meeting(input: BoardMeetingCreate, send_invitation: bool
     if send_invitation:
         board_emails = await get_board_member_emails()
         if board_emails:
-            asyncio.create_task(send_meeting_invitation_email(doc, board_emails))
+            await send_meeting_invitation_email(doc, board_emails)
     
     return meeting
 
@@ -2706,8 +3550,12 @@ async def send_meeting_invitation(meeting_id: str):
     if not board_emails:
         return {"message": "Inga styrelsemedlemmar med e-post hittades", "sent_to": 0}
     
-    await send_meeting_invitation_email(meeting, board_emails)
-    return {"message": f"Kallelse skickad till {len(board_emails)} styrelsemedlemmar", "sent_to": len(board_emails)}
+    broadcast = await send_meeting_invitation_email(meeting, board_emails)
+    return {
+        "message": f"Kallelse skickas till {len(board_emails)} styrelsemedlemmar",
+        "sent_to": len(board_emails),
+        "broadcast_id": broadcast["id"]
+    }
 
 
 @api_router.post("/board-meetings/{meeting_id}/send-reminder")
@@ -2721,8 +3569,12 @@ async def send_meeting_reminder(meeting_id: str, days_until: int = 1):
     if not board_emails:
         return {"message": "Inga styrelsemedlemmar med e-post hittades", "sent_to": 0}
     
-    await send_meeting_reminder_email(meeting, board_emails, days_until)
-    return {"message": f"Påminnelse skickad till {len(board_emails)} styrelsemedlemmar", "sent_to": len(board_emails)}
+    broadcast = await send_meeting_reminder_email(meeting, board_emails, days_until)
+    return {
+        "message": f"Påminnelse skickas till {len(board_emails)} styrelsemedlemmar",
+        "sent_to": len(board_emails),
+        "broadcast_id": broadcast["id"]
+    }
 
 
 # ==================== WORKSHOP ENDPOINTS ====================
@@ -2771,6 +3623,16 @@ async def update_workshop(workshop_id: str, input: WorkshopUpdate):
     
     await db.workshops.update_one({"id": workshop_id}, {"$set": update_data})
     updated = await db.workshops.find_one({"id": workshop_id}, {"_id": 0})
+    
+    # Keep the workshop details copied into the session index current
+    await db.agenda_sessions.update_many(
+        {"workshop_id": workshop_id},
+        {"$set": {
+            "workshop_title": updated.get("title", ""),
+            "workshop_date": updated.get("date"),
+            "workshop_location": updated.get("location"),
+        }}
+    )
     return updated
 
 
@@ -2780,6 +3642,8 @@ async def delete_workshop(workshop_id: str):
     result = await db.workshops.delete_one({"id": workshop_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Workshop not found")
+    await db.agenda_sessions.delete_many({"workshop_id": workshop_id})
+    await db.pending_evaluations.delete_many({"workshop_id": workshop_id})
     return {"message": "Workshop deleted successfully"}
 
 
@@ -2924,6 +3788,67 @@ async def seed_initial_workshops():
     return {"message": f"Seeded {len(initial_workshops)} workshops", "count": len(initial_workshops)}
 
 
+# ==================== AGENDA SESSION INDEX ====================
+
+# agenda_sessions holds one document per agenda session, copied from
+# workshop_agendas whenever an agenda is saved, so a leader's schedule is one
+# indexed query instead of a walk through every agenda.
+
+def agenda_session_rows(agenda: dict, workshop: dict) -> list:
+    """Flatten an agenda into one row per session with its day and workshop"""
+    rows = []
+    for day in agenda.get("days", []):
+        for session in day.get("sessions", []):
+            if not session.get("id"):
+                continue
+            rows.append({
+                "id": session["id"],
+                "workshop_id": agenda["workshop_id"],
+                "workshop_title": workshop.get("title") or agenda.get("workshop_title", ""),
+                "workshop_date": workshop.get("date"),
+                "workshop_location": workshop.get("location"),
+                "day_id": day.get("id"),
+                "day_date": day.get("date"),
+                "day_number": day.get("day_number"),
+                "day_title": day.get("title"),
+                "leader_id": session.get("leader_id"),
+                "start_time": session.get("start_time"),
+                "session": session,
+            })
+    return rows
+
+
+async def sync_agenda_sessions(agenda: dict, workshop: dict) -> int:
+    """Bring the session index of one workshop in line with its saved agenda"""
+    rows = agenda_session_rows(agenda, workshop)
+    if rows:
+        await db.agenda_sessions.bulk_write(
+            [ReplaceOne({"id": row["id"]}, row, upsert=True) for row in rows],
+            ordered=False
+        )
+    # Removed after the upserts so readers never see an empty schedule
+    await db.agenda_sessions.delete_many({
+        "workshop_id": agenda["workshop_id"],
+        "id": {"$nin": [row["id"] for row in rows]},
+    })
+    return len(rows)
+
+
+async def rebuild_agenda_sessions() -> int:
+    """Rebuild the whole session index from workshop_agendas. Returns the number of sessions."""
+    agendas = await db.workshop_agendas.find({}, {"_id": 0}).to_list(None)
+    workshops = await DocumentLoader(db.workshops).load_many(agenda["workshop_id"] for agenda in agendas)
+    
+    total = 0
+    for agenda in agendas:
+        workshop = workshops.get(agenda["workshop_id"])
+        if not workshop:
+            continue
+        total += await sync_agenda_sessions(agenda, workshop)
+    logging.info(f"Rebuilt agenda session index: {total} sessions")
+    return total
+
+
 # ==================== WORKSHOP AGENDA ENDPOINTS ====================
 
 @api_router.get("/workshops/{workshop_id}/agenda")
@@ -2932,7 +3857,8 @@ async def get_workshop_agenda(workshop_id: str):
     agenda = await db.workshop_agendas.find_one({"workshop_id": workshop_id}, {"_id": 0})
     if not agenda:
         # Return empty agenda structure if none exists
-        return {"workshop_id": workshop_id, "days": [], "is_published": False}
+        return {"workshop_id": workshop_id, "days": [], "is_published": False, "version": 0}
+    agenda.setdefault("version", 0)
     return agenda
 
 
@@ -2944,23 +3870,31 @@ async def create_or_update_workshop_agenda(workshop_id: str, input: WorkshopAgen
     if not workshop:
         raise HTTPException(status_code=404, detail="Workshop not found")
     
+    # Leader names for all sessions in one query
+    leaders = await DocumentLoader(db.leaders, {"name": 1}).load_many(
+        session.leader_id for day in input.days for session in day.sessions
+    )
+    
+    # Check if agenda already exists
+    existing = await db.workshop_agendas.find_one({"workshop_id": workshop_id})
+    if not existing and input.version:
+        raise HTTPException(status_code=409, detail=AGENDA_CONFLICT_DETAIL)
+    
+    # Ids of this agenda's stored days and sessions are kept so evaluations stay
+    # linked to their session; any other id is replaced with a new one
+    stored_days = (existing or {}).get("days", [])
+    day_ids = AgendaIds(day.get("id") for day in stored_days)
+    session_ids = AgendaIds(session.get("id") for day in stored_days for session in day.get("sessions", []))
+    
     # Process days and sessions with leader names
     processed_days = []
     for day_data in input.days:
         sessions = []
         for session_data in day_data.sessions:
-            session_dict = session_data.model_dump()
-            session_dict["id"] = str(uuid.uuid4())
-            
-            # Get leader name if leader_id is provided
-            if session_data.leader_id:
-                leader = await db.leaders.find_one({"id": session_data.leader_id}, {"_id": 0, "name": 1})
-                session_dict["leader_name"] = leader["name"] if leader else None
-            
-            sessions.append(session_dict)
+            sessions.append(agenda_session_doc(session_data, leaders, session_ids.claim(session_data.id)))
         
         day_dict = {
-            "id": str(uuid.uuid4()),
+            "id": day_ids.claim(day_data.id),
             "date": day_data.date,
             "day_number": day_data.day_number,
             "title": day_data.title,
@@ -2968,9 +3902,6 @@ async def create_or_update_workshop_agenda(workshop_id: str, input: WorkshopAgen
         }
         processed_days.append(day_dict)
     
-    # Check if agenda already exists
-    existing = await db.workshop_agendas.find_one({"workshop_id": workshop_id})
-    
     agenda_data = {
         "workshop_id": workshop_id,
         "workshop_title": workshop.get("title"),
@@ -2981,24 +3912,263 @@ async def create_or_update_workshop_agenda(workshop_id: str, input: WorkshopAgen
     }
     
     if existing:
-        await db.workshop_agendas.update_one(
-            {"workshop_id": workshop_id},
-            {"$set": agenda_data}
+        query = {"workshop_id": workshop_id}
+        if input.version is not None:
+            query.update(agenda_version_filter(input.version))
+        saved = await db.workshop_agendas.find_one_and_update(
+            query,
+            {"$set": agenda_data, "$inc": {"version": 1}},
+            projection={"_id": 0, "version": 1},
+            return_document=ReturnDocument.AFTER,
         )
+        if not saved:
+            raise HTTPException(status_code=409, detail=AGENDA_CONFLICT_DETAIL)
         agenda_data["id"] = existing["id"]
         agenda_data["created_at"] = existing.get("created_at")
+        agenda_data["version"] = saved["version"]
     else:
         agenda_data["id"] = str(uuid.uuid4())
         agenda_data["created_at"] = datetime.now(timezone.utc).isoformat()
+        agenda_data["version"] = 1
         await db.workshop_agendas.insert_one(agenda_data)
     
+    await sync_agenda_sessions(agenda_data, workshop)
+    if input.is_published:
+        await refresh_pending_evaluations(workshop_id)
+    else:
+        # Sessions of unpublished agendas are not listed for evaluation
+        await db.pending_evaluations.delete_many({"workshop_id": workshop_id})
+    
     # If publishing, notify participants
     if input.is_published and input.notify_participants:
-        asyncio.create_task(notify_participants_agenda_published(workshop_id, workshop))
+        await notify_participants_agenda_published(workshop_id, workshop)
     
     return agenda_data
 
 
+AGENDA_CONFLICT_DETAIL = "Agenda has been changed by someone else, reload and try again"
+
+
+class AgendaIds:
+    """Ids stored in an agenda; each can be claimed once by a resaved day or session"""
+    
+    def __init__(self, stored):
+        self.available = {stored_id for stored_id in stored if stored_id}
+    
+    def claim(self, requested_id: Optional[str]) -> str:
+        if requested_id in self.available:
+            self.available.discard(requested_id)
+            return requested_id
+        return str(uuid.uuid4())
+
+
+def agenda_version_filter(version: int) -> dict:
+    # Agendas saved before versioning have no version field and count as 0
+    return {"version": {"$in": [0, None]}} if version == 0 else {"version": version}
+
+
+def agenda_session_doc(session_data: AgendaSessionCreate, leaders: dict, session_id: str) -> dict:
+    session = session_data.model_dump(exclude={"version"})
+    session["id"] = session_id
+    if session_data.leader_id:
+        leader = leaders.get(session_data.leader_id)
+        session["leader_name"] = leader["name"] if leader else None
+    return session
+
+
+async def apply_agenda_edit(
+    workshop_id: str,
+    version: int,
+    match: dict,
+    update: dict,
+    missing_detail: str,
+    projection: Optional[dict] = None,
+    array_filters: Optional[list] = None,
+) -> dict:
+    """Apply one edit if the agenda is still at `version` and bump the version"""
+    update = {
+        **update,
+        "$set": {**update.get("$set", {}), "updated_at": datetime.now(timezone.utc).isoformat()},
+        "$inc": {"version": 1},
+    }
+    agenda = await db.workshop_agendas.find_one_and_update(
+        {"workshop_id": workshop_id, **agenda_version_filter(version), **match},
+        update,
+        projection={"_id": 0, "version": 1, "is_published": 1, **(projection or {})},
+        array_filters=array_filters,
+        return_document=ReturnDocument.AFTER,
+    )
+    if agenda:
+        return agenda
+    
+    # Work out why nothing matched
+    current = await db.workshop_agendas.find_one({"workshop_id": workshop_id}, {"_id": 0, "version": 1})
+    if not current:
+        raise HTTPException(status_code=404, detail="Agenda not found")
+    if current.get("version", 0) != version:
+        raise HTTPException(status_code=409, detail=AGENDA_CONFLICT_DETAIL)
+    raise HTTPException(status_code=404, detail=missing_detail)
+
+
+async def index_agenda_days(workshop_id: str, days: list):
+    """Refresh the session index rows for the sessions of the given days"""
+    workshop = await db.workshops.find_one({"id": workshop_id}, {"_id": 0}) or {}
+    rows = agenda_session_rows({"workshop_id": workshop_id, "days": days}, workshop)
+    if rows:
+        await db.agenda_sessions.bulk_write(
+            [ReplaceOne({"id": row["id"]}, row, upsert=True) for row in rows],
+            ordered=False
+        )
+
+
+@api_router.post("/workshops/{workshop_id}/agenda/days")
+async def add_agenda_day(workshop_id: str, input: AgendaDayAdd):
+    """Add a day with its sessions to the end of an agenda"""
+    leaders = await DocumentLoader(db.leaders, {"name": 1}).load_many(s.leader_id for s in input.sessions)
+    day = {
+        "id": str(uuid.uuid4()),
+        "date": input.date,
+        "day_number": input.day_number,
+        "title": input.title,
+        "sessions": [agenda_session_doc(s, leaders, str(uuid.uuid4())) for s in input.sessions],
+    }
+    
+    agenda = await apply_agenda_edit(workshop_id, input.version, {}, {"$push": {"days": day}}, "Agenda not found")
+    await index_agenda_days(workshop_id, [day])
+    if agenda.get("is_published"):
+        await seed_pending_evaluations(workshop_id, session_ids=[s["id"] for s in day["sessions"]])
+    return {"version": agenda["version"], "day": day}
+
+
+@api_router.patch("/workshops/{workshop_id}/agenda/days/{day_id}")
+async def update_agenda_day(workshop_id: str, day_id: str, input: AgendaDayPatch):
+    """Change the date, number or title of one agenda day"""
+    fields = input.model_dump(exclude_unset=True, exclude={"version"})
+    if not fields:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    
+    agenda = await apply_agenda_edit(
+        workshop_id, input.version,
+        {"days.id": day_id},
+        {"$set": {f"days.$[day].{field}": value for field, value in fields.items()}},
+        "Day not found",
+        projection={"days": {"$elemMatch": {"id": day_id}}},
+        array_filters=[{"day.id": day_id}],
+    )
+    day = agenda["days"][0]
+    await index_agenda_days(workshop_id, [day])
+    return {"version": agenda["version"], "day": day}
+
+
+@api_router.delete("/workshops/{workshop_id}/agenda/days/{day_id}")
+async def delete_agenda_day(workshop_id: str, day_id: str, version: int):
+    """Remove a day and all of its sessions"""
+    agenda = await apply_agenda_edit(
+        workshop_id, version, {"days.id": day_id}, {"$pull": {"days": {"id": day_id}}}, "Day not found"
+    )
+    session_ids = await db.agenda_sessions.distinct("id", {"workshop_id": workshop_id, "day_id": day_id})
+    await db.agenda_sessions.delete_many({"workshop_id": workshop_id, "day_id": day_id})
+    await db.pending_evaluations.delete_many({"session_id": {"$in": session_ids}})
+    return {"version": agenda["version"]}
+
+
+@api_router.post("/workshops/{workshop_id}/agenda/days/{day_id}/sessions")
+async def add_agenda_session(workshop_id: str, day_id: str, input: AgendaSessionAdd):
+    """Add a session to the end of an agenda day"""
+    leaders = await DocumentLoader(db.leaders, {"name": 1}).load_many([input.leader_id])
+    session = agenda_session_doc(input, leaders, str(uuid.uuid4()))
+    
+    agenda = await apply_agenda_edit(
+        workshop_id, input.version,
+        {"days.id": day_id},
+        {"$push": {"days.$[day].sessions": session}},
+        "Day not found",
+        projection={"days": {"$elemMatch": {"id": day_id}}},
+        array_filters=[{"day.id": day_id}],
+    )
+    await index_agenda_days(workshop_id, [{**agenda["days"][0], "sessions": [session]}])
+    if agenda.get("is_published"):
+        await seed_pending_evaluations(workshop_id, session_ids=[session["id"]])
+    return {"version": agenda["version"], "session": session}
+
+
+@api_router.patch("/workshops/{workshop_id}/agenda/sessions/{session_id}")
+async def update_agenda_session(workshop_id: str, session_id: str, input: AgendaSessionPatch):
+    """Change fields of one session; only the given fields are written"""
+    fields = input.model_dump(exclude_unset=True, exclude={"version"})
+    if not fields:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    if "leader_id" in fields:
+        leader = await DocumentLoader(db.leaders, {"name": 1}).load(fields["leader_id"])
+        fields["leader_name"] = leader["name"] if leader else None
+    
+    agenda = await apply_agenda_edit(
+        workshop_id, input.version,
+        {"days.sessions.id": session_id},
+        {"$set": {f"days.$[day].sessions.$[session].{field}": value for field, value in fields.items()}},
+        "Session not found",
+        projection={"days": {"$elemMatch": {"sessions.id": session_id}}},
+        array_filters=[{"day.sessions.id": session_id}, {"session.id": session_id}],
+    )
+    day = agenda["days"][0]
+    session = next(s for s in day["sessions"] if s["id"] == session_id)
+    await index_agenda_days(workshop_id, [{**day, "sessions": [session]}])
+    if agenda.get("is_published") and fields.keys() & {"session_type", "leader_id"}:
+        await refresh_pending_evaluations(workshop_id, [session_id])
+    return {"version": agenda["version"], "session": session}
+
+
+@api_router.delete("/workshops/{workshop_id}/agenda/sessions/{session_id}")
+async def delete_agenda_session(workshop_id: str, session_id: str, version: int):
+    """Remove one session from an agenda"""
+    agenda = await apply_agenda_edit(
+        workshop_id, version,
+        {"days.sessions.id": session_id},
+        {"$pull": {"days.$[].sessions": {"id": session_id}}},
+        "Session not found",
+    )
+    await db.agenda_sessions.delete_one({"id": session_id})
+    await db.pending_evaluations.delete_many({"session_id": session_id})
+    return {"version": agenda["version"]}
+
+
+@api_router.post("/workshops/{workshop_id}/agenda/sessions/{session_id}/move")
+async def move_agenda_session(workshop_id: str, session_id: str, input: AgendaSessionMove):
+    """Move a session to a position within its day or on another day"""
+    agenda = await db.workshop_agendas.find_one({"workshop_id": workshop_id}, {"_id": 0, "version": 1, "days": 1})
+    if not agenda:
+        raise HTTPException(status_code=404, detail="Agenda not found")
+    if agenda.get("version", 0) != input.version:
+        raise HTTPException(status_code=409, detail=AGENDA_CONFLICT_DETAIL)
+    
+    days = agenda.get("days", [])
+    source = next((d for d in days if any(s.get("id") == session_id for s in d.get("sessions", []))), None)
+    if not source:
+        raise HTTPException(status_code=404, detail="Session not found")
+    target = next((d for d in days if d.get("id") == input.day_id), None)
+    if not target:
+        raise HTTPException(status_code=404, detail="Day not found")
+    
+    session = next(s for s in source["sessions"] if s.get("id") == session_id)
+    source["sessions"].remove(session)
+    target.setdefault("sessions", []).insert(min(input.position, len(target["sessions"])), session)
+    
+    # Only the sessions arrays of the affected days are rewritten
+    changed = {"source": source} if target is source else {"source": source, "target": target}
+    for day in changed.values():
+        for order, s in enumerate(day["sessions"]):
+            s["order"] = order
+    
+    agenda = await apply_agenda_edit(
+        workshop_id, input.version, {},
+        {"$set": {f"days.$[{role}].sessions": day["sessions"] for role, day in changed.items()}},
+        "Session not found",
+        array_filters=[{f"{role}.id": day["id"]} for role, day in changed.items()],
+    )
+    await index_agenda_days(workshop_id, list(changed.values()))
+    return {"version": agenda["version"], "days": list(changed.values())}
+
+
 @api_router.put("/workshops/{workshop_id}/agenda/publish")
 async def publish_workshop_agenda(workshop_id: str, notify: bool = True):
     """Publish a workshop agenda and optionally notify participants"""
@@ -3010,11 +4180,14 @@ async def publish_workshop_agenda(workshop_id: str, notify: bool = True):
         {"workshop_id": workshop_id},
         {"$set": {"is_published": True, "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
+    await seed_pending_evaluations(workshop_id)
     
     if notify:
         workshop = await db.workshops.find_one({"id": workshop_id}, {"_id": 0})
         if workshop:
-            asyncio.create_task(notify_participants_agenda_published(workshop_id, workshop))
+            broadcast = await notify_participants_agenda_published(workshop_id, workshop)
+            if broadcast:
+                return {"success": True, "message": "Agenda published", "broadcast_id": broadcast["id"]}
     
     return {"success": True, "message": "Agenda published"}
 
@@ -3039,24 +4212,20 @@ async def get_public_agenda(workshop_id: str):
 @api_router.get("/leaders/{leader_id}/sessions")
 async def get_leader_sessions(leader_id: str):
     """Get all sessions assigned to a specific leader"""
-    # Find all agendas containing this leader
-    agendas = await db.workshop_agendas.find({}, {"_id": 0}).to_list(100)
-    
-    leader_sessions = []
-    for agenda in agendas:
-        workshop_title = agenda.get("workshop_title", "")
-        for day in agenda.get("days", []):
-            for session in day.get("sessions", []):
-                if session.get("leader_id") == leader_id:
-                    leader_sessions.append({
-                        "workshop_id": agenda["workshop_id"],
-                        "workshop_title": workshop_title,
-                        "day_date": day["date"],
-                        "day_number": day["day_number"],
-                        "session": session
-                    })
+    rows = await db.agenda_sessions.find(
+        {"leader_id": leader_id}, {"_id": 0}
+    ).sort([("day_date", 1), ("start_time", 1)]).to_list(1000)
     
-    return leader_sessions
+    return [
+        {
+            "workshop_id": row["workshop_id"],
+            "workshop_title": row["workshop_title"],
+            "day_date": row["day_date"],
+            "day_number": row["day_number"],
+            "session": row["session"]
+        }
+        for row in rows
+    ]
 
 
 async def notify_participants_agenda_published(workshop_id: str, workshop: dict):
@@ -3109,19 +4278,14 @@ async def notify_participants_agenda_published(workshop_id: str, workshop: dict)
     </html>
     """
     
+    subject = f"📋 Programmet för {workshop.get('title', 'utbildningen')} är klart!"
+    messages = []
     for participant in participants:
         email = participant.get("nominee_email") or participant.get("registration_data", {}).get("email")
         if email:
-            try:
-                await asyncio.to_thread(resend.Emails.send, {
-                    "from": SENDER_EMAIL,
-                    "to": [email],
-                    "subject": f"📋 Programmet för {workshop.get('title', 'utbildningen')} är klart!",
-                    "html": html_content
-                })
-                logging.info(f"Agenda notification sent to {email}")
-            except Exception as e:
-                logging.error(f"Failed to send agenda notification to {email}: {str(e)}")
+            messages.append({"from": SENDER_EMAIL, "to": [email], "subject": subject, "html": html_content})
+    
+    return await start_broadcast("agenda_published", messages, {"workshop_id": workshop_id})
 
 
 async def send_daily_reminder(workshop_id: str, day_data: dict, workshop: dict):
@@ -3180,18 +4344,17 @@ async def send_daily_reminder(workshop_id: str, day_data: dict, workshop: dict):
     </html>
     """
     
+    subject = f"⏰ Påminnelse: {workshop.get('title', 'Utbildning')} - Dag {day_data.get('day_number')}"
+    messages = []
     for participant in participants:
         email = participant.get("nominee_email") or participant.get("registration_data", {}).get("email")
         if email:
-            try:
-                await asyncio.to_thread(resend.Emails.send, {
-                    "from": SENDER_EMAIL,
-                    "to": [email],
-                    "subject": f"⏰ Påminnelse: {workshop.get('title', 'Utbildning')} - Dag {day_data.get('day_number')}",
-                    "html": html_content
-                })
-            except Exception as e:
-                logging.error(f"Failed to send reminder to {email}: {str(e)}")
+            messages.append({"from": SENDER_EMAIL, "to": [email], "subject": subject, "html": html_content})
+    
+    return await start_broadcast(
+        "daily_reminder", messages,
+        {"workshop_id": workshop_id, "day_number": day_data.get("day_number")}
+    )
 
 
 @api_router.post("/workshops/{workshop_id}/agenda/send-reminder")
@@ -3209,9 +4372,11 @@ async def send_agenda_reminder(workshop_id: str, day_number: int):
     if not day_data:
         raise HTTPException(status_code=404, detail=f"Day {day_number} not found in agenda")
     
-    asyncio.create_task(send_daily_reminder(workshop_id, day_data, workshop))
+    broadcast = await send_daily_reminder(workshop_id, day_data, workshop)
+    if not broadcast:
+        return {"success": True, "message": f"No participants to remind for day {day_number}"}
     
-    return {"success": True, "message": f"Reminder sent for day {day_number}"}
+    return {"success": True, "message": f"Reminder sent for day {day_number}", "broadcast_id": broadcast["id"]}
 
 
 @api_router.get("/member/agenda/{workshop_id}")
@@ -3244,12 +4409,261 @@ async def get_member_agenda(workshop_id: str, token: str):
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
-# ==================== SESSION EVALUATION ENDPOINTS ====================
+# ==================== EVALUATION ROLLUPS ====================
 
-@api_router.post("/workshops/{workshop_id}/sessions/{session_id}/send-evaluation")
-async def send_evaluation_to_participants(workshop_id: str, session_id: str):
-    """Send evaluation link to all registered participants for a session"""
-    # Get workshop info
+# evaluation_rollups holds pre-aggregated ratings per
+# (workshop_id, session_id, leader_id, question_id). Documents with
+# question_id None count whole evaluations for the session/leader group;
+# the others hold count/sum/sum_sq/min/max and a histogram of ratings.
+ROLLUP_GROUP_FIELDS = ("workshop_id", "session_id", "leader_id")
+
+
+def evaluation_rollup_updates(evaluation: dict) -> list:
+    """Build the upserts that fold one evaluation into the rollups"""
+    group = {field: evaluation.get(field) for field in ROLLUP_GROUP_FIELDS}
+    labels = {
+        "leader_name": evaluation.get("leader_name"),
+        "session_title": evaluation.get("session_title"),
+    }
+    
+    updates = [UpdateOne(
+        {**group, "question_id": None},
+        {"$inc": {"evaluations": 1}, "$setOnInsert": labels},
+        upsert=True
+    )]
+    for answer in evaluation.get("answers", []):
+        rating = answer.get("rating", 0)
+        updates.append(UpdateOne(
+            {**group, "question_id": answer.get("question_id")},
+            {
+                "$inc": {
+                    "count": 1,
+                    "sum": rating,
+                    "sum_sq": rating * rating,
+                    f"histogram.{rating}": 1,
+                },
+                "$min": {"min": rating},
+                "$max": {"max": rating},
+                "$setOnInsert": labels,
+            },
+            upsert=True
+        ))
+    return updates
+
+
+async def update_evaluation_rollups(evaluation: dict):
+    """Add a newly submitted evaluation to the rollups"""
+    await db.evaluation_rollups.bulk_write(evaluation_rollup_updates(evaluation), ordered=False)
+
+
+async def rebuild_evaluation_rollups() -> dict:
+    """Recompute all rollups from session_evaluations.
+    
+    The rollups are built in a scratch collection and swapped in with a
+    rename, so readers never see a half-built set. Evaluations submitted
+    while the rebuild runs may be missing until the next rebuild.
+    """
+    group_id = {field: f"${field}" for field in ROLLUP_GROUP_FIELDS}
+    rollups = {}
+    
+    evaluation_groups = db.session_evaluations.aggregate([
+        {"$group": {
+            "_id": group_id,
+            "evaluations": {"$sum": 1},
+            "leader_name": {"$first": "$leader_name"},
+            "session_title": {"$first": "$session_title"},
+        }},
+    ])
+    async for row in evaluation_groups:
+        key = tuple(row["_id"].get(field) for field in ROLLUP_GROUP_FIELDS)
+        rollups[key + (None,)] = {
+            **dict(zip(ROLLUP_GROUP_FIELDS, key)),
+            "question_id": None,
+            "leader_name": row["leader_name"],
+            "session_title": row["session_title"],
+            "evaluations": row["evaluations"],
+        }
+    
+    rating_groups = db.session_evaluations.aggregate([
+        {"$unwind": "$answers"},
+        {"$group": {
+            "_id": {
+                **group_id,
+                "question_id": "$answers.question_id",
+                "rating": {"$ifNull": ["$answers.rating", 0]},
+            },
+            "count": {"$sum": 1},
+        }},
+    ])
+    async for row in rating_groups:
+        key = tuple(row["_id"].get(field) for field in ROLLUP_GROUP_FIELDS)
+        question_id, rating, count = row["_id"].get("question_id"), row["_id"]["rating"], row["count"]
+        group = rollups[key + (None,)]
+        doc = rollups.setdefault(key + (question_id,), {
+            **dict(zip(ROLLUP_GROUP_FIELDS, key)),
+            "question_id": question_id,
+            "leader_name": group["leader_name"],
+            "session_title": group["session_title"],
+            "count": 0, "sum": 0, "sum_sq": 0,
+            "min": rating, "max": rating,
+            "histogram": {},
+        })
+        doc["count"] += count
+        doc["sum"] += rating * count
+        doc["sum_sq"] += rating * rating * count
+        doc["min"] = min(doc["min"], rating)
+        doc["max"] = max(doc["max"], rating)
+        doc["histogram"][str(rating)] = doc["histogram"].get(str(rating), 0) + count
+    
+    if not rollups:
+        await db.evaluation_rollups.delete_many({})
+        return {"groups": 0, "rollups": 0}
+    
+    scratch = db.evaluation_rollups_rebuild
+    await scratch.drop()
+    await scratch.insert_many(list(rollups.values()))
+    await ensure_collection_indexes(
+        scratch, validate_index_registry(INDEX_REGISTRY).get("evaluation_rollups", {})
+    )
+    await scratch.rename("evaluation_rollups", dropTarget=True)
+    
+    groups = sum(1 for key in rollups if key[-1] is None)
+    logging.info(f"Rebuilt evaluation rollups: {groups} session groups, {len(rollups)} documents")
+    return {"groups": groups, "rollups": len(rollups)}
+
+
+async def summarize_evaluation_rollups(query: dict) -> dict:
+    """Fold the rollups matching query into totals per question, leader and session"""
+    summary = {"total_evaluations": 0, "count": 0, "sum": 0, "questions": {}, "leaders": {}, "sessions": {}}
+    
+    async for rollup in db.evaluation_rollups.find(query, {"_id": 0}):
+        leader = summary["leaders"].setdefault(rollup["leader_id"], {
+            "leader_name": rollup.get("leader_name"), "evaluations": 0, "count": 0, "sum": 0
+        })
+        session = summary["sessions"].setdefault(rollup["session_id"], {
+            "session_title": rollup.get("session_title"),
+            "leader_name": rollup.get("leader_name"),
+            "evaluations": 0, "count": 0, "sum": 0
+        })
+        
+        if rollup["question_id"] is None:
+            evaluations = rollup.get("evaluations", 0)
+            summary["total_evaluations"] += evaluations
+            leader["evaluations"] += evaluations
+            session["evaluations"] += evaluations
+            continue
+        
+        question = summary["questions"].setdefault(rollup["question_id"], {
+            "count": 0, "sum": 0, "sum_sq": 0, "min": rollup["min"], "max": rollup["max"], "histogram": {}
+        })
+        question["min"] = min(question["min"], rollup["min"])
+        question["max"] = max(question["max"], rollup["max"])
+        for rating, count in rollup.get("histogram", {}).items():
+            question["histogram"][rating] = question["histogram"].get(rating, 0) + count
+        question["sum_sq"] += rollup["sum_sq"]
+        for totals in (summary, leader, session, question):
+            totals["count"] += rollup["count"]
+            totals["sum"] += rollup["sum"]
+    
+    return summary
+
+
+def rollup_average(totals: dict) -> float:
+    return round(totals["sum"] / totals["count"], 2) if totals["count"] else 0
+
+
+def rollup_std_dev(totals: dict) -> float:
+    if not totals["count"]:
+        return 0
+    mean = totals["sum"] / totals["count"]
+    return round(max(totals["sum_sq"] / totals["count"] - mean * mean, 0) ** 0.5, 2)
+
+
+# ==================== PENDING EVALUATIONS ====================
+
+# pending_evaluations holds one (participant_email, session_id) row for every
+# session a participant still has to evaluate. Rows are seeded when an agenda
+# is published, a session becomes evaluable, a member joins or an evaluation
+# is sent out, and removed when the evaluation is submitted or the session
+# leaves the agenda. Session details are joined from agenda_sessions when
+# read, so agenda edits never leave them stale.
+
+def is_evaluable_session(row: dict) -> bool:
+    """Only taught sessions with a leader are evaluated"""
+    return row["session"].get("session_type") == "session" and bool(row.get("leader_id"))
+
+
+async def seed_pending_evaluations(
+    workshop_id: str,
+    emails: Optional[List[str]] = None,
+    session_ids: Optional[List[str]] = None,
+) -> int:
+    """Add pending rows for the workshop's sessions. Defaults to all sessions and all members."""
+    query = {"workshop_id": workshop_id}
+    if session_ids is not None:
+        query["id"] = {"$in": session_ids}
+    rows = await db.agenda_sessions.find(query, {"_id": 0, "id": 1, "leader_id": 1, "session.session_type": 1}).to_list(None)
+    session_ids = [row["id"] for row in rows if is_evaluable_session(row)]
+    
+    if emails is None:
+        members = await db.members.find({}, {"_id": 0, "email": 1}).to_list(None)
+        emails = [member.get("email") for member in members]
+    emails = [email for email in dict.fromkeys(emails) if email]
+    if not session_ids or not emails:
+        return 0
+    
+    submitted = await db.session_evaluations.find(
+        {"session_id": {"$in": session_ids}, "participant_email": {"$in": emails}},
+        {"_id": 0, "session_id": 1, "participant_email": 1}
+    ).to_list(None)
+    done = {(e["participant_email"], e["session_id"]) for e in submitted}
+    
+    now = datetime.now(timezone.utc).isoformat()
+    operations = [
+        UpdateOne(
+            {"participant_email": email, "session_id": session_id},
+            {"$setOnInsert": {"workshop_id": workshop_id, "created_at": now}},
+            upsert=True
+        )
+        for email in emails
+        for session_id in session_ids
+        if (email, session_id) not in done
+    ]
+    if operations:
+        await db.pending_evaluations.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def refresh_pending_evaluations(workshop_id: str, session_ids: Optional[List[str]] = None):
+    """Seed evaluable sessions and drop rows of sessions that are gone or no longer evaluated.
+    Defaults to every session of the workshop."""
+    await seed_pending_evaluations(workshop_id, session_ids=session_ids)
+    
+    query = {"workshop_id": workshop_id}
+    if session_ids is not None:
+        query["id"] = {"$in": session_ids}
+    rows = await db.agenda_sessions.find(query, {"_id": 0, "id": 1, "leader_id": 1, "session.session_type": 1}).to_list(None)
+    stale = {"$nin": [row["id"] for row in rows if is_evaluable_session(row)]}
+    if session_ids is not None:
+        stale["$in"] = session_ids
+    await db.pending_evaluations.delete_many({"workshop_id": workshop_id, "session_id": stale})
+
+
+async def seed_all_pending_evaluations(emails: Optional[List[str]] = None) -> int:
+    """Seed pending rows for every published agenda. Defaults to all members."""
+    total = 0
+    async for agenda in db.workshop_agendas.find({"is_published": True}, {"_id": 0, "workshop_id": 1}):
+        total += await seed_pending_evaluations(agenda["workshop_id"], emails=emails)
+    logging.info(f"Seeded {total} pending evaluations")
+    return total
+
+
+# ==================== SESSION EVALUATION ENDPOINTS ====================
+
+@api_router.post("/workshops/{workshop_id}/sessions/{session_id}/send-evaluation")
+async def send_evaluation_to_participants(workshop_id: str, session_id: str):
+    """Send evaluation link to all registered participants for a session"""
+    # Get workshop info
     workshop = await db.workshops.find_one({"id": workshop_id}, {"_id": 0})
     if not workshop:
         raise HTTPException(status_code=404, detail="Workshop not found")
@@ -3325,42 +4739,27 @@ async def send_evaluation_to_participants(workshop_id: str, session_id: str):
     </html>
     """
     
-    sent_count = 0
-    emails_sent = set()
-    
-    # Send to participants
-    for participant in participants:
-        email = participant.get("nominee_email") or participant.get("registration_data", {}).get("email")
-        if email and email not in emails_sent:
-            try:
-                await asyncio.to_thread(resend.Emails.send, {
-                    "from": SENDER_EMAIL,
-                    "to": [email],
-                    "subject": f"📝 Utvärdera: {session_data.get('title', 'Session')} - {workshop_title}",
-                    "html": html_content
-                })
-                emails_sent.add(email)
-                sent_count += 1
-            except Exception as e:
-                logging.error(f"Failed to send evaluation email to {email}: {str(e)}")
-    
-    # Send to members
-    for member in members:
-        email = member.get("email")
-        if email and email not in emails_sent:
-            try:
-                await asyncio.to_thread(resend.Emails.send, {
-                    "from": SENDER_EMAIL,
-                    "to": [email],
-                    "subject": f"📝 Utvärdera: {session_data.get('title', 'Session')} - {workshop_title}",
-                    "html": html_content
-                })
-                emails_sent.add(email)
-                sent_count += 1
-            except Exception as e:
-                logging.error(f"Failed to send evaluation email to {email}: {str(e)}")
+    subject = f"📝 Utvärdera: {session_data.get('title', 'Session')} - {workshop_title}"
+    recipients = [
+        participant.get("nominee_email") or participant.get("registration_data", {}).get("email")
+        for participant in participants
+    ] + [member.get("email") for member in members]
+    messages = [
+        {"from": SENDER_EMAIL, "to": [email], "subject": subject, "html": html_content}
+        for email in recipients if email
+    ]
     
-    return {"success": True, "message": f"Evaluation sent to {sent_count} participants", "sent_count": sent_count}
+    await seed_pending_evaluations(workshop_id, recipients, [session_id])
+    broadcast = await start_broadcast(
+        "evaluation", messages, {"workshop_id": workshop_id, "session_id": session_id}
+    )
+    sent_count = broadcast["total"]
+    return {
+        "success": True,
+        "message": f"Evaluation sent to {sent_count} participants",
+        "sent_count": sent_count,
+        "broadcast_id": broadcast["id"]
+    }
 
 
 @api_router.get("/member/pending-evaluations")
@@ -3376,38 +4775,31 @@ async def get_member_pending_evaluations(token: str):
         
         member_email = member.get("email")
         
-        # Get all published agendas
-        agendas = await db.workshop_agendas.find({"is_published": True}, {"_id": 0}).to_list(100)
-        
-        # Get evaluations already submitted by this member
-        submitted_evals = await db.session_evaluations.find(
-            {"participant_email": member_email},
-            {"_id": 0, "session_id": 1}
-        ).to_list(1000)
-        submitted_session_ids = {e["session_id"] for e in submitted_evals}
+        rows = await db.pending_evaluations.aggregate([
+            {"$match": {"participant_email": member_email}},
+            {"$lookup": {"from": "agenda_sessions", "localField": "session_id", "foreignField": "id", "as": "row"}},
+            {"$unwind": "$row"},
+            {"$replaceRoot": {"newRoot": "$row"}},
+            {"$sort": {"day_date": 1, "start_time": 1}},
+        ]).to_list(None)
         
         pending = []
-        for agenda in agendas:
-            workshop = await db.workshops.find_one({"id": agenda["workshop_id"]}, {"_id": 0})
-            workshop_title = workshop.get("title") if workshop else ""
+        for row in rows:
+            # Sessions edited since seeding may no longer need an evaluation
+            if not is_evaluable_session(row):
+                continue
+            workshop_title = row.get("workshop_title") or ""
             if isinstance(workshop_title, dict):
                 workshop_title = workshop_title.get("sv", workshop_title.get("en", ""))
-            
-            for day in agenda.get("days", []):
-                for session in day.get("sessions", []):
-                    # Only include sessions with leaders that haven't been evaluated
-                    if (session.get("session_type") == "session" and 
-                        session.get("leader_id") and 
-                        session.get("id") not in submitted_session_ids):
-                        pending.append({
-                            "workshop_id": agenda["workshop_id"],
-                            "workshop_title": workshop_title,
-                            "session_id": session.get("id"),
-                            "session_title": session.get("title"),
-                            "leader_name": session.get("leader_name"),
-                            "day_date": day.get("date"),
-                            "start_time": session.get("start_time")
-                        })
+            pending.append({
+                "workshop_id": row["workshop_id"],
+                "workshop_title": workshop_title,
+                "session_id": row["id"],
+                "session_title": row["session"].get("title"),
+                "leader_name": row["session"].get("leader_name"),
+                "day_date": row.get("day_date"),
+                "start_time": row.get("start_time")
+            })
         
         return pending
     except jwt.InvalidTokenError:
@@ -3487,39 +4879,52 @@ async def submit_evaluation(input: SessionEvaluationCreate):
         comment=input.comment
     )
     
-    await db.session_evaluations.insert_one(evaluation.model_dump())
+    evaluation_doc = evaluation.model_dump()
+    await db.session_evaluations.insert_one(evaluation_doc)
+    await update_evaluation_rollups(evaluation_doc)
+    await db.pending_evaluations.delete_one(
+        {"participant_email": input.participant_email, "session_id": input.session_id}
+    )
     return {"success": True, "id": evaluation.id}
 
 
 @api_router.get("/evaluations/session/{session_id}")
-async def get_session_evaluations(session_id: str, include_participant_info: bool = False):
+async def get_session_evaluations(
+    session_id: str,
+    response: Response,
+    include_participant_info: bool = False,
+    limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """Get all evaluations for a specific session (admin only)"""
     projection = {"_id": 0}
     if not include_participant_info:
         projection["participant_id"] = 0
         projection["participant_email"] = 0
     
-    evaluations = await db.session_evaluations.find(
-        {"session_id": session_id}, 
-        projection
-    ).to_list(1000)
-    
-    return evaluations
+    return await paginate(
+        db.session_evaluations, {"session_id": session_id}, projection,
+        "created_at", 1, limit, cursor, response
+    )
 
 
 @api_router.get("/evaluations/leader/{leader_id}")
-async def get_leader_evaluations(leader_id: str, workshop_id: Optional[str] = None):
+async def get_leader_evaluations(
+    leader_id: str,
+    response: Response,
+    workshop_id: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """Get all evaluations for a specific leader"""
     query = {"leader_id": leader_id}
     if workshop_id:
         query["workshop_id"] = workshop_id
     
-    evaluations = await db.session_evaluations.find(
-        query,
-        {"_id": 0, "participant_id": 0, "participant_email": 0}
-    ).to_list(1000)
-    
-    return evaluations
+    return await paginate(
+        db.session_evaluations, query, {"_id": 0, "participant_id": 0, "participant_email": 0},
+        "created_at", 1, limit, cursor, response
+    )
 
 
 @api_router.get("/evaluations/stats")
@@ -3537,9 +4942,9 @@ async def get_evaluation_statistics(
     if session_id:
         query["session_id"] = session_id
     
-    evaluations = await db.session_evaluations.find(query, {"_id": 0}).to_list(10000)
+    summary = await summarize_evaluation_rollups(query)
     
-    if not evaluations:
+    if not summary["total_evaluations"]:
         return {
             "total_evaluations": 0,
             "overall_average": 0,
@@ -3548,119 +4953,72 @@ async def get_evaluation_statistics(
             "sessions_stats": []
         }
     
-    # Get all questions for reference
-    questions = await db.evaluation_questions.find({}, {"_id": 0}).to_list(100)
+    # Only look up the questions that were actually answered
+    question_ids = list(summary["questions"])
+    questions = await db.evaluation_questions.find(
+        {"id": {"$in": question_ids}},
+        {"_id": 0, "id": 1, "text_sv": 1, "order": 1}
+    ).to_list(len(question_ids))
     questions_map = {q["id"]: q for q in questions}
     
-    # Calculate statistics
-    total_evaluations = len(evaluations)
-    all_ratings = []
-    questions_ratings = {}  # question_id -> list of ratings
-    leaders_ratings = {}    # leader_id -> {name, ratings: []}
-    sessions_ratings = {}   # session_id -> {title, leader, ratings: []}
-    
-    for eval in evaluations:
-        leader_id = eval.get("leader_id")
-        session_id = eval.get("session_id")
-        
-        # Initialize leader stats
-        if leader_id not in leaders_ratings:
-            leaders_ratings[leader_id] = {
-                "leader_id": leader_id,
-                "leader_name": eval.get("leader_name", "Okänd"),
-                "ratings": [],
-                "evaluation_count": 0
-            }
-        leaders_ratings[leader_id]["evaluation_count"] += 1
-        
-        # Initialize session stats
-        if session_id not in sessions_ratings:
-            sessions_ratings[session_id] = {
-                "session_id": session_id,
-                "session_title": eval.get("session_title", "Okänd session"),
-                "leader_name": eval.get("leader_name"),
-                "ratings": [],
-                "evaluation_count": 0
-            }
-        sessions_ratings[session_id]["evaluation_count"] += 1
-        
-        for answer in eval.get("answers", []):
-            rating = answer.get("rating", 0)
-            q_id = answer.get("question_id")
-            
-            all_ratings.append(rating)
-            
-            # Per question
-            if q_id not in questions_ratings:
-                questions_ratings[q_id] = []
-            questions_ratings[q_id].append(rating)
-            
-            # Per leader
-            leaders_ratings[leader_id]["ratings"].append(rating)
-            
-            # Per session
-            sessions_ratings[session_id]["ratings"].append(rating)
-    
-    # Calculate averages
-    overall_average = sum(all_ratings) / len(all_ratings) if all_ratings else 0
-    
     questions_stats = []
-    for q_id, ratings in questions_ratings.items():
-        q_info = questions_map.get(q_id, {})
-        avg = sum(ratings) / len(ratings) if ratings else 0
+    for q_id in sorted(question_ids, key=lambda q_id: questions_map.get(q_id, {}).get("order", 0)):
+        totals = summary["questions"][q_id]
         questions_stats.append({
             "question_id": q_id,
-            "question_text": q_info.get("text_sv", "Okänd fråga"),
-            "average_rating": round(avg, 2),
-            "response_count": len(ratings),
-            "min_rating": min(ratings) if ratings else 0,
-            "max_rating": max(ratings) if ratings else 0
+            "question_text": questions_map.get(q_id, {}).get("text_sv", "Okänd fråga"),
+            "average_rating": rollup_average(totals),
+            "response_count": totals["count"],
+            "min_rating": totals["min"],
+            "max_rating": totals["max"],
+            "std_dev": rollup_std_dev(totals),
+            "rating_distribution": totals["histogram"]
         })
     
     leaders_comparison = []
-    for leader_data in leaders_ratings.values():
-        ratings = leader_data["ratings"]
-        avg = sum(ratings) / len(ratings) if ratings else 0
+    for l_id, totals in summary["leaders"].items():
         leaders_comparison.append({
-            "leader_id": leader_data["leader_id"],
-            "leader_name": leader_data["leader_name"],
-            "average_rating": round(avg, 2),
-            "evaluation_count": leader_data["evaluation_count"],
-            "total_ratings": len(ratings)
+            "leader_id": l_id,
+            "leader_name": totals["leader_name"],
+            "average_rating": rollup_average(totals),
+            "evaluation_count": totals["evaluations"],
+            "total_ratings": totals["count"]
         })
     leaders_comparison.sort(key=lambda x: x["average_rating"], reverse=True)
     
     sessions_stats = []
-    for session_data in sessions_ratings.values():
-        ratings = session_data["ratings"]
-        avg = sum(ratings) / len(ratings) if ratings else 0
+    for s_id, totals in summary["sessions"].items():
         sessions_stats.append({
-            "session_id": session_data["session_id"],
-            "session_title": session_data["session_title"],
-            "leader_name": session_data["leader_name"],
-            "average_rating": round(avg, 2),
-            "evaluation_count": session_data["evaluation_count"]
+            "session_id": s_id,
+            "session_title": totals["session_title"],
+            "leader_name": totals["leader_name"],
+            "average_rating": rollup_average(totals),
+            "evaluation_count": totals["evaluations"]
         })
     sessions_stats.sort(key=lambda x: x["average_rating"], reverse=True)
     
     return {
-        "total_evaluations": total_evaluations,
-        "overall_average": round(overall_average, 2),
+        "total_evaluations": summary["total_evaluations"],
+        "overall_average": rollup_average(summary),
         "questions_stats": questions_stats,
         "leaders_comparison": leaders_comparison,
         "sessions_stats": sessions_stats
     }
 
 
+@api_router.post("/evaluations/rollups/rebuild")
+async def rebuild_evaluation_statistics():
+    """Recompute the evaluation rollups from all submitted evaluations (admin)"""
+    result = await rebuild_evaluation_rollups()
+    return {"success": True, **result}
+
+
 @api_router.get("/evaluations/leader/{leader_id}/detailed")
 async def get_leader_detailed_stats(leader_id: str):
     """Get detailed statistics for a specific leader including per-question breakdown"""
-    evaluations = await db.session_evaluations.find(
-        {"leader_id": leader_id},
-        {"_id": 0, "participant_id": 0, "participant_email": 0}
-    ).to_list(1000)
+    summary = await summarize_evaluation_rollups({"leader_id": leader_id})
     
-    if not evaluations:
+    if not summary["total_evaluations"]:
         return {
             "leader_id": leader_id,
             "total_evaluations": 0,
@@ -3677,53 +5035,25 @@ async def get_leader_detailed_stats(leader_id: str):
     # Get leader info
     leader = await db.leaders.find_one({"id": leader_id}, {"_id": 0})
     
-    # Organize by session
-    sessions_data = {}
-    questions_ratings = {}
-    
-    for eval in evaluations:
-        s_id = eval.get("session_id")
-        if s_id not in sessions_data:
-            sessions_data[s_id] = {
-                "session_id": s_id,
-                "session_title": eval.get("session_title"),
-                "evaluations": [],
-                "ratings": []
-            }
-        sessions_data[s_id]["evaluations"].append(eval)
-        
-        for answer in eval.get("answers", []):
-            q_id = answer.get("question_id")
-            rating = answer.get("rating", 0)
-            
-            sessions_data[s_id]["ratings"].append(rating)
-            
-            if q_id not in questions_ratings:
-                questions_ratings[q_id] = []
-            questions_ratings[q_id].append(rating)
-    
     # Calculate per-session averages
     sessions_summary = []
-    for s_data in sessions_data.values():
-        ratings = s_data["ratings"]
-        avg = sum(ratings) / len(ratings) if ratings else 0
+    for s_id, totals in summary["sessions"].items():
         sessions_summary.append({
-            "session_id": s_data["session_id"],
-            "session_title": s_data["session_title"],
-            "evaluation_count": len(s_data["evaluations"]),
-            "average_rating": round(avg, 2)
+            "session_id": s_id,
+            "session_title": totals["session_title"],
+            "evaluation_count": totals["evaluations"],
+            "average_rating": rollup_average(totals)
         })
     
     # Calculate per-question breakdown
     questions_breakdown = []
-    for q_id, ratings in questions_ratings.items():
+    for q_id, totals in summary["questions"].items():
         q_info = questions_map.get(q_id, {})
-        avg = sum(ratings) / len(ratings) if ratings else 0
         questions_breakdown.append({
             "question_id": q_id,
             "question_text": q_info.get("text_sv", "Okänd fråga"),
-            "average_rating": round(avg, 2),
-            "response_count": len(ratings)
+            "average_rating": rollup_average(totals),
+            "response_count": totals["count"]
         })
     
     # Sort to identify strengths and improvement areas
@@ -3736,9 +5066,8 @@ async def get_leader_detailed_stats(leader_id: str):
         "leader_id": leader_id,
         "leader_name": leader.get("name") if leader else "Okänd",
         "leader_email": leader.get("email") if leader else None,
-        "total_evaluations": len(evaluations),
-        "overall_average": round(sum(sum(s["ratings"]) for s in sessions_data.values()) / 
-                                  sum(len(s["ratings"]) for s in sessions_data.values()), 2) if sessions_data else 0,
+        "total_evaluations": summary["total_evaluations"],
+        "overall_average": rollup_average(summary),
         "sessions": sessions_summary,
         "questions_breakdown": questions_breakdown,
         "strengths": strengths,
@@ -3817,12 +5146,12 @@ async def send_leader_feedback(input: LeaderFeedbackCreate):
     """
     
     try:
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [leader_email],
             "subject": f"{feedback_type_text}: {input.subject}",
             "html": html_content
-        })
+        }, tag="leader_feedback")
         
         # Save feedback record
         feedback = LeaderFeedback(
@@ -3912,14 +5241,17 @@ class TrainingParticipantAttendanceUpdate(BaseModel):
 
 
 @api_router.get("/training-participants")
-async def get_training_participants():
+async def get_training_participants(
+    response: Response,
+    limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """Get all nominations that have completed registration (training participants)"""
     # Find all nominations where registration has been completed
-    participants = await db.nominations.find(
-        {"registration_completed": True},
-        {"_id": 0}
-    ).sort("created_at", -1).to_list(1000)
-    return participants
+    return await paginate(
+        db.nominations, {"registration_completed": True}, {"_id": 0},
+        "created_at", -1, limit, cursor, response
+    )
 
 
 @api_router.get("/training-participants/{participant_id}")
@@ -3975,168 +5307,499 @@ async def update_training_participant_attendance(participant_id: str, input: Tra
     updated = await db.nominations.find_one({"id": participant_id}, {"_id": 0})
     return updated
 
+# Breaks, lunch and registration don't count towards the 21 hours
+NON_TEACHING_SESSION_TYPES = {"break", "lunch", "registration"}
 
-def generate_diploma_pdf(participant_name: str, event_title: str, event_date: str = None, chairman_name: str = "Bashar Yousif") -> BytesIO:
-    """Generate a PDF diploma certificate with Haggai logo"""
-    buffer = BytesIO()
+
+def session_duration_hours(session: dict) -> float:
+    """Length of an agenda session from its "HH:MM" start and end times"""
+    try:
+        start_h, start_m = map(int, session["start_time"].split(":"))
+        end_h, end_m = map(int, session["end_time"].split(":"))
+    except (KeyError, ValueError, AttributeError):
+        return 0.0
+    minutes = (end_h * 60 + end_m) - (start_h * 60 + start_m)
+    return max(minutes, 0) / 60
+
+
+@api_router.post("/workshops/{workshop_id}/attendance/compute")
+async def compute_workshop_attendance(workshop_id: str):
+    """Set attendance hours for all training participants of a workshop from their session check-ins"""
+    agenda = await db.workshop_agendas.find_one({"workshop_id": workshop_id}, {"_id": 0, "days": 1})
+    if not agenda:
+        raise HTTPException(status_code=404, detail="Workshop agenda not found")
     
-    # Create PDF with landscape A4
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=landscape(A4),
-        leftMargin=1.5*cm,
-        rightMargin=1.5*cm,
-        topMargin=1*cm,
-        bottomMargin=1*cm
-    )
+    session_hours = {
+        session["id"]: session_duration_hours(session)
+        for day in agenda.get("days", [])
+        for session in day.get("sessions", [])
+        if session.get("id") and session.get("session_type", "session") not in NON_TEACHING_SESSION_TYPES
+    }
     
-    # Define colors - Haggai blue from logo
-    haggai_blue = colors.HexColor('#014D73')
-    gold = colors.HexColor('#c9a227')
-    
-    # Create styles
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=26,
-        textColor=haggai_blue,
-        alignment=TA_CENTER,
-        spaceAfter=10,
-        fontName='Helvetica-Bold',
-        letterSpacing=6
-    )
+    # Scans still in the write-behind buffer count too
+    await checkin_service.flush()
+    attended = await db.checkins.aggregate([
+        {"$match": {
+            "workshop_id": workshop_id,
+            "badge_type": "participant",
+            "session_id": {"$in": list(session_hours)},
+        }},
+        {"$group": {"_id": "$person_id", "sessions": {"$addToSet": "$session_id"}}},
+    ]).to_list(None)
+    if not attended:
+        # Don't wipe hours that were entered by hand for a seminar without scanning
+        raise HTTPException(status_code=400, detail="No session check-ins recorded for this workshop")
+    sessions_by_person = {row["_id"]: row["sessions"] for row in attended}
     
-    subtitle_style = ParagraphStyle(
-        'Subtitle',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=haggai_blue,
-        alignment=TA_CENTER,
-        spaceAfter=20,
-        fontName='Helvetica'
-    )
+    participants = await db.nominations.find(
+        {"event_id": workshop_id, "registration_completed": True},
+        {"_id": 0, "id": 1, "status": 1, "attendance_hours": 1}
+    ).to_list(None)
     
-    name_style = ParagraphStyle(
-        'Name',
-        parent=styles['Heading1'],
-        fontSize=36,
-        textColor=haggai_blue,
-        alignment=TA_CENTER,
-        spaceBefore=20,
-        spaceAfter=20,
-        fontName='Helvetica-Bold'
-    )
+    now = datetime.now(timezone.utc).isoformat()
+    operations = []
+    results = []
+    for participant in participants:
+        hours = round(sum(session_hours[s] for s in sessions_by_person.get(participant["id"], [])), 2)
+        # Same rule as a manual update: 21 hours completes, fewer keeps the current status
+        status = "completed" if hours >= 21 else participant.get("status", "pending")
+        results.append({"participant_id": participant["id"], "attendance_hours": hours, "status": status})
+        if hours != participant.get("attendance_hours") or status != participant.get("status"):
+            operations.append(UpdateOne(
+                {"id": participant["id"]},
+                {"$set": {"attendance_hours": hours, "status": status, "updated_at": now}}
+            ))
+    
+    if operations:
+        await db.nominations.bulk_write(operations, ordered=False)
     
-    body_style = ParagraphStyle(
-        'Body',
-        parent=styles['Normal'],
-        fontSize=14,
-        textColor=colors.black,
-        alignment=TA_CENTER,
-        spaceBefore=15,
-        spaceAfter=15,
-        leading=20
-    )
+    return {
+        "workshop_id": workshop_id,
+        "agenda_hours": round(sum(session_hours.values()), 2),
+        "participants": len(participants),
+        "updated": len(operations),
+        "completed": sum(1 for r in results if r["status"] == "completed"),
+        "results": results,
+    }
+
+
+# ==================== PDF RENDERING ====================
+
+PDF_FONTS = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique')
+PDF_LOGO_PATH = ROOT_DIR / 'haggai_logo.png'
+PDF_LOGO_MAX_PIXELS = 600  # about 380 dpi at the largest size the logo is printed
+
+# Fonts, logo and styles shared by every render; filled once per process
+_pdf_assets = {}
+
+
+def load_pdf_assets() -> dict:
+    """Load fonts, the encoded logo and paragraph styles once per process"""
+    if not _pdf_assets:
+        for font_name in PDF_FONTS:
+            pdfmetrics.getFont(font_name)
+        styles = getSampleStyleSheet()
+        _pdf_assets["logo"] = load_pdf_logo() if PDF_LOGO_PATH.exists() else None
+        _pdf_assets["badge_styles"] = {
+            badge_type: build_name_badge_styles(styles, badge_type)
+            for badge_type in ("participant", "leader")
+        }
+    return _pdf_assets
+
+
+def load_pdf_logo() -> ImageReader:
+    """The logo as a print-sized JPEG.
     
-    signature_style = ParagraphStyle(
-        'Signature',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=colors.black,
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
+    Decoding and re-compressing the PNG used to dominate every render;
+    reportlab embeds JPEG data as it is, so each document only copies it.
+    """
+    with Image.open(PDF_LOGO_PATH) as image:
+        image = image.convert("RGB")
+        image.thumbnail((PDF_LOGO_MAX_PIXELS, PDF_LOGO_MAX_PIXELS), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=92)
+    buffer.seek(0)
+    return ImageReader(buffer)
+
+
+def draw_pdf_logo(c: canvas.Canvas, x: float, y: float, width: float, height: float) -> bool:
+    logo = load_pdf_assets()["logo"]
+    if logo is None:
+        return False
+    c.drawImage(logo, x, y, width, height)
+    return True
+
+
+def fit_font_size(text: str, font_name: str, font_size: float, max_width: float, min_size: float = 6) -> float:
+    """Largest size up to font_size at which text fits on one line"""
+    width = pdfmetrics.stringWidth(text, font_name, font_size)
+    if width <= max_width:
+        return font_size
+    return max(min_size, font_size * max_width / width)
+
+
+def _init_pdf_worker():
+    """Process pool initializer: load fonts, logo and styles before the first job"""
+    # Render workers only write PDFs, which are served over HTTP and as
+    # attachments, never as 7-bit text; ASCII85 only made every stream 25%
+    # bigger and slower to write
+    rl_config.useA85 = 0
+    load_pdf_assets()
+
+
+def _pdf_worker_ready() -> int:
+    return os.getpid()
+
+
+def _render_pdf(kind: str, kwargs: dict) -> bytes:
+    return PDF_RENDERERS[kind](**kwargs).getvalue()
+
+
+class PdfRenderService:
+    """Renders PDFs in a pool of warm worker processes so reportlab never blocks the event loop.
+    
+    Jobs beyond max_pending (running + queued) are rejected with 503, and a job
+    that doesn't finish within timeout answers 504. A timed-out job keeps its
+    slot until the worker actually finishes, so a stuck render can't let the
+    queue grow without bound.
+    """
+    
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._pending = 0
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # spawn: forking a process that runs an event loop and thread pools is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pdf_worker
+            )
+        return self._executor
+    
+    def _reset_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    async def warm_up(self):
+        """Start every worker now instead of on the first request"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(executor, _pdf_worker_ready) for _ in range(self.workers)
+        ])
+        logging.info(f"PDF render workers ready: {sorted(set(pids))}")
+    
+    async def render(self, kind: str, **kwargs) -> bytes:
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="Servern är upptagen, försök igen om en stund",
+                headers={"Retry-After": "5"}
+            )
+        
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._get_executor().submit(_render_pdf, kind, kwargs)
+        except BrokenProcessPool:
+            # A worker died earlier; start a fresh pool
+            self._reset_executor()
+            job = self._get_executor().submit(_render_pdf, kind, kwargs)
+        
+        self._pending += 1
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+        except asyncio.TimeoutError:
+            logging.error(f"PDF render timed out after {self.timeout}s: {kind}")
+            raise HTTPException(status_code=504, detail="PDF-genereringen tog för lång tid")
+        except BrokenProcessPool:
+            logging.error(f"PDF render worker crashed: {kind}")
+            self._reset_executor()
+            raise HTTPException(status_code=503, detail="PDF-genereringen misslyckades, försök igen")
     
-    role_style = ParagraphStyle(
-        'Role',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.gray,
-        alignment=TA_CENTER,
-        fontName='Helvetica'
+    def _release(self):
+        self._pending -= 1
+    
+    def shutdown(self):
+        self._reset_executor()
+
+
+pdf_renderer = PdfRenderService(PDF_RENDER_WORKERS, PDF_RENDER_MAX_PENDING, PDF_RENDER_TIMEOUT_SECONDS)
+
+
+# Bump whenever the diploma or badge layout changes so cached PDFs are re-rendered
+PDF_TEMPLATE_VERSION = "4"
+
+
+def pdf_cache_key(kind: str, inputs: dict) -> str:
+    """Content address of a PDF: hash of everything that goes into rendering it"""
+    payload = json.dumps(
+        {"kind": kind, "template_version": PDF_TEMPLATE_VERSION, "inputs": inputs},
+        sort_keys=True,
+        default=str
     )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PdfCache:
+    """Rendered PDFs on local disk, named {kind}-{owner}-{key}.pdf.
     
-    # Build content
-    story = []
+    Size-bounded with least-recently-used eviction: hits touch the file's
+    mtime and the oldest files are removed once max_bytes is exceeded.
+    The owner part of the name lets all PDFs for one person be dropped
+    when their data changes.
+    """
     
-    # Add Haggai logo at top
-    logo_path = ROOT_DIR / 'haggai_logo.png'
-    if logo_path.exists():
-        logo = Image(str(logo_path), width=4*cm, height=2.8*cm)
-        logo.hAlign = 'CENTER'
-        story.append(logo)
-        story.append(Spacer(1, 0.5*cm))
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
     
-    # Main title
-    story.append(Paragraph("A D V A N C E D   L E A D E R S H I P   S E M I N A R", title_style))
+    def _path(self, kind: str, owner: str, key: str) -> Path:
+        return self.directory / f"{kind}-{owner}-{key}.pdf"
     
-    # Event subtitle
-    event_subtitle = event_title
-    if event_date:
-        event_subtitle += f" – {event_date}"
-    story.append(Paragraph(event_subtitle, subtitle_style))
+    def _entries(self) -> list:
+        if not self.directory.exists():
+            return []
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".pdf")]
+    
+    def _read(self, path: Path) -> Optional[bytes]:
+        try:
+            content = path.read_bytes()
+            os.utime(path)
+            return content
+        except FileNotFoundError:
+            return None
+    
+    def _write(self, path: Path, content: bytes):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+        
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        else:
+            self._size += len(content)
+        if self._size > self.max_bytes:
+            self._evict()
+    
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._size = total
+    
+    def _invalidate(self, owner: str) -> int:
+        removed = 0
+        for entry in self._entries():
+            if f"-{owner}-" in entry.name:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        self._size = None
+        return removed
+    
+    async def get(self, kind: str, owner: str, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, self._path(kind, owner, key))
+    
+    async def put(self, kind: str, owner: str, key: str, content: bytes):
+        await asyncio.to_thread(self._write, self._path(kind, owner, key), content)
+    
+    async def invalidate(self, owner: str) -> int:
+        """Drop every cached PDF belonging to owner"""
+        return await asyncio.to_thread(self._invalidate, owner)
+
+
+pdf_cache = PdfCache(PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES)
+
+# Renders in progress by cache key, so concurrent requests for one PDF share a render
+_pdf_renders_in_flight = {}
+
+
+async def render_pdf_cached(kind: str, owner: str, inputs: dict, key: str) -> bytes:
+    """Serve a PDF from the cache, rendering it in the process pool on a miss"""
+    content = await pdf_cache.get(kind, owner, key)
+    if content is not None:
+        return content
     
-    story.append(Spacer(1, 0.5*cm))
+    in_flight = _pdf_renders_in_flight.get(key)
+    if in_flight:
+        return await asyncio.shield(in_flight)
     
-    # Decorative line
-    line_table = Table([['']], colWidths=[400])
-    line_table.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (-1, -1), 2, gold),
-    ]))
-    story.append(line_table)
+    async def render() -> bytes:
+        try:
+            content = await pdf_renderer.render(kind, **inputs)
+            try:
+                await pdf_cache.put(kind, owner, key, content)
+            except OSError as e:
+                logging.error(f"Failed to cache {kind} PDF: {e}")
+            return content
+        finally:
+            _pdf_renders_in_flight.pop(key, None)
+    
+    task = asyncio.create_task(render())
+    _pdf_renders_in_flight[key] = task
+    return await asyncio.shield(task)
+
+
+def pdf_response(content: Optional[bytes], key: str, filename: str, disposition: str = "attachment") -> Response:
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, no-cache",
+    }
+    if content is None:
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+    return Response(content=content, media_type="application/pdf", headers=headers)
+
+
+def etag_matches(if_none_match: Optional[str], key: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or f'"{key}"' in tags
+
+
+
+# Diploma layout: landscape A4, positions measured from the top edge
+DIPLOMA_PAGE_WIDTH, DIPLOMA_PAGE_HEIGHT = landscape(A4)
+DIPLOMA_TEXT_WIDTH = DIPLOMA_PAGE_WIDTH - 3*cm - 12
+DIPLOMA_BLUE = colors.HexColor('#014D73')
+DIPLOMA_GOLD = colors.HexColor('#c9a227')
+DIPLOMA_TITLE = "A D V A N C E D L E A D E R S H I P S E M I N A R"
+DIPLOMA_BODY_TEXT = (
+    "Having successfully completed the specialized studies in Advanced Leadership "
+    "as prescribed by Haggai International, is hereby awarded this Certificate of Completion."
+)
+DIPLOMA_SIGNATURE_COLUMNS = (245.9, 595.9)
+
+
+def draw_diploma_artwork(c: canvas.Canvas):
+    """Everything on the diploma that is the same for every participant"""
+    center_x = DIPLOMA_PAGE_WIDTH / 2
+    top = DIPLOMA_PAGE_HEIGHT
     
-    # Participant name
-    story.append(Paragraph(participant_name, name_style))
+    # Haggai logo
+    draw_pdf_logo(c, center_x - 2*cm, top - 1*cm - 6 - 2.8*cm, 4*cm, 2.8*cm)
     
-    # Decorative line
-    story.append(line_table)
+    # Main title
+    c.setFillColor(DIPLOMA_BLUE)
+    c.setFont('Helvetica-Bold', 26)
+    c.drawCentredString(center_x, top - 153.9, DIPLOMA_TITLE)
     
-    story.append(Spacer(1, 0.5*cm))
+    # Decorative gold lines around the name
+    c.setStrokeColor(DIPLOMA_GOLD)
+    c.setLineWidth(2)
+    for line_y in (214.1, 294.1):
+        c.line(center_x - 200, top - line_y, center_x + 200, top - line_y)
     
     # Body text
-    body_text = """Having successfully completed the specialized studies in Advanced Leadership 
-    as prescribed by Haggai International, is hereby awarded this Certificate of Completion."""
-    story.append(Paragraph(body_text, body_style))
+    c.setFillColor(colors.black)
+    c.setFont('Helvetica', 14)
+    for i, line in enumerate(simpleSplit(DIPLOMA_BODY_TEXT, 'Helvetica', 14, DIPLOMA_TEXT_WIDTH)):
+        c.drawCentredString(center_x, top - 355.2 - i * 20, line)
+    
+    # Signature lines with fixed signer and both roles
+    c.setStrokeColor(colors.black)
+    c.setLineWidth(1)
+    for column_x in DIPLOMA_SIGNATURE_COLUMNS:
+        c.line(column_x - 100, top - 479.1, column_x + 100, top - 479.1)
+    c.setFont('Helvetica', 12)
+    c.drawCentredString(DIPLOMA_SIGNATURE_COLUMNS[0], top - 494.1, "Dr. Bev Upton Williams")
+    c.setFillColor(colors.gray)
+    c.setFont('Helvetica', 10)
+    c.drawCentredString(DIPLOMA_SIGNATURE_COLUMNS[0], top - 510.1, "CEO, Haggai International")
+    c.drawCentredString(DIPLOMA_SIGNATURE_COLUMNS[1], top - 510.1, "President of the Association")
+
+
+def generate_diploma_pdf(participant_name: str, event_title: str, event_date: str = None, chairman_name: str = "Bashar Yousif") -> BytesIO:
+    """Generate a PDF diploma certificate with Haggai logo.
     
-    story.append(Spacer(1, 1*cm))
+    The fixed artwork is a form XObject; only the name, event and date are
+    laid out per participant.
+    """
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape(A4))
+    center_x = DIPLOMA_PAGE_WIDTH / 2
+    top = DIPLOMA_PAGE_HEIGHT
     
-    # Date
-    completion_date = event_date if event_date else datetime.now().strftime("%B %Y")
-    story.append(Paragraph(f"<b>D A T E:</b>  {completion_date}", signature_style))
+    c.beginForm("diploma-artwork")
+    draw_diploma_artwork(c)
+    c.endForm()
+    c.doForm("diploma-artwork")
     
-    story.append(Spacer(1, 1.5*cm))
+    # Event subtitle
+    event_subtitle = event_title
+    if event_date:
+        event_subtitle += f" – {event_date}"
+    c.setFillColor(DIPLOMA_BLUE)
+    c.setFont('Helvetica', fit_font_size(event_subtitle, 'Helvetica', 16, DIPLOMA_TEXT_WIDTH))
+    c.drawCentredString(center_x, top - 177.9, event_subtitle)
     
-    # Signatures table
-    signature_data = [
-        [
-            Paragraph("Dr. Bev Upton Williams", signature_style),
-            "",
-            Paragraph(chairman_name, signature_style)
-        ],
-        [
-            Paragraph("CEO, Haggai International", role_style),
-            "",
-            Paragraph("President of the Association", role_style)
-        ]
-    ]
+    # Participant name; long names shrink, then wrap upwards
+    name_size = fit_font_size(participant_name, 'Helvetica-Bold', 36, DIPLOMA_TEXT_WIDTH, min_size=24)
+    name_lines = simpleSplit(participant_name, 'Helvetica-Bold', name_size, DIPLOMA_TEXT_WIDTH)
+    c.setFont('Helvetica-Bold', name_size)
+    for i, line in enumerate(reversed(name_lines)):
+        c.drawCentredString(center_x, top - 288.1 + i * (name_size + 4), line)
     
-    sig_table = Table(signature_data, colWidths=[200, 150, 200])
-    sig_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LINEABOVE', (0, 0), (0, 0), 1, colors.black),
-        ('LINEABOVE', (2, 0), (2, 0), 1, colors.black),
-    ]))
-    story.append(sig_table)
-    
-    # Build PDF
-    doc.build(story)
+    # Date
+    completion_date = event_date if event_date else datetime.now().strftime("%B %Y")
+    date_label = "D A T E:"
+    date_value = f"  {completion_date}"
+    date_width = pdfmetrics.stringWidth(date_label, 'Helvetica-Bold', 12) + pdfmetrics.stringWidth(date_value, 'Helvetica', 12)
+    date_line = c.beginText()
+    date_line.setTextOrigin(center_x - date_width / 2, top - 436.6)
+    date_line.setFillColor(colors.black)
+    date_line.setFont('Helvetica-Bold', 12)
+    date_line.textOut(date_label)
+    date_line.setFont('Helvetica', 12)
+    date_line.textOut(date_value)
+    c.drawText(date_line)
+    
+    c.setFont('Helvetica', 12)
+    c.drawCentredString(DIPLOMA_SIGNATURE_COLUMNS[1], top - 494.1, chairman_name)
+    
+    c.showPage()
+    c.save()
     buffer.seek(0)
     return buffer
 
 
+def diploma_render_inputs(participant: dict) -> dict:
+    registration_data = participant.get("registration_data", {})
+    return {
+        "participant_name": registration_data.get("full_name", participant.get("nominee_name", "Unknown")),
+        "event_title": participant.get("event_title", "Haggai Leadership Seminar"),
+        "event_date": participant.get("event_date", ""),
+    }
+
+
+def diploma_cache_key(inputs: dict) -> str:
+    # Without an event date the diploma prints the current month, so it is part of the content
+    key_inputs = dict(inputs)
+    if not inputs.get("event_date"):
+        key_inputs["completion_month"] = datetime.now().strftime("%B %Y")
+    return pdf_cache_key("diploma", key_inputs)
+
+
 @api_router.post("/training-participants/{participant_id}/generate-diploma")
 async def generate_training_participant_diploma(participant_id: str):
     """Generate a PDF diploma for a training participant"""
@@ -4152,27 +5815,14 @@ async def generate_training_participant_diploma(participant_id: str):
     if attendance_hours < 21:
         raise HTTPException(status_code=400, detail=f"Participant has only {attendance_hours} hours. 21 hours required for diploma.")
     
-    # Get participant name from registration data
-    registration_data = participant.get("registration_data", {})
-    participant_name = registration_data.get("full_name", participant.get("nominee_name", "Unknown"))
-    event_title = participant.get("event_title", "Haggai Leadership Seminar")
-    event_date = participant.get("event_date", "")
+    inputs = diploma_render_inputs(participant)
+    participant_name = inputs["participant_name"]
+    key = diploma_cache_key(inputs)
     
-    # Generate PDF
-    pdf_buffer = generate_diploma_pdf(
-        participant_name=participant_name,
-        event_title=event_title,
-        event_date=event_date
-    )
+    pdf_content = await render_pdf_cached("diploma", participant_id, inputs, key)
     
     # Return PDF as download
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="Diploma_{participant_name.replace(" ", "_")}.pdf"'
-        }
-    )
+    return pdf_response(pdf_content, key, f"Diploma_{participant_name.replace(' ', '_')}.pdf")
 
 
 @api_router.post("/training-participants/{participant_id}/preview-diploma")
@@ -4190,21 +5840,13 @@ async def preview_training_participant_diploma(participant_id: str):
     if attendance_hours < 21:
         raise HTTPException(status_code=400, detail=f"Participant has only {attendance_hours} hours. 21 hours required for diploma.")
     
-    # Get participant name from registration data
-    registration_data = participant.get("registration_data", {})
-    participant_name = registration_data.get("full_name", participant.get("nominee_name", "Unknown"))
-    event_title = participant.get("event_title", "Haggai Leadership Seminar")
-    event_date = participant.get("event_date", "")
+    inputs = diploma_render_inputs(participant)
+    participant_name = inputs["participant_name"]
+    key = diploma_cache_key(inputs)
     
-    # Generate PDF
-    pdf_buffer = generate_diploma_pdf(
-        participant_name=participant_name,
-        event_title=event_title,
-        event_date=event_date
-    )
+    pdf_content = await render_pdf_cached("diploma", participant_id, inputs, key)
     
     # Return as base64
-    pdf_content = pdf_buffer.read()
     pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
     
     return {
@@ -4214,7 +5856,7 @@ async def preview_training_participant_diploma(participant_id: str):
 
 
 @api_router.get("/training-participants/{participant_id}/view-diploma")
-async def view_training_participant_diploma(participant_id: str):
+async def view_training_participant_diploma(participant_id: str, if_none_match: Optional[str] = Header(None)):
     """View diploma PDF in browser (inline)"""
     participant = await db.nominations.find_one(
         {"id": participant_id, "registration_completed": True},
@@ -4227,28 +5869,19 @@ async def view_training_participant_diploma(participant_id: str):
     if attendance_hours < 21:
         raise HTTPException(status_code=400, detail=f"Participant has only {attendance_hours} hours. 21 hours required for diploma.")
     
-    registration_data = participant.get("registration_data", {})
-    participant_name = registration_data.get("full_name", participant.get("nominee_name", "Unknown"))
-    event_title = participant.get("event_title", "Haggai Leadership Seminar")
-    event_date = participant.get("event_date", "")
+    inputs = diploma_render_inputs(participant)
+    participant_name = inputs["participant_name"]
+    key = diploma_cache_key(inputs)
+    if etag_matches(if_none_match, key):
+        return pdf_response(None, key, f"Diploma_{participant_name.replace(' ', '_')}.pdf", "inline")
     
-    pdf_buffer = generate_diploma_pdf(
-        participant_name=participant_name,
-        event_title=event_title,
-        event_date=event_date
-    )
+    pdf_content = await render_pdf_cached("diploma", participant_id, inputs, key)
     
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'inline; filename="Diploma_{participant_name.replace(" ", "_")}.pdf"'
-        }
-    )
+    return pdf_response(pdf_content, key, f"Diploma_{participant_name.replace(' ', '_')}.pdf", "inline")
 
 
 @api_router.get("/training-participants/{participant_id}/download-diploma")
-async def download_training_participant_diploma(participant_id: str):
+async def download_training_participant_diploma(participant_id: str, if_none_match: Optional[str] = Header(None)):
     """Download diploma PDF as attachment"""
     participant = await db.nominations.find_one(
         {"id": participant_id, "registration_completed": True},
@@ -4261,27 +5894,18 @@ async def download_training_participant_diploma(participant_id: str):
     if attendance_hours < 21:
         raise HTTPException(status_code=400, detail=f"Participant has only {attendance_hours} hours. 21 hours required for diploma.")
     
-    registration_data = participant.get("registration_data", {})
-    participant_name = registration_data.get("full_name", participant.get("nominee_name", "Unknown"))
-    event_title = participant.get("event_title", "Haggai Leadership Seminar")
-    event_date = participant.get("event_date", "")
+    inputs = diploma_render_inputs(participant)
+    participant_name = inputs["participant_name"]
+    key = diploma_cache_key(inputs)
+    if etag_matches(if_none_match, key):
+        return pdf_response(None, key, f"Diploma_{participant_name.replace(' ', '_')}.pdf")
     
-    pdf_buffer = generate_diploma_pdf(
-        participant_name=participant_name,
-        event_title=event_title,
-        event_date=event_date
-    )
+    pdf_content = await render_pdf_cached("diploma", participant_id, inputs, key)
     
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="Diploma_{participant_name.replace(" ", "_")}.pdf"'
-        }
-    )
+    return pdf_response(pdf_content, key, f"Diploma_{participant_name.replace(' ', '_')}.pdf", "attachment")
 
 
-async def send_diploma_email(participant: dict, pdf_buffer: BytesIO):
+async def send_diploma_email(participant: dict, pdf_content: bytes):
     """Send diploma PDF via email to participant"""
     registration_data = participant.get("registration_data", {})
     participant_name = registration_data.get("full_name", participant.get("nominee_name", "Unknown"))
@@ -4291,8 +5915,7 @@ async def send_diploma_email(participant: dict, pdf_buffer: BytesIO):
     if not participant_email:
         raise HTTPException(status_code=400, detail="Participant email not found")
     
-    # Read PDF content and encode as base64
-    pdf_content = pdf_buffer.read()
+    # Encode PDF as base64
     pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
     
     html_content = f"""
@@ -4349,11 +5972,11 @@ async def send_diploma_email(participant: dict, pdf_buffer: BytesIO):
     }
     
     try:
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logging.info(f"Diploma email sent to {participant_email}, id: {email.get('id')}")
+        email_id = await enqueue_email(params, tag="diploma")
+        logging.info(f"Diploma email queued for {participant_email}, id: {email_id}")
         return True
     except Exception as e:
-        logging.error(f"Failed to send diploma email: {str(e)}")
+        logging.error(f"Failed to queue diploma email: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
 
 
@@ -4372,21 +5995,11 @@ async def send_training_participant_diploma(participant_id: str):
     if attendance_hours < 21:
         raise HTTPException(status_code=400, detail=f"Participant has only {attendance_hours} hours. 21 hours required for diploma.")
     
-    # Get participant details
-    registration_data = participant.get("registration_data", {})
-    participant_name = registration_data.get("full_name", participant.get("nominee_name", "Unknown"))
-    event_title = participant.get("event_title", "Haggai Leadership Seminar")
-    event_date = participant.get("event_date", "")
-    
-    # Generate PDF
-    pdf_buffer = generate_diploma_pdf(
-        participant_name=participant_name,
-        event_title=event_title,
-        event_date=event_date
-    )
+    inputs = diploma_render_inputs(participant)
+    pdf_content = await render_pdf_cached("diploma", participant_id, inputs, diploma_cache_key(inputs))
     
     # Send email
-    await send_diploma_email(participant, pdf_buffer)
+    await send_diploma_email(participant, pdf_content)
     
     # Create member account automatically
     member = await create_member_from_participant(participant)
@@ -4406,6 +6019,113 @@ async def send_training_participant_diploma(participant_id: str):
     return {"success": True, "message": "Diploma sent successfully", "member_created": member is not None}
 
 
+class ZipStreamBuffer:
+    """Write-only file object for zipfile. It has no tell/seek, so zipfile
+    writes data descriptors and everything written can be streamed right away."""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_workshop_diplomas(query: dict):
+    """Yield a ZIP of diplomas, adding each PDF as soon as it is rendered.
+    
+    At most pdf_renderer.workers diplomas are in flight at once, so memory
+    stays flat however many participants the workshop has.
+    """
+    buffer = ZipStreamBuffer()
+    archive = zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED)
+    cursor = db.nominations.find(query, {"_id": 0}).sort("id", 1)
+    in_flight = {}
+    used_names = set()
+    failed = []
+    
+    def archive_name(participant_name: str) -> str:
+        base = f"Diploma_{participant_name.replace(' ', '_').replace('/', '_')}"
+        name, n = f"{base}.pdf", 1
+        while name in used_names:
+            n += 1
+            name = f"{base}_{n}.pdf"
+        used_names.add(name)
+        return name
+    
+    async def add_finished() -> bytes:
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            participant_name = in_flight.pop(task)
+            try:
+                pdf_content = task.result()
+            except Exception as e:
+                logging.error(f"Failed to render diploma for {participant_name}: {e}")
+                failed.append(participant_name)
+                continue
+            info = zipfile.ZipInfo(archive_name(participant_name), date_time=datetime.now().timetuple()[:6])
+            archive.writestr(info, pdf_content)
+        return buffer.drain()
+    
+    try:
+        async for participant in cursor:
+            # Keep the render window full, emitting PDFs as they finish
+            if len(in_flight) >= pdf_renderer.workers:
+                yield await add_finished()
+            inputs = diploma_render_inputs(participant)
+            task = asyncio.create_task(
+                render_pdf_cached("diploma", participant["id"], inputs, diploma_cache_key(inputs))
+            )
+            in_flight[task] = inputs["participant_name"]
+        
+        while in_flight:
+            yield await add_finished()
+        
+        if failed:
+            archive.writestr("FAILED.txt", "Diplom som inte kunde skapas:\n" + "\n".join(failed) + "\n")
+        archive.close()
+        yield buffer.drain()
+    finally:
+        # Client went away or something failed: stop waiting. render_pdf_cached
+        # shields the render itself, so the ones already started still finish
+        # in the pool and are cached for the next download
+        for task in in_flight:
+            task.cancel()
+
+
+@api_router.get("/workshops/{workshop_id}/diplomas.zip")
+async def download_workshop_diplomas(workshop_id: str):
+    """Download diplomas for every participant in a workshop with 21+ hours, as a streamed ZIP"""
+    workshop = await db.workshops.find_one({"id": workshop_id}, {"_id": 0, "title": 1})
+    if not workshop:
+        raise HTTPException(status_code=404, detail="Workshop not found")
+    
+    query = {
+        "event_id": workshop_id,
+        "registration_completed": True,
+        "attendance_hours": {"$gte": 21}
+    }
+    if not await db.nominations.find_one(query, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="No participants with 21 hours found for this workshop")
+    
+    title = workshop.get("title") or "Workshop"
+    return StreamingResponse(
+        stream_workshop_diplomas(query),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="Diplomas_{title.replace(" ", "_")}.zip"'
+        }
+    )
+
+
 @api_router.post("/training-participants/{participant_id}/make-member")
 async def make_participant_member(participant_id: str):
     """Manually create a member account from a training participant"""
@@ -4447,6 +6167,246 @@ async def make_participant_member(participant_id: str):
 
 # ==================== NAME BADGE GENERATION ====================
 
+def build_name_badge_styles(styles, badge_type: str) -> dict:
+    haggai_dark = colors.HexColor('#1F3D3B')  # Dark teal
+    haggai_gold = colors.HexColor('#D4AF37')  # Gold accent
+    return {
+        "name": ParagraphStyle(
+            'NameBadge',
+            parent=styles['Heading1'],
+            fontSize=28,
+            textColor=haggai_dark,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold',
+            leading=32
+        ),
+        "organization": ParagraphStyle(
+            'Organization',
+            parent=styles['Normal'],
+            fontSize=12,
+            textColor=colors.HexColor('#666666'),
+            alignment=TA_CENTER,
+            fontName='Helvetica-Oblique'
+        ),
+        "role": ParagraphStyle(
+            'Role',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=haggai_gold if badge_type == "leader" else haggai_dark,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        "workshop": ParagraphStyle(
+            'Workshop',
+            parent=styles['Normal'],
+            fontSize=13,
+            textColor=haggai_dark,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold',
+            leading=16
+        ),
+        "info": ParagraphStyle(
+            'Info',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.HexColor('#555555'),
+            alignment=TA_CENTER,
+            fontName='Helvetica'
+        ),
+    }
+
+
+# Map topic keys to display names (matching WORKSHOP_TOPICS)
+BADGE_TOPIC_NAMES = {
+    'biblical_mandate': 'Bibliskt Mandat',
+    'stewardship': 'Förvaltarskap',
+    'context': 'Sammanhang',
+    'next_generation': 'Nästa Generation',
+    'leadership': 'Ledarskap',
+    'goal_setting': 'Målsättning',
+    'time_management': 'Tidshantering',
+    'vision': 'Vision',
+    'communication': 'Kommunikation',
+    'team_building': 'Teambuilding',
+    'conflict_resolution': 'Konflikthantering'
+}
+
+
+def badge_topic_display(primary_topic: str) -> str:
+    return BADGE_TOPIC_NAMES.get(primary_topic, primary_topic.replace('_', ' ').title())
+
+
+def badge_event_info(event_date: Optional[str], event_location: Optional[str]) -> str:
+    """Date and location line shown under the workshop title"""
+    info_parts = []
+    if event_date:
+        # Format date nicely
+        try:
+            date_obj = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
+            formatted_date = date_obj.strftime('%d %b %Y')
+            info_parts.append(f"📅 {formatted_date}")
+        except:
+            info_parts.append(f"📅 {event_date}")
+    if event_location:
+        info_parts.append(f"📍 {event_location}")
+    return " • ".join(info_parts)
+
+
+@lru_cache(maxsize=QR_MATRIX_CACHE_SIZE)
+def qr_matrix(payload: str) -> tuple:
+    """Encoded QR modules for payload, one tuple of booleans per row"""
+    qr = qrencoder.QRCode(None, qrencoder.QRErrorCorrectLevel.M)
+    qr.addData(payload)
+    qr.make()
+    size = qr.getModuleCount()
+    return tuple(tuple(qr.isDark(row, col) for col in range(size)) for row in range(size))
+
+
+def badge_qr_payload(badge_type: str, person_id: str) -> str:
+    return f"haggai:{badge_type}:{person_id}"
+
+
+def draw_qr_code(c: canvas.Canvas, payload: str, x: float, y: float, size: float, border: int = 2, color=colors.HexColor('#1F3D3B')):
+    """Draw a QR code as vector rectangles, one per horizontal run of dark modules"""
+    matrix = qr_matrix(payload)
+    module = size / (len(matrix) + 2 * border)
+    top = y + size - border * module
+    path = c.beginPath()
+    for row, modules in enumerate(matrix):
+        run_start = None
+        for col, dark in enumerate(modules + (False,)):
+            if dark and run_start is None:
+                run_start = col
+            elif not dark and run_start is not None:
+                path.rect(
+                    x + (border + run_start) * module, top - (row + 1) * module,
+                    (col - run_start) * module, module
+                )
+                run_start = None
+    c.saveState()
+    c.setFillColor(color)
+    c.drawPath(path, stroke=0, fill=1)
+    c.restoreState()
+
+
+# A6 badge layout; sheets impose them 2 x 2 on A4 so the two cuts run through the middle
+BADGE_WIDTH = 10.5 * cm
+BADGE_HEIGHT = 14.8 * cm
+BADGE_MARGIN_X = 0.4 * cm
+BADGE_MARGIN_Y = 0.3 * cm
+BADGE_SHEET_COLUMNS = 2
+BADGE_SHEET_ROWS = 2
+BADGE_CROP_MARK_LENGTH = 0.4 * cm
+BADGE_LABEL_HEIGHT = 1.4 * cm
+BADGE_FOOTER_HEIGHT = 0.9 * cm
+
+
+def badge_label_colors(badge_type: str):
+    if badge_type == "leader":
+        return colors.HexColor('#D4AF37'), "FACILITATOR", "FACILITATOR"
+    return colors.HexColor('#1F3D3B'), "PARTICIPANT", "DELTAGARE"
+
+
+def draw_badge_artwork(c: canvas.Canvas, badge_type: str) -> float:
+    """Draw the parts of a badge that are the same for every person of a badge type.
+    
+    Coordinates are relative to the badge's lower left corner. Returns the y
+    where the personal content starts.
+    """
+    center_x = BADGE_WIDTH / 2
+    y = BADGE_HEIGHT - BADGE_MARGIN_Y
+    
+    # Logo and Haggai branding
+    if draw_pdf_logo(c, center_x - 1.25*cm, y - 2.5*cm, 2.5*cm, 2.5*cm):
+        y -= 2.5*cm
+    else:
+        y -= 24
+        c.setFillColor(colors.HexColor('#1F3D3B'))
+        c.setFont('Helvetica-Bold', 24)
+        c.drawCentredString(center_x, y, "HAGGAI")
+    
+    y -= 0.2*cm + 8
+    c.setFillColor(colors.HexColor('#666666'))
+    c.setFont('Helvetica', 8)
+    c.drawCentredString(center_x, y, "SWEDEN")
+    
+    # Role band
+    label_bg_color, badge_label, badge_label_sv = badge_label_colors(badge_type)
+    y -= 0.3*cm + BADGE_LABEL_HEIGHT
+    c.setFillColor(label_bg_color)
+    c.rect(BADGE_MARGIN_X, y, BADGE_WIDTH - 2 * BADGE_MARGIN_X, BADGE_LABEL_HEIGHT, stroke=0, fill=1)
+    c.setFillColor(colors.white)
+    c.setFont('Helvetica-Bold', 12)
+    c.drawCentredString(center_x, y + BADGE_LABEL_HEIGHT / 2 + 1, badge_label)
+    c.setFont('Helvetica-Bold', 8)
+    c.drawCentredString(center_x, y + BADGE_LABEL_HEIGHT / 2 - 10, badge_label_sv)
+    
+    # Footer
+    c.setStrokeColor(colors.HexColor('#555555'))
+    c.setLineWidth(0.5)
+    c.line(center_x - 2*cm, BADGE_MARGIN_Y + 0.5*cm, center_x + 2*cm, BADGE_MARGIN_Y + 0.5*cm)
+    c.setFillColor(colors.HexColor('#999999'))
+    c.setFont('Helvetica', 7)
+    c.drawCentredString(center_x, BADGE_MARGIN_Y + 0.1*cm, "www.haggai.se")
+    
+    return y - 0.5*cm
+
+
+def draw_badge_details(c: canvas.Canvas, badge: dict, top: float):
+    """Draw the personal part of a badge below the artwork, top to bottom"""
+    badge_type = badge.get("badge_type", "participant")
+    styles = load_pdf_assets()["badge_styles"]["leader" if badge_type == "leader" else "participant"]
+    width = BADGE_WIDTH - 2 * BADGE_MARGIN_X
+    y = top
+    
+    def place(flowable, space_after: float = 0):
+        nonlocal y
+        _, height = flowable.wrap(width, y)
+        flowable.drawOn(c, BADGE_MARGIN_X, y - height)
+        y -= height + space_after
+    
+    name = badge["name"]
+    name_font_size = 28 if len(name) < 20 else (24 if len(name) < 25 else 20)
+    place(Paragraph(name, ParagraphStyle(
+        'NameBadge',
+        parent=styles["name"],
+        fontSize=name_font_size,
+        leading=name_font_size + 4
+    )), 0.2*cm)
+    
+    if badge.get("organization"):
+        place(Paragraph(badge["organization"], styles["organization"]), 0.2*cm)
+    
+    if badge_type == "leader" and badge.get("primary_topic"):
+        place(Paragraph(f"📚 {badge_topic_display(badge['primary_topic'])}", styles["role"]), 0.2*cm)
+    
+    y -= 0.3*cm
+    c.setStrokeColor(colors.HexColor('#555555'))
+    c.setLineWidth(0.5)
+    c.line(BADGE_WIDTH / 2 - 2*cm, y, BADGE_WIDTH / 2 + 2*cm, y)
+    y -= 0.3*cm
+    place(Paragraph(badge["workshop_title"], styles["workshop"]), 0.2*cm)
+    
+    event_info = badge_event_info(badge.get("event_date"), badge.get("event_location"))
+    if event_info:
+        place(Paragraph(event_info, styles["info"]))
+    
+    # QR code for check-in, anchored just above the footer
+    if badge.get("person_id"):
+        try:
+            qr_size = 1.8*cm
+            qr_y = BADGE_FOOTER_HEIGHT + 0.35*cm
+            draw_qr_code(
+                c, badge_qr_payload(badge_type, badge["person_id"]),
+                (BADGE_WIDTH - qr_size) / 2, qr_y, qr_size
+            )
+            c.setFillColor(colors.HexColor('#999999'))
+            c.setFont('Helvetica', 7)
+            c.drawCentredString(BADGE_WIDTH / 2, qr_y - 0.3*cm, "Scanna för incheckning")
+        except Exception as e:
+            logging.error(f"Failed to generate QR code: {e}")
+
+
 def generate_name_badge_pdf(
     name: str,
     organization: str,
@@ -4458,267 +6418,106 @@ def generate_name_badge_pdf(
     role_title: str = None,  # For leaders: their specific role
     primary_topic: str = None  # For leaders: their primary topic
 ) -> BytesIO:
-    """Generate a professional PDF name badge for participants or leaders - A6 format (105 x 148 mm)"""
-    import qrcode
-    from PIL import Image as PILImage
+    """Generate a professional PDF name badge for participants or leaders - A6 format (105 x 148 mm).
     
+    Same layout as one tile of the badge sheet: fixed artwork as a form
+    XObject, personal details drawn on top.
+    """
     buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(BADGE_WIDTH, BADGE_HEIGHT))
     
-    # A6 size: 105mm x 148mm (standard postcard size)
-    badge_width = 10.5 * cm
-    badge_height = 14.8 * cm
-    
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=(badge_width, badge_height),
-        leftMargin=0.4*cm,
-        rightMargin=0.4*cm,
-        topMargin=0.3*cm,
-        bottomMargin=0.3*cm
-    )
-    
-    # Haggai brand colors
-    haggai_dark = colors.HexColor('#1F3D3B')  # Dark teal
-    haggai_gold = colors.HexColor('#D4AF37')  # Gold accent
-    haggai_cream = colors.HexColor('#FDF8F3')  # Cream background
-    
-    # Define colors and labels based on badge type
-    if badge_type == "leader":
-        label_bg_color = haggai_gold
-        secondary_color = colors.HexColor('#B8860B')  # Darker gold
-        badge_label = "FACILITATOR"
-        badge_label_sv = "FACILITATOR"
-    else:  # participant
-        label_bg_color = haggai_dark
-        secondary_color = colors.HexColor('#2A5250')  # Lighter teal
-        badge_label = "PARTICIPANT"
-        badge_label_sv = "DELTAGARE"
-    
-    # Create styles
-    styles = getSampleStyleSheet()
-    
-    header_style = ParagraphStyle(
-        'Header',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.HexColor('#666666'),
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
-    
-    label_style = ParagraphStyle(
-        'Label',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=colors.white,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        leading=14
-    )
-    
-    name_style = ParagraphStyle(
-        'NameBadge',
-        parent=styles['Heading1'],
-        fontSize=28,
-        textColor=haggai_dark,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        leading=32
-    )
-    
-    org_style = ParagraphStyle(
-        'Organization',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=colors.HexColor('#666666'),
-        alignment=TA_CENTER,
-        fontName='Helvetica-Oblique'
-    )
-    
-    role_style = ParagraphStyle(
-        'Role',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=haggai_gold if badge_type == "leader" else haggai_dark,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    workshop_label_style = ParagraphStyle(
-        'WorkshopLabel',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.HexColor('#888888'),
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
-    
-    workshop_style = ParagraphStyle(
-        'Workshop',
-        parent=styles['Normal'],
-        fontSize=13,
-        textColor=haggai_dark,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        leading=16
-    )
-    
-    info_style = ParagraphStyle(
-        'Info',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#555555'),
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
-    
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=7,
-        textColor=colors.HexColor('#999999'),
-        alignment=TA_CENTER,
-        fontName='Helvetica'
-    )
-    
-    # Build content
-    story = []
-    
-    # === TOP SECTION: Logo and Haggai branding ===
-    logo_path = Path(__file__).parent / "haggai_logo.png"
-    if logo_path.exists():
-        logo_img = Image(str(logo_path), width=2.5*cm, height=2.5*cm)
-        story.append(logo_img)
-    else:
-        # Fallback to text
-        logo_text_style = ParagraphStyle(
-            'LogoText',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=haggai_dark,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        story.append(Paragraph("HAGGAI", logo_text_style))
-    
-    story.append(Spacer(1, 0.2*cm))
-    story.append(Paragraph("SWEDEN", header_style))
-    story.append(Spacer(1, 0.3*cm))
-    
-    # === ROLE BADGE ===
-    badge_content = f"{badge_label}<br/><font size='8'>{badge_label_sv}</font>"
-    label_table = Table([[Paragraph(badge_content, label_style)]], colWidths=[badge_width - 0.8*cm])
-    label_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), label_bg_color),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('LEFTPADDING', (0, 0), (-1, -1), 10),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-    ]))
-    story.append(label_table)
-    story.append(Spacer(1, 0.5*cm))
-    
-    # === NAME (Large and prominent) ===
-    # Handle long names by reducing font size
-    name_font_size = 28 if len(name) < 20 else (24 if len(name) < 25 else 20)
-    name_style.fontSize = name_font_size
-    name_style.leading = name_font_size + 4
-    story.append(Paragraph(name, name_style))
-    story.append(Spacer(1, 0.2*cm))
-    
-    # === ORGANIZATION ===
-    if organization:
-        story.append(Paragraph(organization, org_style))
-        story.append(Spacer(1, 0.2*cm))
-    
-    # === ROLE/TOPIC for Leaders ===
-    if badge_type == "leader":
-        if primary_topic:
-            # Map topic keys to display names (matching WORKSHOP_TOPICS)
-            topic_names = {
-                'biblical_mandate': 'Bibliskt Mandat',
-                'stewardship': 'Förvaltarskap',
-                'context': 'Sammanhang',
-                'next_generation': 'Nästa Generation',
-                'leadership': 'Ledarskap',
-                'goal_setting': 'Målsättning',
-                'time_management': 'Tidshantering',
-                'vision': 'Vision',
-                'communication': 'Kommunikation',
-                'team_building': 'Teambuilding',
-                'conflict_resolution': 'Konflikthantering'
-            }
-            topic_display = topic_names.get(primary_topic, primary_topic.replace('_', ' ').title())
-            story.append(Paragraph(f"📚 {topic_display}", role_style))
-            story.append(Spacer(1, 0.2*cm))
-    
-    story.append(Spacer(1, 0.3*cm))
-    
-    # === WORKSHOP INFO ===
-    story.append(Paragraph("─" * 20, info_style))
-    story.append(Spacer(1, 0.2*cm))
-    story.append(Paragraph(workshop_title, workshop_style))
-    
-    # Date and location info
-    if event_date or event_location:
-        story.append(Spacer(1, 0.2*cm))
-        info_parts = []
-        if event_date:
-            # Format date nicely
-            try:
-                date_obj = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
-                formatted_date = date_obj.strftime('%d %b %Y')
-                info_parts.append(f"📅 {formatted_date}")
-            except:
-                info_parts.append(f"📅 {event_date}")
-        if event_location:
-            info_parts.append(f"📍 {event_location}")
-        
-        if info_parts:
-            story.append(Paragraph(" • ".join(info_parts), info_style))
-    
-    story.append(Spacer(1, 0.3*cm))
-    
-    # === QR CODE for check-in (if person_id provided) ===
-    if person_id:
-        try:
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_M,
-                box_size=10,
-                border=2,
-            )
-            qr_data = f"haggai:{badge_type}:{person_id}"
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-            
-            qr_img = qr.make_image(fill_color="#1F3D3B", back_color="white")
-            
-            # Save QR to buffer
-            qr_buffer = BytesIO()
-            qr_img.save(qr_buffer, format='PNG')
-            qr_buffer.seek(0)
-            
-            # Add QR code to story
-            qr_image = Image(qr_buffer, width=1.8*cm, height=1.8*cm)
-            story.append(qr_image)
-            story.append(Spacer(1, 0.1*cm))
-            story.append(Paragraph("Scanna för incheckning", footer_style))
-        except Exception as e:
-            logging.error(f"Failed to generate QR code: {e}")
+    c.beginForm(f"badge-{badge_type}")
+    content_top = draw_badge_artwork(c, badge_type)
+    c.endForm()
+    c.doForm(f"badge-{badge_type}")
     
-    # === FOOTER ===
-    story.append(Spacer(1, 0.2*cm))
-    story.append(Paragraph("─" * 20, info_style))
-    story.append(Paragraph("www.haggai.se", footer_style))
+    draw_badge_details(c, {
+        "name": name,
+        "organization": organization,
+        "workshop_title": workshop_title,
+        "badge_type": badge_type,
+        "event_date": event_date,
+        "event_location": event_location,
+        "person_id": person_id,
+        "role_title": role_title,
+        "primary_topic": primary_topic,
+    }, content_top)
+    
+    c.showPage()
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+
+# ==================== NAME BADGE SHEETS ====================
+
+def draw_crop_marks(c: canvas.Canvas, page_width: float, page_height: float, cut_xs: list, cut_ys: list):
+    """Short marks at the sheet edges where the cuts run, plus a cross where they meet"""
+    c.setStrokeColor(colors.black)
+    c.setLineWidth(0.25)
+    mark = BADGE_CROP_MARK_LENGTH
+    for x in cut_xs:
+        c.line(x, 0, x, mark)
+        c.line(x, page_height - mark, x, page_height)
+    for y in cut_ys:
+        c.line(0, y, mark, y)
+        c.line(page_width - mark, y, page_width, y)
+    for x in cut_xs:
+        for y in cut_ys:
+            c.line(x - mark / 2, y, x + mark / 2, y)
+            c.line(x, y - mark / 2, x, y + mark / 2)
+
+
+def generate_name_badge_sheet_pdf(badges: list) -> BytesIO:
+    """Lay out name badges 4-up on A4 with crop marks, in one document.
     
-    # Build PDF
-    doc.build(story)
+    Each badge dict takes the same fields as generate_name_badge_pdf. The
+    artwork shared by all badges of a type is drawn once as a form XObject
+    and reused on every tile.
+    """
+    buffer = BytesIO()
+    page_width, page_height = A4
+    c = canvas.Canvas(buffer, pagesize=A4)
+    c.setTitle("Haggai Name Badges")
+    
+    # Center the 2 x 2 grid; A4 is 1 mm taller than two A6
+    offset_x = (page_width - BADGE_SHEET_COLUMNS * BADGE_WIDTH) / 2
+    offset_y = (page_height - BADGE_SHEET_ROWS * BADGE_HEIGHT) / 2
+    cut_xs = [offset_x + i * BADGE_WIDTH for i in range(1, BADGE_SHEET_COLUMNS)]
+    cut_ys = [offset_y + i * BADGE_HEIGHT for i in range(1, BADGE_SHEET_ROWS)]
+    
+    content_top = {}
+    for badge_type in sorted({badge.get("badge_type", "participant") for badge in badges}):
+        c.beginForm(f"badge-{badge_type}", lowerx=0, lowery=0, upperx=BADGE_WIDTH, uppery=BADGE_HEIGHT)
+        content_top[badge_type] = draw_badge_artwork(c, badge_type)
+        c.endForm()
+    
+    per_page = BADGE_SHEET_COLUMNS * BADGE_SHEET_ROWS
+    for start in range(0, len(badges), per_page):
+        for slot, badge in enumerate(badges[start:start + per_page]):
+            badge_type = badge.get("badge_type", "participant")
+            column = slot % BADGE_SHEET_COLUMNS
+            row = slot // BADGE_SHEET_COLUMNS
+            c.saveState()
+            c.translate(offset_x + column * BADGE_WIDTH, page_height - offset_y - (row + 1) * BADGE_HEIGHT)
+            c.doForm(f"badge-{badge_type}")
+            draw_badge_details(c, badge, content_top[badge_type])
+            c.restoreState()
+        draw_crop_marks(c, page_width, page_height, cut_xs, cut_ys)
+        c.showPage()
+    
+    c.save()
     buffer.seek(0)
     return buffer
 
 
+PDF_RENDERERS = {
+    "diploma": generate_diploma_pdf,
+    "name_badge": generate_name_badge_pdf,
+    "name_badge_sheet": generate_name_badge_sheet_pdf,
+}
+
+
 class ForgotPasswordRequest(BaseModel):
     email: str
 
@@ -4801,7 +6600,7 @@ async def participant_reset_password(request: ResetPasswordRequest):
         raise HTTPException(status_code=410, detail="Token expired")
     
     # Hash new password
-    password_hash = bcrypt.hashpw(request.new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    password_hash = await hash_password(request.new_password)
     
     # Update participant password
     await db.participants.update_one(
@@ -4864,15 +6663,15 @@ async def send_password_reset_email(email: str, name: str, token: str, user_type
     """
     
     try:
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [email],
             "subject": "🔒 Återställ ditt lösenord - Haggai Sweden",
             "html": html_content
-        })
-        logging.info(f"Password reset email sent to {email}")
+        }, tag="password_reset")
+        logging.info(f"Password reset email queued for {email}")
     except Exception as e:
-        logging.error(f"Failed to send password reset email: {str(e)}")
+        logging.error(f"Failed to queue password reset email: {str(e)}")
 
 
 
@@ -4895,7 +6694,7 @@ async def participant_login(credentials: ParticipantLogin):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Verify password
-    if not bcrypt.checkpw(credentials.password.encode('utf-8'), participant['password_hash'].encode('utf-8')):
+    if not await verify_and_upgrade_password(db.participants, participant, credentials.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Generate JWT token
@@ -5018,7 +6817,7 @@ async def member_reset_password(request: ResetPasswordRequest):
     if datetime.now(timezone.utc) > expires_at:
         raise HTTPException(status_code=410, detail="Token expired")
     
-    password_hash = bcrypt.hashpw(request.new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    password_hash = await hash_password(request.new_password)
     
     await db.members.update_one(
         {"id": reset_record['user_id']},
@@ -5037,7 +6836,7 @@ async def member_reset_password(request: ResetPasswordRequest):
 
 
 @api_router.get("/participants/{participant_id}/name-badge")
-async def get_participant_name_badge(participant_id: str):
+async def get_participant_name_badge(participant_id: str, if_none_match: Optional[str] = Header(None)):
     """Generate and download name badge for an approved participant"""
     participant = await db.nominations.find_one(
         {"id": participant_id, "status": "approved"},
@@ -5047,99 +6846,687 @@ async def get_participant_name_badge(participant_id: str):
     if not participant:
         raise HTTPException(status_code=404, detail="Approved participant not found")
     
-    # Get participant info
-    registration_data = participant.get("registration_data") or {}
-    participant_name = registration_data.get("full_name") or participant.get("nominee_name", "Unknown")
-    organization = registration_data.get("church_name") or participant.get("nominee_church", "")
-    workshop_title = participant.get("event_title", "Haggai Workshop")
-    event_date = participant.get("event_date")
+    # Get participant info
+    registration_data = participant.get("registration_data") or {}
+    participant_name = registration_data.get("full_name") or participant.get("nominee_name", "Unknown")
+    organization = registration_data.get("church_name") or participant.get("nominee_church", "")
+    workshop_title = participant.get("event_title", "Haggai Workshop")
+    event_date = participant.get("event_date")
+    
+    # Try to get location from workshop
+    event_location = None
+    event_id = participant.get("event_id")
+    if event_id:
+        workshop = await db.workshops.find_one({"id": event_id}, {"_id": 0, "location": 1})
+        if workshop:
+            event_location = workshop.get("location")
+    
+    # Generate PDF with enhanced info
+    inputs = {
+        "name": participant_name,
+        "organization": organization,
+        "workshop_title": workshop_title,
+        "badge_type": "participant",
+        "event_date": event_date,
+        "event_location": event_location,
+        "person_id": participant_id,
+    }
+    key = pdf_cache_key("name_badge", inputs)
+    filename = f"Name_Badge_{participant_name.replace(' ', '_')}.pdf"
+    if etag_matches(if_none_match, key):
+        return pdf_response(None, key, filename)
+    
+    pdf_content = await render_pdf_cached("name_badge", participant_id, inputs, key)
+    return pdf_response(pdf_content, key, filename)
+
+
+@api_router.get("/leaders/{leader_id}/name-badge")
+async def get_leader_name_badge(leader_id: str, if_none_match: Optional[str] = Header(None)):
+    """Generate and download name badge for an approved leader"""
+    leader = await db.leader_registrations.find_one(
+        {"id": leader_id, "status": "approved"},
+        {"_id": 0}
+    )
+    
+    if not leader:
+        raise HTTPException(status_code=404, detail="Approved leader not found")
+    
+    # Get leader info
+    leader_name = leader.get("name", "Unknown")
+    # For leader, we'll use their organization or leave blank
+    organization = leader.get("employer_name", leader.get("church_name", ""))
+    primary_topic = leader.get("primary_topic")
+    role_title = leader.get("role_sv") or leader.get("role_en")
+    
+    # Try to get workshop info from invitation if available
+    invitation_id = leader.get("invitation_id")
+    workshop_title = "Haggai Workshop"
+    event_date = None
+    event_location = None
+    
+    if invitation_id:
+        invitation = await db.leader_invitations.find_one(
+            {"id": invitation_id},
+            {"_id": 0}
+        )
+        if invitation:
+            if invitation.get("workshop_title"):
+                workshop_title = invitation.get("workshop_title")
+            workshop_id = invitation.get("workshop_id")
+            if workshop_id:
+                workshop = await db.workshops.find_one({"id": workshop_id}, {"_id": 0})
+                if workshop:
+                    event_date = workshop.get("date")
+                    event_location = workshop.get("location")
+    
+    # Generate PDF with enhanced info
+    inputs = {
+        "name": leader_name,
+        "organization": organization,
+        "workshop_title": workshop_title,
+        "badge_type": "leader",
+        "event_date": event_date,
+        "event_location": event_location,
+        "person_id": leader_id,
+        "role_title": role_title,
+        "primary_topic": primary_topic,
+    }
+    key = pdf_cache_key("name_badge", inputs)
+    filename = f"Name_Badge_{leader_name.replace(' ', '_')}.pdf"
+    if etag_matches(if_none_match, key):
+        return pdf_response(None, key, filename)
+    
+    pdf_content = await render_pdf_cached("name_badge", leader_id, inputs, key)
+    return pdf_response(pdf_content, key, filename)
+
+
+async def collect_workshop_badges(workshop_id: str, workshop: dict) -> list:
+    """Badge inputs for a workshop's approved participants and assigned leaders"""
+    badges = []
+    workshop_location = workshop.get("location")
+    
+    async for participant in db.nominations.find(
+        {"event_id": workshop_id, "status": "approved"},
+        {"_id": 0}
+    ).sort("nominee_name", 1):
+        registration_data = participant.get("registration_data") or {}
+        badges.append({
+            "name": registration_data.get("full_name") or participant.get("nominee_name", "Unknown"),
+            "organization": registration_data.get("church_name") or participant.get("nominee_church", ""),
+            "workshop_title": participant.get("event_title", "Haggai Workshop"),
+            "badge_type": "participant",
+            "event_date": participant.get("event_date"),
+            "event_location": workshop_location,
+            "person_id": participant["id"],
+        })
+    
+    # Leaders are assigned by invitation to the workshop or by a session in its agenda
+    invitation_ids = [
+        invitation["id"]
+        async for invitation in db.leader_invitations.find({"workshop_id": workshop_id}, {"_id": 0, "id": 1})
+    ]
+    agenda = await db.workshop_agendas.find_one({"workshop_id": workshop_id}, {"_id": 0, "days": 1}) or {}
+    session_leader_ids = list({
+        session["leader_id"]
+        for day in agenda.get("days", [])
+        for session in day.get("sessions", [])
+        if session.get("leader_id")
+    })
+    
+    async for leader in db.leader_registrations.find(
+        {
+            "status": "approved",
+            "$or": [
+                {"invitation_id": {"$in": invitation_ids}},
+                {"id": {"$in": session_leader_ids}},
+                {"email": {"$in": session_leader_ids}},
+            ]
+        },
+        {"_id": 0}
+    ).sort("name", 1):
+        badges.append({
+            "name": leader.get("name", "Unknown"),
+            "organization": leader.get("employer_name", leader.get("church_name", "")),
+            "workshop_title": workshop.get("title") or "Haggai Workshop",
+            "badge_type": "leader",
+            "event_date": workshop.get("date"),
+            "event_location": workshop_location,
+            "person_id": leader["id"],
+            "role_title": leader.get("role_sv") or leader.get("role_en"),
+            "primary_topic": leader.get("primary_topic"),
+        })
+    
+    return badges
+
+
+@api_router.get("/workshops/{workshop_id}/name-badges.pdf")
+async def get_workshop_name_badges(workshop_id: str, if_none_match: Optional[str] = Header(None)):
+    """Print-ready name badges for a whole workshop, 4 per A4 page with crop marks"""
+    workshop = await db.workshops.find_one({"id": workshop_id}, {"_id": 0})
+    if not workshop:
+        raise HTTPException(status_code=404, detail="Workshop not found")
+    
+    badges = await collect_workshop_badges(workshop_id, workshop)
+    if not badges:
+        raise HTTPException(status_code=404, detail="No approved participants or leaders found for this workshop")
+    
+    inputs = {"badges": badges}
+    key = pdf_cache_key("name_badge_sheet", inputs)
+    filename = f"Name_Badges_{(workshop.get('title') or 'Workshop').replace(' ', '_')}.pdf"
+    if etag_matches(if_none_match, key):
+        return pdf_response(None, key, filename)
+    
+    pdf_content = await render_pdf_cached("name_badge_sheet", workshop_id, inputs, key)
+    return pdf_response(pdf_content, key, filename)
+
+
+# ==================== CHECK-IN ====================
+
+# Door scanners post the QR payload printed on the name badges. Each workshop's
+# roster is kept in memory keyed by payload, so a scan is a dict lookup and
+# never touches Mongo. Accepted scans are buffered and written to the checkins
+# collection in batches by a background task.
+
+
+class CheckinScan(BaseModel):
+    payload: str  # haggai:{participant|leader}:{id}
+    session_id: Optional[str] = None
+    scanner_id: Optional[str] = None
+
+
+class CheckinRoster:
+    """Badge holders of one workshop, keyed by QR payload"""
+    
+    def __init__(self, workshop_id: str, badges: list):
+        self.workshop_id = workshop_id
+        self.entries = {
+            badge_qr_payload(badge["badge_type"], badge["person_id"]): {
+                "badge_type": badge["badge_type"],
+                "person_id": badge["person_id"],
+                "name": badge["name"],
+                "organization": badge.get("organization") or "",
+            }
+            for badge in badges
+        }
+        self.version = hashlib.sha256(
+            json.dumps(self.entries, sort_keys=True).encode()
+        ).hexdigest()[:16]
+        # (payload, session_id) -> (loop time, check-in) of the last accepted scan
+        self.last_scans = {}
+        self.loaded_at = asyncio.get_running_loop().time()
+    
+    def age(self) -> float:
+        return asyncio.get_running_loop().time() - self.loaded_at
+
+
+class CheckinService:
+    """In-memory workshop rosters with batched write-behind of accepted scans"""
+    
+    def __init__(self, collection, flush_interval: float = CHECKIN_FLUSH_INTERVAL_SECONDS,
+                 batch_size: int = CHECKIN_FLUSH_BATCH_SIZE,
+                 duplicate_window: float = CHECKIN_DUPLICATE_WINDOW_SECONDS):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.duplicate_window = duplicate_window
+        self._rosters = {}
+        self._loading = {}
+        self._pending = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = None
+    
+    async def _load_roster(self, workshop_id: str) -> CheckinRoster:
+        workshop = await db.workshops.find_one({"id": workshop_id}, {"_id": 0})
+        if not workshop:
+            raise HTTPException(status_code=404, detail="Workshop not found")
+        
+        roster = CheckinRoster(workshop_id, await collect_workshop_badges(workshop_id, workshop))
+        previous = self._rosters.get(workshop_id)
+        if previous:
+            roster.last_scans = previous.last_scans
+        self._rosters[workshop_id] = roster
+        return roster
+    
+    async def roster(self, workshop_id: str, refresh: bool = False) -> CheckinRoster:
+        roster = self._rosters.get(workshop_id)
+        if roster and not refresh and roster.age() < CHECKIN_ROSTER_TTL_SECONDS:
+            return roster
+        
+        # One reload per workshop however many scanners are waiting on it
+        loading = self._loading.get(workshop_id)
+        if loading is None:
+            loading = asyncio.create_task(self._load_roster(workshop_id))
+            self._loading[workshop_id] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(workshop_id, None))
+        return await asyncio.shield(loading)
+    
+    def invalidate(self, workshop_id: Optional[str] = None):
+        """Reload the roster on the next scan. Without a workshop, drop every roster."""
+        for roster in ([self._rosters.get(workshop_id)] if workshop_id else self._rosters.values()):
+            if roster:
+                roster.loaded_at = float("-inf")
+    
+    async def scan(self, workshop_id: str, scan: CheckinScan) -> dict:
+        """Check in the badge holder behind a scanned payload"""
+        roster = await self.roster(workshop_id)
+        entry = roster.entries.get(scan.payload)
+        if entry is None and roster.age() >= CHECKIN_ROSTER_REFRESH_SECONDS:
+            # Possibly approved after the roster was loaded
+            roster = await self.roster(workshop_id, refresh=True)
+            entry = roster.entries.get(scan.payload)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Badge not registered for this workshop")
+        return self.record(roster, entry, scan)
+    
+    def record(self, roster: CheckinRoster, entry: dict, scan: CheckinScan) -> dict:
+        # No awaits in here, so scans from several doors can't interleave
+        now = asyncio.get_running_loop().time()
+        scan_key = (scan.payload, scan.session_id)
+        last = roster.last_scans.get(scan_key)
+        if last and now - last[0] < self.duplicate_window:
+            return {**last[1], "status": "duplicate"}
+        
+        checkin = {
+            "id": str(uuid.uuid4()),
+            "workshop_id": roster.workshop_id,
+            "session_id": scan.session_id,
+            "badge_type": entry["badge_type"],
+            "person_id": entry["person_id"],
+            "name": entry["name"],
+            "scanner_id": scan.scanner_id,
+            "scanned_at": datetime.now(timezone.utc).isoformat(),
+        }
+        result = {**checkin, "organization": entry["organization"]}
+        roster.last_scans[scan_key] = (now, result)
+        self._pending.append(checkin)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return {**result, "status": "checked_in"}
+    
+    async def flush(self) -> int:
+        """Write buffered check-ins to Mongo. Returns the number written."""
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            recorded_at = datetime.now(timezone.utc).isoformat()
+            try:
+                # Upserts by id, so a batch retried after a partial failure is not duplicated
+                await self.collection.bulk_write(
+                    [UpdateOne({"id": c["id"]}, {"$setOnInsert": {**c, "recorded_at": recorded_at}}, upsert=True)
+                     for c in batch],
+                    ordered=False
+                )
+            except Exception:
+                self._pending[:0] = batch
+                raise
+            return len(batch)
+    
+    async def _worker(self):
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Check-in flush failed, {len(self._pending)} check-ins kept for retry: {e}")
+                await asyncio.sleep(self.flush_interval)
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._worker())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logging.error(f"Lost {len(self._pending)} check-ins on shutdown: {e}")
+
+
+checkin_service = CheckinService(db.checkins)
+
+
+@api_router.post("/workshops/{workshop_id}/checkins")
+async def scan_checkin(workshop_id: str, input: CheckinScan):
+    """Check in a participant or leader by the QR code on their name badge"""
+    parts = input.payload.split(":")
+    if len(parts) != 3 or parts[0] != "haggai" or parts[1] not in ("participant", "leader"):
+        raise HTTPException(status_code=400, detail="Not a Haggai name badge QR code")
+    return await checkin_service.scan(workshop_id, input)
+
+
+@api_router.get("/workshops/{workshop_id}/checkins")
+async def get_workshop_checkins(
+    workshop_id: str,
+    response: Response,
+    session_id: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """Check-ins for a workshop, newest first"""
+    # Include scans still waiting in the write-behind buffer
+    await checkin_service.flush()
+    
+    query = {"workshop_id": workshop_id}
+    if session_id:
+        query["session_id"] = session_id
+    return await paginate(db.checkins, query, {"_id": 0}, "scanned_at", -1, limit, cursor, response)
+
+
+# Offline scanners upload what they recorded and get back everything the
+# server learned since their last sync. The sync token carries the server
+# time of that sync and the roster version the scanner holds.
+CHECKIN_SYNC_OVERLAP_SECONDS = 5  # covers writes still in flight when the token was issued
+
+
+class OfflineCheckin(BaseModel):
+    id: str  # generated by the scanner, makes uploads idempotent
+    payload: str
+    session_id: Optional[str] = None
+    scanned_at: str
+
+
+class CheckinSync(BaseModel):
+    scanner_id: Optional[str] = None
+    sync_token: Optional[str] = None
+    events: List[OfflineCheckin] = Field(default_factory=list, max_length=5000)
+
+
+def encode_sync_token(synced_at: str, roster_version: str) -> str:
+    raw = json.dumps([synced_at, roster_version])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        synced_at, roster_version = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(synced_at), roster_version
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def parse_scan_time(value: str) -> Optional[str]:
+    """Normalise a scanner timestamp to UTC ISO format, None if unreadable"""
+    try:
+        scanned_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+    if scanned_at.tzinfo is None:
+        scanned_at = scanned_at.replace(tzinfo=timezone.utc)
+    return scanned_at.astimezone(timezone.utc).isoformat()
+
+
+@api_router.post("/workshops/{workshop_id}/checkins/sync")
+async def sync_offline_checkins(workshop_id: str, input: CheckinSync):
+    """Apply check-ins recorded offline and return the check-ins and roster changes since the last sync"""
+    since, client_roster_version = decode_sync_token(input.sync_token) if input.sync_token else (None, None)
+    
+    roster = await checkin_service.roster(workshop_id)
+    if any(event.payload not in roster.entries for event in input.events) \
+            and roster.age() >= CHECKIN_ROSTER_REFRESH_SECONDS:
+        roster = await checkin_service.roster(workshop_id, refresh=True)
+    
+    now = datetime.now(timezone.utc).isoformat()
+    rejected = []
+    duplicates = []
+    # Earliest scan per badge and session, the rest of the batch is a duplicate
+    earliest = {}
+    seen_ids = set()
+    for event in input.events:
+        if event.id in seen_ids:
+            continue
+        seen_ids.add(event.id)
+        
+        entry = roster.entries.get(event.payload)
+        scanned_at = parse_scan_time(event.scanned_at)
+        if entry is None:
+            rejected.append({"id": event.id, "reason": "Badge not registered for this workshop"})
+            continue
+        if scanned_at is None:
+            rejected.append({"id": event.id, "reason": "Invalid scanned_at"})
+            continue
+        
+        scan_key = (event.payload, event.session_id)
+        checkin = {
+            "id": event.id,
+            "workshop_id": workshop_id,
+            "session_id": event.session_id,
+            "badge_type": entry["badge_type"],
+            "person_id": entry["person_id"],
+            "name": entry["name"],
+            "scanner_id": input.scanner_id,
+            "scanned_at": scanned_at,
+            "recorded_at": now,
+            "offline": True,
+        }
+        previous = earliest.get(scan_key)
+        if previous is None or checkin["scanned_at"] < previous["scanned_at"]:
+            earliest[scan_key] = checkin
+            if previous:
+                duplicates.append(previous["id"])
+        else:
+            duplicates.append(event.id)
+    
+    accepted = []
+    checkins = list(earliest.values())
+    if checkins:
+        result = await db.checkins.bulk_write(
+            [UpdateOne({"id": c["id"]}, {"$setOnInsert": c}, upsert=True) for c in checkins],
+            ordered=False
+        )
+        # Ids the server already had come from an earlier upload of the same events
+        for index, checkin in enumerate(checkins):
+            (accepted if index in result.upserted_ids else duplicates).append(checkin["id"])
+    
+    # Delta for the scanner: everything recorded since its last sync, own uploads included
+    await checkin_service.flush()
+    synced_at = datetime.now(timezone.utc)
+    query = {"workshop_id": workshop_id}
+    if since:
+        query["recorded_at"] = {"$gt": (since - timedelta(seconds=CHECKIN_SYNC_OVERLAP_SECONDS)).isoformat()}
+    delta = await db.checkins.find(query, {"_id": 0}).sort([("recorded_at", 1), ("id", 1)]).to_list(None)
+    
+    return {
+        "accepted": accepted,
+        "duplicates": duplicates,
+        "rejected": rejected,
+        "checkins": delta,
+        # The full roster only when it changed since the scanner's copy
+        "roster": None if client_roster_version == roster.version else [
+            {"payload": payload, **entry} for payload, entry in roster.entries.items()
+        ],
+        "sync_token": encode_sync_token(synced_at.isoformat(), roster.version),
+    }
+
+
+# ==================== REALTIME EVENTS ====================
+# Members keep one Server-Sent Events stream open and are told about new
+# direct messages and forum activity as it happens, instead of re-polling
+# GET /messages and GET /forum. Events are hints: after a reconnect the
+# client refetches the lists, so nothing is replayed.
+
+class MemoryEventBackend:
+    """Delivers events to the current process only (single worker)"""
     
-    # Try to get location from workshop
-    event_location = None
-    event_id = participant.get("event_id")
-    if event_id:
-        workshop = await db.workshops.find_one({"id": event_id}, {"_id": 0, "location": 1})
-        if workshop:
-            event_location = workshop.get("location")
+    def __init__(self):
+        self._dispatch = None
     
-    # Generate PDF with enhanced info
-    pdf_buffer = generate_name_badge_pdf(
-        name=participant_name,
-        organization=organization,
-        workshop_title=workshop_title,
-        badge_type="participant",
-        event_date=event_date,
-        event_location=event_location,
-        person_id=participant_id
-    )
+    async def start(self, dispatch):
+        self._dispatch = dispatch
     
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="Name_Badge_{participant_name.replace(" ", "_")}.pdf"'
-        }
-    )
+    async def publish(self, channels: List[str], event: dict):
+        if self._dispatch:
+            self._dispatch(channels, event)
+    
+    async def stop(self):
+        self._dispatch = None
 
 
-@api_router.get("/leaders/{leader_id}/name-badge")
-async def get_leader_name_badge(leader_id: str):
-    """Generate and download name badge for an approved leader"""
-    leader = await db.leader_registrations.find_one(
-        {"id": leader_id, "status": "approved"},
-        {"_id": 0}
-    )
+class MongoEventBackend:
+    """Shares events between worker processes through a capped collection that every worker tails"""
     
-    if not leader:
-        raise HTTPException(status_code=404, detail="Approved leader not found")
+    def __init__(self, database, name: str = "realtime_events", max_bytes: int = REALTIME_EVENTS_MAX_BYTES):
+        self.database = database
+        self.name = name
+        self.max_bytes = max_bytes
+        self.collection = database[name]
+        self._task = None
     
-    # Get leader info
-    leader_name = leader.get("name", "Unknown")
-    # For leader, we'll use their organization or leave blank
-    organization = leader.get("employer_name", leader.get("church_name", ""))
-    primary_topic = leader.get("primary_topic")
-    role_title = leader.get("role_sv") or leader.get("role_en")
+    async def start(self, dispatch):
+        try:
+            await self.database.create_collection(self.name, capped=True, size=self.max_bytes)
+        except CollectionInvalid:
+            pass  # created by another worker
+        self._task = asyncio.create_task(self._tail(dispatch))
+    
+    async def publish(self, channels: List[str], event: dict):
+        await self.collection.insert_one({"channels": channels, "event": event})
+    
+    async def _tail(self, dispatch):
+        # Only events published after start-up; older ones are covered by the refetch on connect
+        last = await self.collection.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+        last_id = last["_id"] if last else None
+        while True:
+            try:
+                query = {"_id": {"$gt": last_id}} if last_id else {}
+                cursor = self.collection.find(query, {"_id": 1, "channels": 1, "event": 1},
+                                              cursor_type=CursorType.TAILABLE_AWAIT)
+                async for doc in cursor:
+                    last_id = doc["_id"]
+                    dispatch(doc["channels"], doc["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Realtime event tail failed: {e}")
+            # A tailable cursor on an empty collection closes right away
+            await asyncio.sleep(1)
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+def create_event_backend():
+    if REALTIME_BACKEND == "mongo":
+        return MongoEventBackend(db)
+    return MemoryEventBackend()
+
+
+class RealtimeHub:
+    """In-process pub/sub: fans published events out to the streams open in this worker"""
+    
+    def __init__(self, backend, queue_size: int = REALTIME_QUEUE_SIZE):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers = {}  # channel -> set of queues
+        self._channels = {}  # queue -> channels
+    
+    def subscribe(self, channels: List[str]) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        self._channels[queue] = channels
+        for channel in channels:
+            self._subscribers.setdefault(channel, set()).add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        for channel in self._channels.pop(queue, []):
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[channel]
+    
+    def dispatch(self, channels: List[str], event: dict):
+        queues = set()
+        for channel in channels:
+            queues.update(self._subscribers.get(channel, ()))
+        for queue in queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Client is not keeping up: close its stream, it reconnects and refetches
+                self.unsubscribe(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+    
+    async def publish(self, channels: List[str], event_type: str, data: dict):
+        event = {
+            "id": str(uuid.uuid4()),
+            "type": event_type,
+            "data": data,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            await self.backend.publish(channels, event)
+        except Exception as e:
+            # The write that triggered the event already succeeded; clients catch up on refetch
+            logging.error(f"Failed to publish {event_type} event: {e}")
     
-    # Try to get workshop info from invitation if available
-    invitation_id = leader.get("invitation_id")
-    workshop_title = "Haggai Workshop"
-    event_date = None
-    event_location = None
+    async def start(self):
+        await self.backend.start(self.dispatch)
     
-    if invitation_id:
-        invitation = await db.leader_invitations.find_one(
-            {"id": invitation_id},
-            {"_id": 0}
-        )
-        if invitation:
-            if invitation.get("workshop_title"):
-                workshop_title = invitation.get("workshop_title")
-            workshop_id = invitation.get("workshop_id")
-            if workshop_id:
-                workshop = await db.workshops.find_one({"id": workshop_id}, {"_id": 0})
-                if workshop:
-                    event_date = workshop.get("date")
-                    event_location = workshop.get("location")
+    async def stop(self):
+        await self.backend.stop()
+
+
+realtime_hub = RealtimeHub(create_event_backend())
+
+
+def member_channel(member_id: str) -> str:
+    return f"member:{member_id}"
+
+
+FORUM_CHANNEL = "forum"
+
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+@api_router.get("/members/events")
+async def stream_member_events(token: str = None, authorization: str = Header(None)):
+    """Server-Sent Events stream of new direct messages and forum activity for the logged in member"""
+    member = await get_current_member(token, authorization)
+    queue = realtime_hub.subscribe([member_channel(member["id"]), FORUM_CHANNEL])
     
-    # Generate PDF with enhanced info
-    pdf_buffer = generate_name_badge_pdf(
-        name=leader_name,
-        organization=organization,
-        workshop_title=workshop_title,
-        badge_type="leader",
-        event_date=event_date,
-        event_location=event_location,
-        person_id=leader_id,
-        role_title=role_title,
-        primary_topic=primary_topic
-    )
+    async def stream():
+        try:
+            # Sent on every (re)connect so the client knows to refetch what it missed
+            yield format_sse({
+                "id": str(uuid.uuid4()),
+                "type": "ready",
+                "data": {"unread_messages": member["unread_messages"]},
+            })
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), REALTIME_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield format_sse(event)
+        finally:
+            realtime_hub.unsubscribe(queue)
     
     return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="Name_Badge_{leader_name.replace(" ", "_")}.pdf"'
-        }
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
@@ -5199,7 +7586,7 @@ async def create_member_from_participant(participant: dict):
     
     # Generate password
     password = generate_password()
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    password_hash = await hash_password(password)
     
     member = {
         "id": str(uuid.uuid4()),
@@ -5225,6 +7612,7 @@ async def create_member_from_participant(participant: dict):
     }
     
     await db.members.insert_one(member)
+    await seed_all_pending_evaluations([email])
     
     # Send welcome email with password
     await send_member_welcome_email(email, registration_data.get("full_name", ""), password)
@@ -5282,10 +7670,10 @@ async def send_member_welcome_email(email: str, name: str, password: str):
     }
     
     try:
-        email_response = await asyncio.to_thread(resend.Emails.send, params)
-        logging.info(f"Member welcome email sent to {email}, id: {email_response.get('id')}")
+        email_id = await enqueue_email(params, tag="member_welcome")
+        logging.info(f"Member welcome email queued for {email}, id: {email_id}")
     except Exception as e:
-        logging.error(f"Failed to send member welcome email: {str(e)}")
+        logging.error(f"Failed to queue member welcome email: {str(e)}")
 
 
 # Member Authentication
@@ -5296,7 +7684,7 @@ async def member_login(input: MemberLogin):
     if not member:
         raise HTTPException(status_code=401, detail="Felaktig e-post eller lösenord")
     
-    if not bcrypt.checkpw(input.password.encode('utf-8'), member['password_hash'].encode('utf-8')):
+    if not await verify_and_upgrade_password(db.members, member, input.password):
         raise HTTPException(status_code=401, detail="Felaktig e-post eller lösenord")
     
     if not member.get('is_active', True):
@@ -5385,7 +7773,7 @@ async def update_member_profile(input: MemberProfileUpdate, token: str = None):
         if input.interests is not None:
             update_data["interests"] = input.interests
         if input.profile_image is not None:
-            update_data["profile_image"] = input.profile_image
+            update_data["profile_image"] = await store_image_data_url(input.profile_image)
         
         await db.members.update_one({"id": member_id}, {"$set": update_data})
         
@@ -5405,10 +7793,10 @@ async def change_member_password(old_password: str, new_password: str, token: st
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         member = await db.members.find_one({"id": payload['member_id']})
         
-        if not bcrypt.checkpw(old_password.encode('utf-8'), member['password_hash'].encode('utf-8')):
+        if not await verify_password(old_password, member['password_hash']):
             raise HTTPException(status_code=400, detail="Felaktigt nuvarande lösenord")
         
-        new_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        new_hash = await hash_password(new_password)
         await db.members.update_one(
             {"id": payload['member_id']},
             {"$set": {"password_hash": new_hash, "updated_at": datetime.now(timezone.utc).isoformat()}}
@@ -5421,7 +7809,12 @@ async def change_member_password(old_password: str, new_password: str, token: st
 
 # Member Directory
 @api_router.get("/members")
-async def get_all_members(token: str = None):
+async def get_all_members(
+    response: Response,
+    token: str = None,
+    limit: int = Query(1000, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     """Get all members (requires authentication)"""
     if not token:
         raise HTTPException(status_code=401, detail="Token required")
@@ -5429,12 +7822,10 @@ async def get_all_members(token: str = None):
     try:
         jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         
-        members = await db.members.find(
-            {"is_active": True},
-            {"_id": 0, "password_hash": 0}
-        ).sort("full_name", 1).to_list(1000)
-        
-        return members
+        return await paginate(
+            db.members, {"is_active": True}, {"_id": 0, "password_hash": 0},
+            "full_name", 1, limit, cursor, response
+        )
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
@@ -5461,6 +7852,65 @@ async def get_member_profile(member_id: str, token: str = None):
 
 
 # Direct Messages
+# Conversations: one summary document per pair of members, updated with every
+# message, so the inbox lists conversations without reading the messages.
+CONVERSATION_SNIPPET_LENGTH = 100
+
+
+def conversation_id(member_a: str, member_b: str) -> str:
+    return ":".join(sorted([member_a, member_b]))
+
+
+def conversation_last_message(message: dict) -> dict:
+    return {
+        "id": message["id"],
+        "sender_id": message["sender_id"],
+        "content": message["content"][:CONVERSATION_SNIPPET_LENGTH],
+        "created_at": message["created_at"],
+    }
+
+
+async def record_conversation_message(message: dict):
+    """Fold a new direct message into the conversation summary"""
+    sender_id, recipient_id = message["sender_id"], message["recipient_id"]
+    on_insert = {"participant_ids": sorted({sender_id, recipient_id}), "created_at": message["created_at"]}
+    if sender_id != recipient_id:
+        on_insert[f"unread.{sender_id}"] = 0
+    await db.conversations.update_one(
+        {"id": conversation_id(sender_id, recipient_id)},
+        {
+            "$set": {"last_message": conversation_last_message(message), "updated_at": message["created_at"]},
+            "$inc": {f"unread.{recipient_id}": 1},
+            "$setOnInsert": on_insert,
+        },
+        upsert=True
+    )
+
+
+async def rebuild_conversations() -> int:
+    """Rebuild all conversation summaries from direct_messages. Returns the number of conversations."""
+    summaries = {}
+    async for message in db.direct_messages.find({}, {"_id": 0}).sort("created_at", 1):
+        participant_ids = sorted({message["sender_id"], message["recipient_id"]})
+        summary = summaries.setdefault(conversation_id(message["sender_id"], message["recipient_id"]), {
+            "participant_ids": participant_ids,
+            "unread": dict.fromkeys(participant_ids, 0),
+            "created_at": message["created_at"],
+        })
+        summary["last_message"] = conversation_last_message(message)
+        summary["updated_at"] = message["created_at"]
+        if not message.get("read"):
+            summary["unread"][message["recipient_id"]] += 1
+    
+    if summaries:
+        await db.conversations.bulk_write(
+            [ReplaceOne({"id": cid}, {"id": cid, **summary}, upsert=True) for cid, summary in summaries.items()],
+            ordered=False
+        )
+    logging.info(f"Rebuilt {len(summaries)} conversation summaries")
+    return len(summaries)
+
+
 @api_router.post("/messages")
 async def send_direct_message(input: DirectMessage, token: str = None):
     """Send a direct message to another member"""
@@ -5488,6 +7938,21 @@ async def send_direct_message(input: DirectMessage, token: str = None):
         }
         
         await db.direct_messages.insert_one(message)
+        message.pop("_id", None)
+        await record_conversation_message(message)
+        await realtime_hub.publish(
+            [member_channel(input.recipient_id), member_channel(sender_id)],
+            "message.created",
+            {
+                "conversation_id": conversation_id(sender_id, input.recipient_id),
+                "message": message,
+                "sender": {
+                    "id": sender_id,
+                    "full_name": sender.get("full_name"),
+                    "profile_image": sender.get("profile_image"),
+                },
+            }
+        )
         
         # Send email notification
         await send_message_notification_email(
@@ -5526,19 +7991,24 @@ async def send_message_notification_email(recipient_email: str, recipient_name:
     """
     
     try:
-        await asyncio.to_thread(resend.Emails.send, {
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [recipient_email],
             "subject": f"💬 Nytt meddelande från {sender_name}",
             "html": html_content
-        })
+        }, tag="direct_message")
     except Exception as e:
-        logging.error(f"Failed to send message notification: {str(e)}")
+        logging.error(f"Failed to queue message notification: {str(e)}")
 
 
 @api_router.get("/messages")
-async def get_messages(token: str = None):
-    """Get all messages for current member (inbox)"""
+async def get_messages(
+    response: Response,
+    token: str = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """Get the current member's conversations (inbox), most recent first"""
     if not token:
         raise HTTPException(status_code=401, detail="Token required")
     
@@ -5546,31 +8016,28 @@ async def get_messages(token: str = None):
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         member_id = payload['member_id']
         
-        # Get conversations (unique sender/recipient pairs)
-        messages = await db.direct_messages.find({
-            "$or": [
-                {"sender_id": member_id},
-                {"recipient_id": member_id}
-            ]
-        }, {"_id": 0}).sort("created_at", -1).to_list(1000)
+        conversations = await paginate(
+            db.conversations, {"participant_ids": member_id}, {"_id": 0},
+            "updated_at", -1, limit, cursor, response
+        )
         
-        # Group by conversation partner
-        conversations = {}
-        for msg in messages:
-            partner_id = msg['recipient_id'] if msg['sender_id'] == member_id else msg['sender_id']
-            if partner_id not in conversations:
-                partner = await db.members.find_one({"id": partner_id}, {"_id": 0, "password_hash": 0})
-                conversations[partner_id] = {
-                    "partner": partner,
-                    "messages": [],
-                    "unread_count": 0,
-                    "last_message": msg
-                }
-            conversations[partner_id]['messages'].append(msg)
-            if msg['recipient_id'] == member_id and not msg['read']:
-                conversations[partner_id]['unread_count'] += 1
+        # A conversation with yourself has a single participant
+        partner_ids = [
+            next((p for p in conv["participant_ids"] if p != member_id), member_id)
+            for conv in conversations
+        ]
+        partners = await DocumentLoader(db.members, {"password_hash": 0}).load_many(partner_ids)
         
-        return list(conversations.values())
+        return [
+            {
+                "id": conv["id"],
+                "partner": partners.get(partner_id),
+                "unread_count": conv.get("unread", {}).get(member_id, 0),
+                "last_message": conv["last_message"],
+                "updated_at": conv["updated_at"]
+            }
+            for conv, partner_id in zip(conversations, partner_ids)
+        ]
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
@@ -5593,10 +8060,16 @@ async def get_conversation(partner_id: str, token: str = None):
         }, {"_id": 0}).sort("created_at", 1).to_list(1000)
         
         # Mark as read
-        await db.direct_messages.update_many(
+        result = await db.direct_messages.update_many(
             {"sender_id": partner_id, "recipient_id": member_id, "read": False},
             {"$set": {"read": True}}
         )
+        if result.modified_count:
+            # Decrement rather than reset, messages arriving meanwhile stay unread
+            await db.conversations.update_one(
+                {"id": conversation_id(member_id, partner_id)},
+                {"$inc": {f"unread.{member_id}": -result.modified_count}}
+            )
         
         partner = await db.members.find_one({"id": partner_id}, {"_id": 0, "password_hash": 0})
         
@@ -5606,6 +8079,36 @@ async def get_conversation(partner_id: str, token: str = None):
 
 
 # Forum
+# Replies live in forum_replies; posts only carry reply_count and
+# last_reply_at so listings stay small however long a thread gets.
+FORUM_POST_SUMMARY_PROJECTION = {"_id": 0, "replies": 0}
+
+
+async def migrate_forum_replies() -> int:
+    """Move replies embedded in forum_posts into forum_replies. Returns the number of posts migrated."""
+    migrated = 0
+    async for post in db.forum_posts.find({"replies": {"$exists": True}}, {"_id": 0, "id": 1, "replies": 1}):
+        replies = post.get("replies") or []
+        if replies:
+            await db.forum_replies.bulk_write(
+                [ReplaceOne({"id": reply["id"]}, {**reply, "post_id": post["id"]}, upsert=True) for reply in replies],
+                ordered=False
+            )
+        await db.forum_posts.update_one(
+            {"id": post["id"]},
+            {
+                "$set": {
+                    "reply_count": len(replies),
+                    "last_reply_at": max((reply["created_at"] for reply in replies), default=None),
+                },
+                "$unset": {"replies": ""},
+            }
+        )
+        migrated += 1
+    logging.info(f"Moved the replies of {migrated} forum posts to forum_replies")
+    return migrated
+
+
 @api_router.post("/forum")
 async def create_forum_post(input: ForumPost, token: str = None):
     """Create a new forum post"""
@@ -5623,45 +8126,64 @@ async def create_forum_post(input: ForumPost, token: str = None):
             "author_id": payload['member_id'],
             "author_name": author['full_name'],
             "author_image": author.get('profile_image'),
-            "replies": [],
+            "reply_count": 0,
+            "last_reply_at": None,
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat()
         }
         
         await db.forum_posts.insert_one(post)
+        post.pop("_id", None)
+        await realtime_hub.publish([FORUM_CHANNEL], "forum.post_created", {"post": post})
         return {"success": True, "post_id": post['id']}
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
 @api_router.get("/forum")
-async def get_forum_posts(token: str = None):
-    """Get all forum posts"""
+async def get_forum_posts(
+    response: Response,
+    token: str = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """Get all forum posts (summaries; replies are read per post)"""
     if not token:
         raise HTTPException(status_code=401, detail="Token required")
     
     try:
         jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         
-        posts = await db.forum_posts.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
-        return posts
+        return await paginate(
+            db.forum_posts, {}, FORUM_POST_SUMMARY_PROJECTION, "created_at", -1, limit, cursor, response
+        )
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
 @api_router.get("/forum/{post_id}")
-async def get_forum_post(post_id: str, token: str = None):
-    """Get a specific forum post with replies"""
+async def get_forum_post(
+    post_id: str,
+    response: Response,
+    token: str = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """Get a specific forum post with one page of its replies, newest first.
+    Follow X-Next-Cursor for older replies."""
     if not token:
         raise HTTPException(status_code=401, detail="Token required")
     
     try:
         jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         
-        post = await db.forum_posts.find_one({"id": post_id}, {"_id": 0})
+        post = await db.forum_posts.find_one({"id": post_id}, FORUM_POST_SUMMARY_PROJECTION)
         if not post:
             raise HTTPException(status_code=404, detail="Post not found")
         
+        post["replies"] = await paginate(
+            db.forum_replies, {"post_id": post_id}, {"_id": 0}, "created_at", -1, limit, cursor, response
+        )
         return post
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -5675,10 +8197,13 @@ async def reply_to_forum_post(post_id: str, input: ForumReply, token: str = None
     
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        if not await db.forum_posts.find_one({"id": post_id}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Post not found")
         author = await db.members.find_one({"id": payload['member_id']}, {"_id": 0, "password_hash": 0})
         
         reply = {
             "id": str(uuid.uuid4()),
+            "post_id": post_id,
             "content": input.content,
             "author_id": payload['member_id'],
             "author_name": author['full_name'],
@@ -5686,13 +8211,17 @@ async def reply_to_forum_post(post_id: str, input: ForumReply, token: str = None
             "created_at": datetime.now(timezone.utc).isoformat()
         }
         
+        await db.forum_replies.insert_one(reply)
+        reply.pop("_id", None)
         await db.forum_posts.update_one(
             {"id": post_id},
             {
-                "$push": {"replies": reply},
-                "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
+                "$inc": {"reply_count": 1},
+                "$max": {"last_reply_at": reply["created_at"]},
+                "$set": {"updated_at": reply["created_at"]}
             }
         )
+        await realtime_hub.publish([FORUM_CHANNEL], "forum.reply_created", {"post_id": post_id, "reply": reply})
         
         return {"success": True, "reply_id": reply['id']}
     except jwt.InvalidTokenError:
@@ -5829,6 +8358,150 @@ async def get_workshop_topics():
     return WORKSHOP_TOPICS
 
 
+# ==================== LEADER DOCUMENT STORAGE ====================
+# Uploads are streamed into the "leader_documents" GridFS bucket one chunk
+# at a time. The registration only keeps metadata. Each document's id is
+# also its GridFS file id.
+
+LEADER_DOCUMENT_TYPES = ["topic_material", "receipt", "travel_ticket", "profile_image", "other"]
+
+leader_documents_fs = AsyncIOMotorGridFSBucket(
+    db, bucket_name="leader_documents", chunk_size_bytes=DOCUMENT_CHUNK_BYTES
+)
+
+
+def guess_content_type(filename: str) -> str:
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+async def store_leader_document(upload: UploadFile, document: dict, leader_id: str) -> int:
+    """Stream an upload into GridFS. Returns its size in bytes."""
+    grid_in = leader_documents_fs.open_upload_stream_with_id(
+        document["id"],
+        document["filename"],
+        metadata={"leader_id": leader_id, "type": document["type"], "content_type": document["content_type"]}
+    )
+    size = 0
+    try:
+        while chunk := await upload.read(DOCUMENT_CHUNK_BYTES):
+            size += len(chunk)
+            if size > LEADER_DOCUMENT_MAX_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Filen är för stor (max {LEADER_DOCUMENT_MAX_BYTES // (1024 * 1024)} MB)"
+                )
+            await grid_in.write(chunk)
+        await grid_in.close()
+    except Exception:
+        await grid_in.abort()
+        raise
+    return size
+
+
+async def open_leader_document(document_id: str):
+    try:
+        return await leader_documents_fs.open_download_stream(document_id)
+    except NoFile:
+        raise HTTPException(status_code=404, detail="Dokument hittades inte")
+
+
+async def delete_leader_document_file(document_id: str):
+    try:
+        await leader_documents_fs.delete(document_id)
+    except NoFile:
+        pass
+
+
+def parse_byte_range(range_header: Optional[str], length: int) -> Optional[tuple]:
+    """Inclusive (first, last) for a single "bytes=" range, or None to send the whole file"""
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start, _, end = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start:
+            first, last = int(start), int(end) if end else length - 1
+        else:
+            first, last = length - int(end), length - 1
+    except ValueError:
+        return None
+    if first < 0 or first > last or first >= length:
+        raise HTTPException(status_code=416, detail="Range Not Satisfiable", headers={"Content-Range": f"bytes */{length}"})
+    return first, min(last, length - 1)
+
+
+def leader_document_response(grid_out, range_header: Optional[str], if_none_match: Optional[str]) -> Response:
+    """Stream a stored document, or the requested byte range of it, chunk by chunk"""
+    key = str(grid_out._id)
+    headers = {"ETag": f'"{key}"', "Cache-Control": "private, no-cache", "Accept-Ranges": "bytes"}
+    if etag_matches(if_none_match, key):
+        return Response(status_code=304, headers=headers)
+    
+    length = grid_out.length
+    byte_range = parse_byte_range(range_header, length)
+    first, last = byte_range or (0, length - 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {first}-{last}/{length}"
+    headers["Content-Length"] = str(last - first + 1)
+    headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(grid_out.filename)}"
+    
+    async def body():
+        grid_out.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(DOCUMENT_CHUNK_BYTES, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+    
+    return StreamingResponse(
+        body(),
+        status_code=206 if byte_range else 200,
+        media_type=(grid_out.metadata or {}).get("content_type") or guess_content_type(grid_out.filename),
+        headers=headers
+    )
+
+
+async def migrate_leader_documents() -> int:
+    """Move base64 documents embedded in leader_registrations into GridFS. Returns the number moved."""
+    moved = 0
+    async for registration in db.leader_registrations.find(
+        {"documents.data": {"$exists": True}}, {"_id": 0, "id": 1, "documents": 1}
+    ):
+        for document in registration.get("documents") or []:
+            if "data" not in document:
+                continue
+            try:
+                content = base64.b64decode(document["data"])
+            except (binascii.Error, ValueError) as e:
+                # Flag it so the next startup doesn't find it embedded again
+                logging.error(f"Dropping undecodable document {document.get('id')} of leader {registration['id']}: {e}")
+                await db.leader_registrations.update_one(
+                    {"id": registration["id"], "documents.id": document["id"]},
+                    {"$set": {"documents.$.corrupt": True}, "$unset": {"documents.$.data": ""}}
+                )
+                continue
+            content_type = guess_content_type(document["filename"])
+            # An earlier run may have stopped between the upload and the update
+            if not await db["leader_documents.files"].find_one({"_id": document["id"]}, {"_id": 1}):
+                await leader_documents_fs.upload_from_stream_with_id(
+                    document["id"],
+                    document["filename"],
+                    content,
+                    metadata={"leader_id": registration["id"], "type": document["type"], "content_type": content_type}
+                )
+            await db.leader_registrations.update_one(
+                {"id": registration["id"], "documents.id": document["id"]},
+                {
+                    "$set": {"documents.$.content_type": content_type, "documents.$.size": len(content)},
+                    "$unset": {"documents.$.data": ""},
+                }
+            )
+            moved += 1
+    logging.info(f"Moved {moved} leader documents to GridFS")
+    return moved
+
+
 # ==================== LEADER INVITATION & REGISTRATION ENDPOINTS ====================
 
 # --- Leader Invitations ---
@@ -6029,12 +8702,12 @@ async def create_leader_invitation(input: LeaderInvitationCreate):
     """
     
     try:
-        resend.Emails.send({
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [input.email],
             "subject": txt['subject'],
             "html": email_html
-        })
+        }, tag="leader_invitation")
         
         # Update sent_at
         await db.leader_invitations.update_one(
@@ -6042,7 +8715,7 @@ async def create_leader_invitation(input: LeaderInvitationCreate):
             {"$set": {"sent_at": datetime.now(timezone.utc).isoformat()}}
         )
     except Exception as e:
-        logger.error(f"Failed to send invitation email: {e}")
+        logger.error(f"Failed to queue invitation email: {e}")
     
     return {"message": "Inbjudan skickad", "invitation_id": invitation.id}
 
@@ -6143,19 +8816,19 @@ async def resend_leader_invitation(invitation_id: str):
     """
     
     try:
-        resend.Emails.send({
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [invitation['email']],
             "subject": txt['subject'],
             "html": email_html
-        })
+        }, tag="leader_invitation")
         
         await db.leader_invitations.update_one(
             {"id": invitation_id},
             {"$set": {"sent_at": datetime.now(timezone.utc).isoformat()}}
         )
     except Exception as e:
-        logger.error(f"Failed to resend invitation email: {e}")
+        logger.error(f"Failed to queue invitation email: {e}")
         raise HTTPException(status_code=500, detail="Kunde inte skicka e-post")
     
     return {"message": "Påminnelse skickad"}
@@ -6186,7 +8859,7 @@ async def register_leader(token: str, input: LeaderRegistrationCreate):
         raise HTTPException(status_code=400, detail="Denna e-post är redan registrerad")
     
     # Hash password
-    password_hash = bcrypt.hashpw(input.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    password_hash = await hash_password(input.password)
     
     # Create leader registration
     leader_data = input.model_dump()
@@ -6196,7 +8869,7 @@ async def register_leader(token: str, input: LeaderRegistrationCreate):
     
     # Store profile image in image_url field if provided
     if input.profile_image:
-        leader_data['image_url'] = input.profile_image
+        leader_data['image_url'] = await store_image_data_url(input.profile_image)
     
     leader = LeaderRegistration(
         **leader_data,
@@ -6231,12 +8904,12 @@ async def register_leader(token: str, input: LeaderRegistrationCreate):
         </div>
         """
         
-        resend.Emails.send({
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [ADMIN_EMAIL],
             "subject": f"Ny ledarregistrering: {leader.name}",
             "html": admin_html
-        })
+        }, tag="leader_registration_admin")
     except Exception as e:
         logger.error(f"Failed to send admin notification: {e}")
     
@@ -6317,6 +8990,8 @@ async def approve_leader_registration(registration_id: str):
         {"$set": leader_doc},
         upsert=True
     )
+    # The leader may run sessions in any workshop
+    checkin_service.invalidate()
     
     # Send approval email
     try:
@@ -6359,12 +9034,12 @@ async def approve_leader_registration(registration_id: str):
         </div>
         """
         
-        resend.Emails.send({
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [registration['email']],
             "subject": "Din registrering är godkänd - Haggai Sweden",
             "html": email_html
-        })
+        }, tag="leader_registration_approved")
     except Exception as e:
         logger.error(f"Failed to send approval email: {e}")
     
@@ -6386,6 +9061,7 @@ async def reject_leader_registration(registration_id: str, reason: Optional[str]
             "updated_at": datetime.now(timezone.utc).isoformat()
         }}
     )
+    checkin_service.invalidate()
     
     # Send rejection email
     try:
@@ -6413,12 +9089,12 @@ async def reject_leader_registration(registration_id: str, reason: Optional[str]
         </div>
         """
         
-        resend.Emails.send({
+        await enqueue_email({
             "from": SENDER_EMAIL,
             "to": [registration['email']],
             "subject": "Angående din registrering - Haggai Sweden",
             "html": email_html
-        })
+        }, tag="leader_registration_rejected")
     except Exception as e:
         logger.error(f"Failed to send rejection email: {e}")
     
@@ -6437,7 +9113,7 @@ async def leader_login(input: LeaderLogin):
     if not leader.get("password_hash"):
         raise HTTPException(status_code=401, detail="Kontot är inte aktiverat")
     
-    if not bcrypt.checkpw(input.password.encode('utf-8'), leader['password_hash'].encode('utf-8')):
+    if not await verify_and_upgrade_password(db.leader_registrations, leader, input.password):
         raise HTTPException(status_code=401, detail="Fel e-post eller lösenord")
     
     if leader.get("status") != "approved":
@@ -6468,10 +9144,10 @@ async def leader_login(input: LeaderLogin):
 async def upload_leader_document(
     document_type: str = None,
     filename: str = None,
-    file_data: str = None,  # Base64 encoded
+    file: UploadFile = File(None),
     authorization: str = Header(None)
 ):
-    """Upload a document for the current leader"""
+    """Upload a document for the current leader (multipart, streamed to GridFS)"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Ej auktoriserad")
     
@@ -6487,64 +9163,86 @@ async def upload_leader_document(
     
     leader_id = payload['sub']
     
-    if not document_type or not filename or not file_data:
-        raise HTTPException(status_code=400, detail="document_type, filename och file_data krävs")
+    if not document_type or file is None:
+        raise HTTPException(status_code=400, detail="document_type och file krävs")
     
     # Valid document types
-    valid_types = ["topic_material", "receipt", "travel_ticket", "profile_image", "other"]
-    if document_type not in valid_types:
-        raise HTTPException(status_code=400, detail=f"Ogiltig dokumenttyp. Giltiga: {valid_types}")
+    if document_type not in LEADER_DOCUMENT_TYPES:
+        raise HTTPException(status_code=400, detail=f"Ogiltig dokumenttyp. Giltiga: {LEADER_DOCUMENT_TYPES}")
     
+    filename = filename or file.filename or "document"
+    content_type = file.content_type
+    if not content_type or content_type == "application/octet-stream":
+        content_type = guess_content_type(filename)
     document = {
         "id": str(uuid.uuid4()),
         "filename": filename,
         "type": document_type,
-        "data": file_data,  # Store base64 in MongoDB
+        "content_type": content_type,
         "uploaded_at": datetime.now(timezone.utc).isoformat()
     }
+    document["size"] = await store_leader_document(file, document, leader_id)
+    
+    update = {"updated_at": datetime.now(timezone.utc).isoformat()}
+    # A profile image stays in documents as the original upload; image_url
+    # points at the thumbnails, which are what is shown
+    if document_type == "profile_image":
+        try:
+            if document["size"] > IMAGE_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Bilden är för stor (max {IMAGE_MAX_BYTES // (1024 * 1024)} MB)")
+            await file.seek(0)
+            update["image_url"] = await store_image(await file.read())
+        except HTTPException:
+            await delete_leader_document_file(document["id"])
+            raise
+    
+    result = await db.leader_registrations.update_one(
+        {"id": leader_id},
+        {"$push": {"documents": document}, "$set": update}
+    )
+    if not result.matched_count:
+        await delete_leader_document_file(document["id"])
+        raise HTTPException(status_code=404, detail="Ledare hittades inte")
     
-    # If profile image, also update image_url field
     if document_type == "profile_image":
-        # Create data URL for image
-        # Detect mime type from filename
-        ext = filename.lower().split('.')[-1]
-        mime_types = {
-            'jpg': 'image/jpeg',
-            'jpeg': 'image/jpeg',
-            'png': 'image/png',
-            'gif': 'image/gif',
-            'webp': 'image/webp'
-        }
-        mime_type = mime_types.get(ext, 'image/jpeg')
-        data_url = f"data:{mime_type};base64,{file_data}"
-        
-        await db.leader_registrations.update_one(
-            {"id": leader_id},
-            {
-                "$push": {"documents": document},
-                "$set": {
-                    "image_url": data_url,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }
-            }
-        )
-        
         # Also update main leaders collection if approved
-        leader = await db.leader_registrations.find_one({"id": leader_id})
+        leader = await db.leader_registrations.find_one({"id": leader_id}, {"_id": 0, "status": 1})
         if leader and leader.get("status") == "approved":
-            await db.leaders.update_one({"id": leader_id}, {"$set": {"image_url": data_url}})
-    else:
-        await db.leader_registrations.update_one(
-            {"id": leader_id},
-            {
-                "$push": {"documents": document},
-                "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
-            }
-        )
+            await db.leaders.update_one({"id": leader_id}, {"$set": {"image_url": update["image_url"]}})
     
     return {"message": "Dokument uppladdat", "document_id": document["id"]}
 
 
+@api_router.get("/leaders/me/documents/{document_id}")
+async def download_leader_document(
+    document_id: str,
+    authorization: str = Header(None),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Download one of the current leader's documents. Supports HTTP Range requests."""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Ej auktoriserad")
+    
+    token = authorization.replace("Bearer ", "")
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        if payload.get("type") != "leader":
+            raise HTTPException(status_code=401, detail="Ogiltig token")
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token har gått ut")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Ogiltig token")
+    
+    leader_id = payload['sub']
+    
+    grid_out = await open_leader_document(document_id)
+    if (grid_out.metadata or {}).get("leader_id") != leader_id:
+        raise HTTPException(status_code=404, detail="Dokument hittades inte")
+    
+    return leader_document_response(grid_out, range_header, if_none_match)
+
+
 @api_router.delete("/leaders/me/documents/{document_id}")
 async def delete_leader_document(document_id: str, authorization: str = Header(None)):
     """Delete a document"""
@@ -6563,13 +9261,15 @@ async def delete_leader_document(document_id: str, authorization: str = Header(N
     
     leader_id = payload['sub']
     
-    await db.leader_registrations.update_one(
-        {"id": leader_id},
+    result = await db.leader_registrations.update_one(
+        {"id": leader_id, "documents.id": document_id},
         {
             "$pull": {"documents": {"id": document_id}},
             "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
         }
     )
+    if result.modified_count:
+        await delete_leader_document_file(document_id)
     
     return {"message": "Dokument raderat"}
 
@@ -6597,30 +9297,105 @@ async def get_current_leader_sessions(authorization: str = Header(None)):
     if not leader:
         raise HTTPException(status_code=404, detail="Ledare hittades inte")
     
-    # Find all agendas with sessions assigned to this leader
-    all_agendas = await db.agenda.find({}, {"_id": 0}).to_list(100)
-    
-    sessions_with_workshop = []
-    for agenda in all_agendas:
-        workshop = await db.workshops.find_one({"id": agenda.get("workshop_id")}, {"_id": 0})
-        if not workshop:
-            continue
-        
-        for day in agenda.get("days", []):
-            for session in day.get("sessions", []):
-                # Check if this leader is assigned
-                if session.get("leader_id") == leader_id or session.get("leader_id") == leader.get("email"):
-                    sessions_with_workshop.append({
-                        "session": session,
-                        "day_date": day.get("date"),
-                        "day_title": day.get("title"),
-                        "workshop_id": agenda.get("workshop_id"),
-                        "workshop_title": workshop.get("title"),
-                        "workshop_date": workshop.get("date"),
-                        "workshop_location": workshop.get("location")
-                    })
+    # Sessions are assigned by leader id or email
+    rows = await db.agenda_sessions.find(
+        {"leader_id": {"$in": [key for key in (leader_id, leader.get("email")) if key]}}, {"_id": 0}
+    ).sort([("day_date", 1), ("start_time", 1)]).to_list(1000)
     
-    return sessions_with_workshop
+    return [
+        {
+            "session": row["session"],
+            "day_date": row["day_date"],
+            "day_title": row["day_title"],
+            "workshop_id": row["workshop_id"],
+            "workshop_title": row["workshop_title"],
+            "workshop_date": row["workshop_date"],
+            "workshop_location": row["workshop_location"]
+        }
+        for row in rows
+    ]
+
+
+# ==================== EMAIL OUTBOX ENDPOINTS ====================
+
+@api_router.get("/email-outbox")
+async def get_email_outbox(
+    response: Response,
+    status: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    token: str = None,
+    authorization: str = Header(None),
+):
+    """List queued and delivered emails (admin)"""
+    require_board_member(token, authorization)
+    query = {}
+    if status:
+        query["status"] = status
+    if tag:
+        query["tag"] = tag
+    return await paginate(
+        db.email_outbox, query, {"_id": 0, "params": 0},
+        "created_at", -1, limit, cursor, response
+    )
+
+
+@api_router.get("/email-outbox/{message_id}")
+async def get_email_outbox_message(message_id: str, token: str = None, authorization: str = Header(None)):
+    """Get delivery status for a single email (admin)"""
+    require_board_member(token, authorization)
+    message = await db.email_outbox.find_one({"id": message_id}, {"_id": 0, "params": 0})
+    if not message:
+        raise HTTPException(status_code=404, detail="Email not found")
+    return message
+
+
+@api_router.post("/email-outbox/{message_id}/retry")
+async def retry_email_outbox_message(message_id: str, token: str = None, authorization: str = Header(None)):
+    """Put a dead or failed email back in the delivery queue (admin)"""
+    require_board_member(token, authorization)
+    now = datetime.now(timezone.utc).isoformat()
+    result = await db.email_outbox.update_one(
+        {"id": message_id, "status": {"$in": ["dead", "pending"]}},
+        {"$set": {
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "updated_at": now,
+        }}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Email not found or already delivered")
+    email_outbox.wake()
+    return {"success": True, "message": "Email queued for retry"}
+
+
+@api_router.get("/email-broadcasts")
+async def get_email_broadcasts(
+    response: Response,
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    token: str = None,
+    authorization: str = Header(None),
+):
+    """List email broadcasts with their progress (admin)"""
+    require_board_member(token, authorization)
+    query = {"kind": kind} if kind else {}
+    return await paginate(
+        db.email_broadcasts, query, {"_id": 0}, "created_at", -1, limit, cursor, response
+    )
+
+
+@api_router.get("/email-broadcasts/{broadcast_id}")
+async def get_email_broadcast(broadcast_id: str, token: str = None, authorization: str = Header(None)):
+    """Get progress for a single broadcast (admin)"""
+    require_board_member(token, authorization)
+    broadcast = await db.email_broadcasts.find_one({"id": broadcast_id}, {"_id": 0})
+    if not broadcast:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    return broadcast
 
 
 # ==================== DONATION SETTINGS ====================
@@ -6679,6 +9454,186 @@ async def update_donation_settings(settings: DonationSettingsUpdate):
     return {"message": "Settings updated successfully"}
 
 
+# ==================== DATABASE INDEXES ====================
+
+# Every collection lookup the API performs should be backed by one of these.
+# Keys are (field, direction) pairs; "unique" is only set on fields whose
+# values are generated by the server (ids and tokens), so building an index
+# can never fail on historic duplicate data.
+INDEX_REGISTRY = [
+    # Core entities looked up by id
+    {"collection": "leaders", "keys": [("id", 1)], "unique": True},
+    {"collection": "board_members", "keys": [("id", 1)], "unique": True},
+    {"collection": "board_members", "keys": [("email", 1)]},
+    {"collection": "board_members", "keys": [("is_current", 1)]},
+    {"collection": "board_meetings", "keys": [("id", 1)], "unique": True},
+    {"collection": "board_meetings", "keys": [("status", 1), ("date", -1)]},
+    {"collection": "contact_requests", "keys": [("id", 1)], "unique": True},
+    {"collection": "contact_requests", "keys": [("created_at", -1), ("id", -1)]},
+    {"collection": "contact_requests", "keys": [("status", 1), ("created_at", -1), ("id", -1)]},
+    {"collection": "organization_members", "keys": [("id", 1)], "unique": True},
+    {"collection": "partners", "keys": [("id", 1)], "unique": True},
+    {"collection": "testimonials", "keys": [("id", 1)], "unique": True},
+    {"collection": "categories", "keys": [("id", 1)], "unique": True},
+    {"collection": "images", "keys": [("id", 1)], "unique": True},
+    {"collection": "workshops", "keys": [("id", 1)], "unique": True},
+    {"collection": "workshop_agendas", "keys": [("workshop_id", 1)]},
+    {"collection": "workshop_agendas", "keys": [("is_published", 1)]},
+    {"collection": "agenda_sessions", "keys": [("id", 1)], "unique": True},
+    {"collection": "agenda_sessions", "keys": [("leader_id", 1), ("day_date", 1), ("start_time", 1)]},
+    {"collection": "agenda_sessions", "keys": [("workshop_id", 1), ("day_date", 1), ("start_time", 1)]},
+    {"collection": "evaluation_questions", "keys": [("id", 1)], "unique": True},
+    {"collection": "evaluation_questions", "keys": [("is_active", 1), ("order", 1)]},
+    {"collection": "leader_experience_applications", "keys": [("id", 1)], "unique": True},
+    {"collection": "leader_experience_applications", "keys": [("program_id", 1)]},
+    {"collection": "leader_feedback", "keys": [("leader_id", 1)]},
+    {"collection": "status_checks", "keys": [("timestamp", 1), ("id", 1)]},
+
+    # Email outbox
+    {"collection": "email_outbox", "keys": [("id", 1)], "unique": True},
+    {"collection": "email_outbox", "keys": [("status", 1), ("next_attempt_at", 1)]},
+    {"collection": "email_outbox", "keys": [("status", 1), ("locked_until", 1)]},
+    {"collection": "email_outbox", "keys": [("created_at", -1), ("id", -1)]},
+    {"collection": "email_outbox", "keys": [("status", 1), ("created_at", -1), ("id", -1)]},
+    {"collection": "email_outbox", "keys": [("tag", 1), ("created_at", -1), ("id", -1)]},
+    {"collection": "email_broadcasts", "keys": [("id", 1)], "unique": True},
+    {"collection": "email_broadcasts", "keys": [("status", 1)]},
+    {"collection": "email_broadcasts", "keys": [("created_at", -1), ("id", -1)]},
+    {"collection": "email_broadcasts", "keys": [("kind", 1), ("created_at", -1), ("id", -1)]},
+    {"collection": "email_broadcast_chunks", "keys": [("id", 1)], "unique": True},
+    {"collection": "email_broadcast_chunks", "keys": [("broadcast_id", 1), ("status", 1), ("index", 1)]},
+
+    # Nominations / training participants
+    {"collection": "nominations", "keys": [("id", 1)], "unique": True},
+    {"collection": "nominations", "keys": [("event_id", 1), ("status", 1)]},
+    {"collection": "nominations", "keys": [("created_at", -1), ("id", -1)]},
+    {"collection": "nominations", "keys": [("status", 1), ("created_at", -1), ("id", -1)]},
+    {"collection": "nominations", "keys": [("registration_completed", 1), ("created_at", -1), ("id", -1)]},
+    {"collection": "nominations", "keys": [("nominee_email", 1)]},
+
+    # Session evaluations
+    {"collection": "session_evaluations", "keys": [("id", 1)], "unique": True},
+    {"collection": "session_evaluations", "keys": [("leader_id", 1), ("created_at", 1), ("id", 1)]},
+    {"collection": "session_evaluations", "keys": [("leader_id", 1), ("workshop_id", 1), ("created_at", 1), ("id", 1)]},
+    {"collection": "session_evaluations", "keys": [("session_id", 1), ("created_at", 1), ("id", 1)]},
+    {"collection": "session_evaluations", "keys": [("workshop_id", 1), ("session_id", 1)]},
+    {"collection": "session_evaluations", "keys": [("participant_email", 1)]},
+    {"collection": "evaluation_rollups", "keys": [("workshop_id", 1), ("session_id", 1), ("leader_id", 1), ("question_id", 1)], "unique": True},
+    {"collection": "evaluation_rollups", "keys": [("leader_id", 1), ("workshop_id", 1)]},
+    {"collection": "evaluation_rollups", "keys": [("session_id", 1)]},
+    {"collection": "pending_evaluations", "keys": [("participant_email", 1), ("session_id", 1)], "unique": True},
+    {"collection": "pending_evaluations", "keys": [("workshop_id", 1)]},
+    {"collection": "pending_evaluations", "keys": [("session_id", 1)]},
+
+    # Portals and authentication
+    {"collection": "participants", "keys": [("id", 1)], "unique": True},
+    {"collection": "participants", "keys": [("email", 1)]},
+    {"collection": "members", "keys": [("id", 1)], "unique": True},
+    {"collection": "members", "keys": [("email", 1)]},
+    {"collection": "members", "keys": [("is_active", 1), ("full_name", 1), ("id", 1)]},
+    {"collection": "password_resets", "keys": [("token", 1)], "unique": True},
+
+    # Member messaging and forum
+    {"collection": "direct_messages", "keys": [("id", 1)], "unique": True},
+    {"collection": "direct_messages", "keys": [("sender_id", 1), ("recipient_id", 1), ("created_at", -1)]},
+    {"collection": "direct_messages", "keys": [("recipient_id", 1), ("read", 1)]},
+    {"collection": "conversations", "keys": [("id", 1)], "unique": True},
+    {"collection": "conversations", "keys": [("participant_ids", 1), ("updated_at", -1), ("id", -1)]},
+    {"collection": "forum_posts", "keys": [("id", 1)], "unique": True},
+    {"collection": "forum_posts", "keys": [("created_at", -1), ("id", -1)]},
+    {"collection": "forum_replies", "keys": [("id", 1)], "unique": True},
+    {"collection": "forum_replies", "keys": [("post_id", 1), ("created_at", 1), ("id", 1)]},
+
+    # Leader invitations and registrations
+    {"collection": "leader_invitations", "keys": [("id", 1)], "unique": True},
+    {"collection": "leader_invitations", "keys": [("token", 1)], "unique": True},
+    {"collection": "leader_invitations", "keys": [("email", 1), ("status", 1)]},
+    {"collection": "leader_invitations", "keys": [("created_at", -1)]},
+    {"collection": "leader_registrations", "keys": [("id", 1)], "unique": True},
+    {"collection": "leader_registrations", "keys": [("email", 1)]},
+    {"collection": "leader_registrations", "keys": [("status", 1)]},
+
+    # Check-ins
+    {"collection": "checkins", "keys": [("id", 1)], "unique": True},
+    {"collection": "checkins", "keys": [("workshop_id", 1), ("scanned_at", -1), ("id", -1)]},
+    {"collection": "checkins", "keys": [("workshop_id", 1), ("session_id", 1), ("scanned_at", -1), ("id", -1)]},
+    {"collection": "checkins", "keys": [("workshop_id", 1), ("recorded_at", 1), ("id", 1)]},
+]
+
+
+def index_name(keys) -> str:
+    """Build the default MongoDB name for an index key specification"""
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def validate_index_registry(registry: list) -> dict:
+    """Group the registry by collection and reject conflicting definitions"""
+    by_collection = {}
+    for spec in registry:
+        keys = [tuple(k) for k in spec["keys"]]
+        name = spec.get("name") or index_name(keys)
+        unique = bool(spec.get("unique", False))
+        indexes = by_collection.setdefault(spec["collection"], {})
+        
+        for existing_name, existing in indexes.items():
+            same_name = existing_name == name
+            same_keys = existing["keys"] == keys
+            if (same_name or same_keys) and (existing["keys"], existing["unique"]) != (keys, unique):
+                raise RuntimeError(
+                    f"Conflicting index definitions for {spec['collection']}: "
+                    f"{existing_name} {existing['keys']} unique={existing['unique']} vs "
+                    f"{name} {keys} unique={unique}"
+                )
+        indexes[name] = {"keys": keys, "unique": unique}
+    return by_collection
+
+
+async def ensure_collection_indexes(collection, indexes: dict) -> dict:
+    """Create the missing indexes on one collection, failing on conflicts"""
+    report = {"created": [], "existing": []}
+    current = await collection.index_information()
+    
+    for name, spec in indexes.items():
+        keys, unique = spec["keys"], spec["unique"]
+        found = None
+        for existing_name, info in current.items():
+            if existing_name == name or [tuple(k) for k in info["key"]] == keys:
+                found = (existing_name, info)
+                break
+        
+        if found:
+            existing_name, info = found
+            existing_keys = [tuple(k) for k in info["key"]]
+            if existing_keys != keys or bool(info.get("unique", False)) != unique:
+                raise RuntimeError(
+                    f"Index {collection.name}.{existing_name} exists as {existing_keys} "
+                    f"unique={bool(info.get('unique', False))}, registry wants {keys} unique={unique}"
+                )
+            report["existing"].append(existing_name)
+            continue
+        
+        await collection.create_index(keys, name=name, unique=unique)
+        report["created"].append(name)
+    
+    return report
+
+
+async def ensure_indexes(registry: list = None) -> dict:
+    """Apply the index registry. Safe to run on every startup."""
+    by_collection = validate_index_registry(INDEX_REGISTRY if registry is None else registry)
+    
+    report = {}
+    for collection_name, indexes in by_collection.items():
+        report[collection_name] = await ensure_collection_indexes(db[collection_name], indexes)
+    
+    created = [f"{c}.{name}" for c, r in report.items() for name in r["created"]]
+    existing_count = sum(len(r["existing"]) for r in report.values())
+    if created:
+        logging.info(f"Created {len(created)} indexes: {', '.join(created)}")
+    logging.info(f"Index check complete: {len(created)} created, {existing_count} already present")
+    return report
+
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -6688,6 +9643,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Configure logging
@@ -6697,6 +9653,83 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_db_indexes():
+    await ensure_indexes()
+
+@app.on_event("startup")
+async def bootstrap_evaluation_rollups():
+    # First start after upgrading: build rollups for the existing history
+    if not await db.evaluation_rollups.find_one({}) and await db.session_evaluations.find_one({}):
+        await rebuild_evaluation_rollups()
+
+@app.on_event("startup")
+async def bootstrap_agenda_sessions():
+    # First start after upgrading: index the sessions of existing agendas
+    if not await db.agenda_sessions.find_one({}) and await db.workshop_agendas.find_one({}):
+        await rebuild_agenda_sessions()
+
+@app.on_event("startup")
+async def bootstrap_pending_evaluations():
+    # First start after upgrading: seed from the published agendas
+    if not await db.pending_evaluations.find_one({}) and await db.workshop_agendas.find_one({"is_published": True}):
+        await seed_all_pending_evaluations()
+
+@app.on_event("startup")
+async def bootstrap_conversations():
+    # First start after upgrading: summarise the existing messages
+    if not await db.conversations.find_one({}) and await db.direct_messages.find_one({}):
+        await rebuild_conversations()
+
+@app.on_event("startup")
+async def bootstrap_forum_replies():
+    # First start after upgrading: replies still embedded in their posts
+    if await db.forum_posts.find_one({"replies": {"$exists": True}}, {"_id": 1}):
+        await migrate_forum_replies()
+
+@app.on_event("startup")
+async def bootstrap_leader_documents():
+    # First start after upgrading: documents still stored as base64 on the registration
+    if await db.leader_registrations.find_one({"documents.data": {"$exists": True}}, {"_id": 1}):
+        await migrate_leader_documents()
+
+@app.on_event("startup")
+async def bootstrap_images():
+    # First start after upgrading: profile images still stored as data: URLs
+    for collection, field in DATA_URL_IMAGE_FIELDS:
+        if await db[collection].find_one({field: {"$regex": "^data:"}}, {"_id": 1}):
+            await migrate_data_url_images()
+            break
+
+@app.on_event("startup")
+async def start_email_outbox():
+    email_outbox.start()
+    # Broadcasts run in-process; any still marked running were cut off by a restart
+    await resume_broadcasts()
+
+@app.on_event("startup")
+async def start_checkin_writer():
+    checkin_service.start()
+
+@app.on_event("startup")
+async def start_realtime_hub():
+    await realtime_hub.start()
+
+@app.on_event("startup")
+async def start_pdf_renderer():
+    try:
+        await pdf_renderer.warm_up()
+    except Exception as e:
+        # Workers are started again on the first render
+        logging.error(f"Failed to warm up PDF render workers: {e}")
+        pdf_renderer.shutdown()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await email_outbox.stop()
+    await checkin_service.stop()
+    await realtime_hub.stop()
+    password_hasher.shutdown()
+    image_executor.shutdown(wait=False)
+    pdf_renderer.shutdown()
     client.close()
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Benchmark for diploma and name badge rendering
+Compares the flowable (platypus) renderers the application used to have, kept
+in legacy_pdf_render.py, with the canvas renderers on the per-process template
+layer, both after a warm-up render.
+
+Run from the backend directory:
+    python tests/bench_pdf_render.py [iterations]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'haggai_bench')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import server  # noqa: E402
+import legacy_pdf_render  # noqa: E402
+
+DIPLOMA = {
+    "participant_name": "Anna Andersson",
+    "event_title": "Haggai Leadership Seminar",
+    "event_date": "May 2026",
+}
+BADGE = {
+    "name": "Anna Andersson",
+    "organization": "Stockholms Församling",
+    "workshop_title": "Haggai Leadership Seminar",
+    "badge_type": "participant",
+    "event_date": "2026-05-01",
+    "event_location": "Stockholm",
+    "person_id": "bench-participant",
+}
+
+
+def measure(render, kwargs: dict, iterations: int):
+    """Average milliseconds, peak allocated KiB and size in KiB per document"""
+    size = len(render(**kwargs).getvalue())  # warm-up
+    elapsed = 0.0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render(**kwargs)
+        elapsed += time.perf_counter() - start
+    
+    # Separate pass: tracing allocations slows rendering down several times
+    tracemalloc.start()
+    render(**kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed / iterations * 1000, peak / 1024, size / 1024
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    cases = [
+        ("diploma", legacy_pdf_render.generate_diploma_pdf, server.generate_diploma_pdf, DIPLOMA),
+        ("name badge", legacy_pdf_render.generate_name_badge_pdf, server.generate_name_badge_pdf, BADGE),
+    ]
+    # The flowable path ran with reportlab's defaults, so measure it before
+    # switching this process over to the render worker settings
+    flowable = [measure(legacy, kwargs, iterations) for _, legacy, _, kwargs in cases]
+    server._init_pdf_worker()
+    for (label, _, render, kwargs), (old_ms, old_kib, old_size) in zip(cases, flowable):
+        new_ms, new_kib, new_size = measure(render, kwargs, iterations)
+        print(f"{label}:")
+        print(f"  flowable  {old_ms:8.2f} ms  {old_kib:8.0f} KiB peak  {old_size:6.0f} KiB file")
+        print(f"  template  {new_ms:8.2f} ms  {new_kib:8.0f} KiB peak  {new_size:6.0f} KiB file  ({old_ms / new_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
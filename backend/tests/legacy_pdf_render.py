@@ -0,0 +1,452 @@
+"""
+Flowable (platypus) diploma and name badge renderers as they were before the
+per-process template layer, kept as the baseline for bench_pdf_render.py.
+Not used by the application.
+"""
+
+import logging
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+
+LOGO_PATH = Path(__file__).resolve().parent.parent / "haggai_logo.png"
+
+
+def generate_diploma_pdf(participant_name: str, event_title: str, event_date: str = None, chairman_name: str = "Bashar Yousif") -> BytesIO:
+    """Generate a PDF diploma certificate with Haggai logo"""
+    buffer = BytesIO()
+    
+    # Create PDF with landscape A4
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(A4),
+        leftMargin=1.5*cm,
+        rightMargin=1.5*cm,
+        topMargin=1*cm,
+        bottomMargin=1*cm
+    )
+    
+    # Define colors - Haggai blue from logo
+    haggai_blue = colors.HexColor('#014D73')
+    gold = colors.HexColor('#c9a227')
+    
+    # Create styles
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'Title',
+        parent=styles['Heading1'],
+        fontSize=26,
+        textColor=haggai_blue,
+        alignment=TA_CENTER,
+        spaceAfter=10,
+        fontName='Helvetica-Bold',
+        letterSpacing=6
+    )
+    
+    subtitle_style = ParagraphStyle(
+        'Subtitle',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=haggai_blue,
+        alignment=TA_CENTER,
+        spaceAfter=20,
+        fontName='Helvetica'
+    )
+    
+    name_style = ParagraphStyle(
+        'Name',
+        parent=styles['Heading1'],
+        fontSize=36,
+        textColor=haggai_blue,
+        alignment=TA_CENTER,
+        spaceBefore=20,
+        spaceAfter=20,
+        fontName='Helvetica-Bold'
+    )
+    
+    body_style = ParagraphStyle(
+        'Body',
+        parent=styles['Normal'],
+        fontSize=14,
+        textColor=colors.black,
+        alignment=TA_CENTER,
+        spaceBefore=15,
+        spaceAfter=15,
+        leading=20
+    )
+    
+    signature_style = ParagraphStyle(
+        'Signature',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=colors.black,
+        alignment=TA_CENTER,
+        fontName='Helvetica'
+    )
+    
+    role_style = ParagraphStyle(
+        'Role',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.gray,
+        alignment=TA_CENTER,
+        fontName='Helvetica'
+    )
+    
+    # Build content
+    story = []
+    
+    # Add Haggai logo at top
+    logo_path = LOGO_PATH
+    if logo_path.exists():
+        logo = Image(str(logo_path), width=4*cm, height=2.8*cm)
+        logo.hAlign = 'CENTER'
+        story.append(logo)
+        story.append(Spacer(1, 0.5*cm))
+    
+    # Main title
+    story.append(Paragraph("A D V A N C E D   L E A D E R S H I P   S E M I N A R", title_style))
+    
+    # Event subtitle
+    event_subtitle = event_title
+    if event_date:
+        event_subtitle += f" – {event_date}"
+    story.append(Paragraph(event_subtitle, subtitle_style))
+    
+    story.append(Spacer(1, 0.5*cm))
+    
+    # Decorative line
+    line_table = Table([['']], colWidths=[400])
+    line_table.setStyle(TableStyle([
+        ('LINEABOVE', (0, 0), (-1, -1), 2, gold),
+    ]))
+    story.append(line_table)
+    
+    # Participant name
+    story.append(Paragraph(participant_name, name_style))
+    
+    # Decorative line
+    story.append(line_table)
+    
+    story.append(Spacer(1, 0.5*cm))
+    
+    # Body text
+    body_text = """Having successfully completed the specialized studies in Advanced Leadership 
+    as prescribed by Haggai International, is hereby awarded this Certificate of Completion."""
+    story.append(Paragraph(body_text, body_style))
+    
+    story.append(Spacer(1, 1*cm))
+    
+    # Date
+    completion_date = event_date if event_date else datetime.now().strftime("%B %Y")
+    story.append(Paragraph(f"<b>D A T E:</b>  {completion_date}", signature_style))
+    
+    story.append(Spacer(1, 1.5*cm))
+    
+    # Signatures table
+    signature_data = [
+        [
+            Paragraph("Dr. Bev Upton Williams", signature_style),
+            "",
+            Paragraph(chairman_name, signature_style)
+        ],
+        [
+            Paragraph("CEO, Haggai International", role_style),
+            "",
+            Paragraph("President of the Association", role_style)
+        ]
+    ]
+    
+    sig_table = Table(signature_data, colWidths=[200, 150, 200])
+    sig_table.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LINEABOVE', (0, 0), (0, 0), 1, colors.black),
+        ('LINEABOVE', (2, 0), (2, 0), 1, colors.black),
+    ]))
+    story.append(sig_table)
+    
+    # Build PDF
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+def generate_name_badge_pdf(
+    name: str,
+    organization: str,
+    workshop_title: str,
+    badge_type: str = "participant",  # "participant" or "leader"
+    event_date: str = None,
+    event_location: str = None,
+    person_id: str = None,
+    role_title: str = None,  # For leaders: their specific role
+    primary_topic: str = None  # For leaders: their primary topic
+) -> BytesIO:
+    """Generate a professional PDF name badge for participants or leaders - A6 format (105 x 148 mm)"""
+    import qrcode
+    from PIL import Image as PILImage
+    
+    buffer = BytesIO()
+    
+    # A6 size: 105mm x 148mm (standard postcard size)
+    badge_width = 10.5 * cm
+    badge_height = 14.8 * cm
+    
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=(badge_width, badge_height),
+        leftMargin=0.4*cm,
+        rightMargin=0.4*cm,
+        topMargin=0.3*cm,
+        bottomMargin=0.3*cm
+    )
+    
+    # Haggai brand colors
+    haggai_dark = colors.HexColor('#1F3D3B')  # Dark teal
+    haggai_gold = colors.HexColor('#D4AF37')  # Gold accent
+    haggai_cream = colors.HexColor('#FDF8F3')  # Cream background
+    
+    # Define colors and labels based on badge type
+    if badge_type == "leader":
+        label_bg_color = haggai_gold
+        secondary_color = colors.HexColor('#B8860B')  # Darker gold
+        badge_label = "FACILITATOR"
+        badge_label_sv = "FACILITATOR"
+    else:  # participant
+        label_bg_color = haggai_dark
+        secondary_color = colors.HexColor('#2A5250')  # Lighter teal
+        badge_label = "PARTICIPANT"
+        badge_label_sv = "DELTAGARE"
+    
+    # Create styles
+    styles = getSampleStyleSheet()
+    
+    header_style = ParagraphStyle(
+        'Header',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.HexColor('#666666'),
+        alignment=TA_CENTER,
+        fontName='Helvetica'
+    )
+    
+    label_style = ParagraphStyle(
+        'Label',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=colors.white,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+        leading=14
+    )
+    
+    name_style = ParagraphStyle(
+        'NameBadge',
+        parent=styles['Heading1'],
+        fontSize=28,
+        textColor=haggai_dark,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+        leading=32
+    )
+    
+    org_style = ParagraphStyle(
+        'Organization',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=colors.HexColor('#666666'),
+        alignment=TA_CENTER,
+        fontName='Helvetica-Oblique'
+    )
+    
+    role_style = ParagraphStyle(
+        'Role',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=haggai_gold if badge_type == "leader" else haggai_dark,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+    
+    workshop_label_style = ParagraphStyle(
+        'WorkshopLabel',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.HexColor('#888888'),
+        alignment=TA_CENTER,
+        fontName='Helvetica'
+    )
+    
+    workshop_style = ParagraphStyle(
+        'Workshop',
+        parent=styles['Normal'],
+        fontSize=13,
+        textColor=haggai_dark,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold',
+        leading=16
+    )
+    
+    info_style = ParagraphStyle(
+        'Info',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.HexColor('#555555'),
+        alignment=TA_CENTER,
+        fontName='Helvetica'
+    )
+    
+    footer_style = ParagraphStyle(
+        'Footer',
+        parent=styles['Normal'],
+        fontSize=7,
+        textColor=colors.HexColor('#999999'),
+        alignment=TA_CENTER,
+        fontName='Helvetica'
+    )
+    
+    # Build content
+    story = []
+    
+    # === TOP SECTION: Logo and Haggai branding ===
+    logo_path = LOGO_PATH
+    if logo_path.exists():
+        logo_img = Image(str(logo_path), width=2.5*cm, height=2.5*cm)
+        story.append(logo_img)
+    else:
+        # Fallback to text
+        logo_text_style = ParagraphStyle(
+            'LogoText',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=haggai_dark,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+        story.append(Paragraph("HAGGAI", logo_text_style))
+    
+    story.append(Spacer(1, 0.2*cm))
+    story.append(Paragraph("SWEDEN", header_style))
+    story.append(Spacer(1, 0.3*cm))
+    
+    # === ROLE BADGE ===
+    badge_content = f"{badge_label}<br/><font size='8'>{badge_label_sv}</font>"
+    label_table = Table([[Paragraph(badge_content, label_style)]], colWidths=[badge_width - 0.8*cm])
+    label_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), label_bg_color),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('LEFTPADDING', (0, 0), (-1, -1), 10),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+    ]))
+    story.append(label_table)
+    story.append(Spacer(1, 0.5*cm))
+    
+    # === NAME (Large and prominent) ===
+    # Handle long names by reducing font size
+    name_font_size = 28 if len(name) < 20 else (24 if len(name) < 25 else 20)
+    name_style.fontSize = name_font_size
+    name_style.leading = name_font_size + 4
+    story.append(Paragraph(name, name_style))
+    story.append(Spacer(1, 0.2*cm))
+    
+    # === ORGANIZATION ===
+    if organization:
+        story.append(Paragraph(organization, org_style))
+        story.append(Spacer(1, 0.2*cm))
+    
+    # === ROLE/TOPIC for Leaders ===
+    if badge_type == "leader":
+        if primary_topic:
+            # Map topic keys to display names (matching WORKSHOP_TOPICS)
+            topic_names = {
+                'biblical_mandate': 'Bibliskt Mandat',
+                'stewardship': 'Förvaltarskap',
+                'context': 'Sammanhang',
+                'next_generation': 'Nästa Generation',
+                'leadership': 'Ledarskap',
+                'goal_setting': 'Målsättning',
+                'time_management': 'Tidshantering',
+                'vision': 'Vision',
+                'communication': 'Kommunikation',
+                'team_building': 'Teambuilding',
+                'conflict_resolution': 'Konflikthantering'
+            }
+            topic_display = topic_names.get(primary_topic, primary_topic.replace('_', ' ').title())
+            story.append(Paragraph(f"📚 {topic_display}", role_style))
+            story.append(Spacer(1, 0.2*cm))
+    
+    story.append(Spacer(1, 0.3*cm))
+    
+    # === WORKSHOP INFO ===
+    story.append(Paragraph("─" * 20, info_style))
+    story.append(Spacer(1, 0.2*cm))
+    story.append(Paragraph(workshop_title, workshop_style))
+    
+    # Date and location info
+    if event_date or event_location:
+        story.append(Spacer(1, 0.2*cm))
+        info_parts = []
+        if event_date:
+            # Format date nicely
+            try:
+                date_obj = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
+                formatted_date = date_obj.strftime('%d %b %Y')
+                info_parts.append(f"📅 {formatted_date}")
+            except:
+                info_parts.append(f"📅 {event_date}")
+        if event_location:
+            info_parts.append(f"📍 {event_location}")
+        
+        if info_parts:
+            story.append(Paragraph(" • ".join(info_parts), info_style))
+    
+    story.append(Spacer(1, 0.3*cm))
+    
+    # === QR CODE for check-in (if person_id provided) ===
+    if person_id:
+        try:
+            qr = qrcode.QRCode(
+                version=1,
+                error_correction=qrcode.constants.ERROR_CORRECT_M,
+                box_size=10,
+                border=2,
+            )
+            qr_data = f"haggai:{badge_type}:{person_id}"
+            qr.add_data(qr_data)
+            qr.make(fit=True)
+            
+            qr_img = qr.make_image(fill_color="#1F3D3B", back_color="white")
+            
+            # Save QR to buffer
+            qr_buffer = BytesIO()
+            qr_img.save(qr_buffer, format='PNG')
+            qr_buffer.seek(0)
+            
+            # Add QR code to story
+            qr_image = Image(qr_buffer, width=1.8*cm, height=1.8*cm)
+            story.append(qr_image)
+            story.append(Spacer(1, 0.1*cm))
+            story.append(Paragraph("Scanna för incheckning", footer_style))
+        except Exception as e:
+            logging.error(f"Failed to generate QR code: {e}")
+    
+    # === FOOTER ===
+    story.append(Spacer(1, 0.2*cm))
+    story.append(Paragraph("─" * 20, info_style))
+    story.append(Paragraph("www.haggai.se", footer_style))
+    
+    # Build PDF
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
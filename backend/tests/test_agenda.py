@@ -1,6 +1,7 @@
 """
 Backend tests for Workshop Agenda API endpoints
-Tests: GET/POST agenda, publish agenda, public agenda view, send reminder
+Tests: GET/POST agenda, publish agenda, public agenda view, send reminder, leader sessions,
+single day/session edits
 """
 import pytest
 import requests
@@ -354,9 +355,18 @@ class TestAgendaReminder:
         
         data = response.json()
         assert data.get("success") == True, "Should return success: true"
-        
+
         print("✓ POST send-reminder for day 1 successful")
-    
+
+        # Reminders go out as a broadcast whose progress can be polled
+        if data.get("broadcast_id"):
+            progress = self.session.get(f"{BASE_URL}/api/email-broadcasts/{data['broadcast_id']}")
+            assert progress.status_code == 200
+            broadcast = progress.json()
+            assert broadcast["kind"] == "daily_reminder"
+            assert broadcast["sent"] + broadcast["deferred"] + broadcast["failed"] <= broadcast["total"]
+            print(f"✓ Broadcast {broadcast['id']} is {broadcast['status']}: {broadcast['sent']}/{broadcast['total']} sent")
+
     def test_send_reminder_nonexistent_day(self):
         """POST /api/workshops/{id}/agenda/send-reminder - Returns 404 for nonexistent day"""
         response = self.session.post(
@@ -423,6 +433,150 @@ class TestWorkshopEndpoints:
         print(f"✓ GET leaders returned {len(data)} leaders")
 
 
+class TestLeaderSessions:
+    """Test the leader schedule kept in sync with saved agendas"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup test session"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+    
+    def save_agenda(self, leader_id):
+        session = {"start_time": "09:00", "end_time": "10:00", "title": "TEST_Ledarsession", "session_type": "session", "order": 0}
+        if leader_id:
+            session["leader_id"] = leader_id
+        response = self.session.post(
+            f"{BASE_URL}/api/workshops/{TEST_WORKSHOP_ID}/agenda",
+            json={
+                "workshop_id": TEST_WORKSHOP_ID,
+                "days": [{"date": "2026-03-15", "day_number": 1, "title": "TEST_Dag 1", "sessions": [session]}],
+                "is_published": False,
+                "notify_participants": False
+            }
+        )
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+    
+    def test_leader_sessions_follow_agenda(self):
+        """GET /api/leaders/{id}/sessions - Reflects the last saved agenda"""
+        leader_id = f"TEST_leader_{uuid.uuid4()}"
+        self.save_agenda(leader_id)
+        
+        response = self.session.get(f"{BASE_URL}/api/leaders/{leader_id}/sessions")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1, "Leader should have exactly one session"
+        assert data[0]["workshop_id"] == TEST_WORKSHOP_ID
+        assert data[0]["day_date"] == "2026-03-15"
+        assert data[0]["session"]["title"] == "TEST_Ledarsession"
+        print("✓ Leader session listed after saving agenda")
+        
+        self.save_agenda(None)
+        response = self.session.get(f"{BASE_URL}/api/leaders/{leader_id}/sessions")
+        assert response.status_code == 200
+        assert response.json() == [], "Session removed from agenda should disappear"
+        print("✓ Leader session removed after saving agenda without it")
+
+
+class TestAgendaEdits:
+    """Test single day/session edits with version checks"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup test session"""
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+    
+    def current_version(self):
+        response = self.session.get(f"{BASE_URL}/api/workshops/{TEST_WORKSHOP_ID}/agenda")
+        assert response.status_code == 200
+        return response.json()["version"]
+    
+    def test_edit_day_and_session(self):
+        """POST/PATCH/DELETE /api/workshops/{id}/agenda/days|sessions - Edits keep session ids"""
+        base = f"{BASE_URL}/api/workshops/{TEST_WORKSHOP_ID}/agenda"
+        version = self.current_version()
+        
+        response = self.session.post(f"{base}/days", json={
+            "version": version,
+            "date": "2026-03-17",
+            "day_number": 3,
+            "title": "TEST_Dag 3",
+            "sessions": [{"start_time": "09:00", "end_time": "10:00", "title": "TEST_Session", "session_type": "session"}]
+        })
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        data = response.json()
+        assert data["version"] == version + 1
+        day_id = data["day"]["id"]
+        session_id = data["day"]["sessions"][0]["id"]
+        print("✓ Day added")
+        
+        response = self.session.patch(f"{base}/sessions/{session_id}", json={"version": data["version"], "start_time": "09:30"})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        data = response.json()
+        assert data["session"]["id"] == session_id, "Session id should be preserved"
+        assert data["session"]["start_time"] == "09:30"
+        assert data["session"]["title"] == "TEST_Session"
+        print("✓ Session time updated in place")
+        
+        response = self.session.patch(f"{base}/sessions/{session_id}", json={"version": data["version"] - 1, "title": "TEST_Stale"})
+        assert response.status_code == 409, "Edit based on an old version should conflict"
+        print("✓ Stale version returns 409")
+        
+        response = self.session.delete(f"{base}/days/{day_id}", params={"version": data["version"]})
+        assert response.status_code == 200
+        agenda = self.session.get(base).json()
+        assert day_id not in [day["id"] for day in agenda["days"]]
+        print("✓ Day deleted")
+    
+    def test_full_save_keeps_only_stored_ids(self):
+        """POST /api/workshops/{id}/agenda - Stored ids survive a resave, unknown ids are replaced"""
+        base = f"{BASE_URL}/api/workshops/{TEST_WORKSHOP_ID}/agenda"
+        agenda = self.session.get(base).json()
+        assert agenda["days"], "Test workshop should have an agenda"
+        kept_day = agenda["days"][0]
+        foreign_id = str(uuid.uuid4())
+        
+        response = self.session.post(base, json={
+            "workshop_id": TEST_WORKSHOP_ID,
+            "version": agenda["version"],
+            "is_published": agenda.get("is_published", False),
+            "notify_participants": False,
+            "days": [
+                {**kept_day, "sessions": [
+                    *kept_day["sessions"],
+                    {"id": foreign_id, "start_time": "17:00", "end_time": "18:00", "title": "TEST_Foreign", "session_type": "session"}
+                ]},
+                *agenda["days"][1:],
+            ]
+        })
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        saved = response.json()
+        assert saved["version"] == agenda["version"] + 1
+        assert saved["days"][0]["id"] == kept_day["id"], "Stored day id should be kept"
+        saved_ids = [session["id"] for session in saved["days"][0]["sessions"]]
+        assert saved_ids[:-1] == [session["id"] for session in kept_day["sessions"]], "Stored session ids should be kept"
+        assert saved_ids[-1] != foreign_id, "An id not in this agenda should be replaced"
+        print("✓ Full save keeps stored ids and mints new ones")
+        
+        response = self.session.post(base, json={"workshop_id": TEST_WORKSHOP_ID, "version": agenda["version"], "days": []})
+        assert response.status_code == 409, "Save based on an old version should conflict"
+        
+        # Drop the added session again
+        response = self.session.post(base, json={**agenda, "version": saved["version"], "notify_participants": False})
+        assert response.status_code == 200
+        print("✓ Stale full save returns 409")
+    
+    def test_edit_nonexistent_session(self):
+        """PATCH /api/workshops/{id}/agenda/sessions/{id} - 404 for unknown session"""
+        response = self.session.patch(
+            f"{BASE_URL}/api/workshops/{TEST_WORKSHOP_ID}/agenda/sessions/{uuid.uuid4()}",
+            json={"version": self.current_version(), "title": "TEST_Missing"}
+        )
+        assert response.status_code == 404
+        print("✓ Unknown session returns 404")
+
+
 class TestAgendaCleanup:
     """Cleanup test data and restore original agenda"""
     
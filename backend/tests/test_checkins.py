@@ -0,0 +1,212 @@
+"""
+Test suite for badge QR check-in
+Tests:
+- POST /api/workshops/:id/checkins - Check in by name badge payload
+- POST /api/workshops/:id/checkins - Repeated scan is reported as duplicate
+- POST /api/workshops/:id/checkins - Malformed payload, unknown badge and unknown workshop
+- POST /api/workshops/:id/checkins - Rejected participant leaves the roster at once
+- GET /api/workshops/:id/checkins - Check-ins include scans not yet flushed
+- POST /api/workshops/:id/checkins/sync - Offline upload is idempotent and returns the delta
+- POST /api/workshops/:id/attendance/compute - Attendance hours from session check-ins
+"""
+
+import pytest
+import requests
+import os
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def workshop():
+    response = requests.get(f"{BASE_URL}/api/workshops")
+    assert response.status_code == 200
+    workshops = response.json()
+    if not workshops:
+        pytest.skip("No workshops available")
+    return workshops[0]
+
+
+@pytest.fixture(scope="module")
+def participant(workshop):
+    """Direct invitations are approved on creation, so they get a badge right away"""
+    test_id = str(uuid.uuid4())[:8]
+    response = requests.post(f"{BASE_URL}/api/nominations", json={
+        "event_id": workshop["id"],
+        "event_title": workshop["title"],
+        "nominee_name": f"TEST_Checkin {test_id}",
+        "nominee_email": f"test_checkin_{test_id}@example.com",
+        "direct_invitation": True
+    })
+    assert response.status_code == 200
+    nomination = response.json()
+    yield nomination
+    requests.delete(f"{BASE_URL}/api/nominations/{nomination['id']}")
+
+
+class TestCheckins:
+    """Test check-in by name badge QR code"""
+
+    def test_scan_and_duplicate(self, workshop, participant):
+        """POST /api/workshops/:id/checkins - first scan checks in, second is a duplicate"""
+        session_id = f"TEST_session_{uuid.uuid4()}"
+        payload = {
+            "payload": f"haggai:participant:{participant['id']}",
+            "session_id": session_id,
+            "scanner_id": "TEST_door_1"
+        }
+        response = requests.post(f"{BASE_URL}/api/workshops/{workshop['id']}/checkins", json=payload)
+        assert response.status_code == 200
+        first = response.json()
+        assert first["status"] == "checked_in"
+        assert first["person_id"] == participant["id"]
+        assert first["badge_type"] == "participant"
+        print(f"✓ {first['name']} checked in")
+
+        payload["scanner_id"] = "TEST_door_2"
+        response = requests.post(f"{BASE_URL}/api/workshops/{workshop['id']}/checkins", json=payload)
+        assert response.status_code == 200
+        second = response.json()
+        assert second["status"] == "duplicate"
+        assert second["id"] == first["id"]
+        print("✓ Second scan from another door reported as duplicate")
+
+        response = requests.get(
+            f"{BASE_URL}/api/workshops/{workshop['id']}/checkins", params={"session_id": session_id}
+        )
+        assert response.status_code == 200
+        checkins = response.json()
+        assert [c["id"] for c in checkins] == [first["id"]]
+        print("✓ GET check-ins returns the scan once")
+
+    def test_rejected_participant_leaves_roster(self, workshop):
+        """POST /api/workshops/:id/checkins - a rejected nomination's badge stops working at once"""
+        test_id = str(uuid.uuid4())[:8]
+        nomination = requests.post(f"{BASE_URL}/api/nominations", json={
+            "event_id": workshop["id"],
+            "event_title": workshop["title"],
+            "nominee_name": f"TEST_Checkin Rejected {test_id}",
+            "nominee_email": f"test_checkin_rejected_{test_id}@example.com",
+            "status": "approved",
+            "direct_invitation": True
+        }).json()
+        url = f"{BASE_URL}/api/workshops/{workshop['id']}/checkins"
+        payload = {"payload": f"haggai:participant:{nomination['id']}", "session_id": f"TEST_session_{uuid.uuid4()}"}
+        try:
+            response = requests.post(url, json=payload)
+            assert response.status_code == 200, "Approved participant is on the roster"
+
+            response = requests.post(f"{BASE_URL}/api/nominations/{nomination['id']}/reject")
+            assert response.status_code == 200
+            response = requests.post(url, json=payload)
+            assert response.status_code == 404, "Roster should be reloaded after the rejection"
+            print("✓ Rejected participant is dropped from the cached roster")
+        finally:
+            requests.delete(f"{BASE_URL}/api/nominations/{nomination['id']}")
+
+    def test_malformed_payload(self, workshop):
+        """POST /api/workshops/:id/checkins - 400 for a QR code that is not a badge"""
+        response = requests.post(
+            f"{BASE_URL}/api/workshops/{workshop['id']}/checkins", json={"payload": "https://example.com"}
+        )
+        assert response.status_code == 400
+        print("✓ Malformed payload returns 400")
+
+    def test_unknown_badge(self, workshop):
+        """POST /api/workshops/:id/checkins - 404 for a badge not on the roster"""
+        response = requests.post(
+            f"{BASE_URL}/api/workshops/{workshop['id']}/checkins",
+            json={"payload": f"haggai:participant:{uuid.uuid4()}"}
+        )
+        assert response.status_code == 404
+        print("✓ Unknown badge returns 404")
+
+    def test_unknown_workshop(self):
+        """POST /api/workshops/:id/checkins - 404 for unknown workshop"""
+        response = requests.post(
+            f"{BASE_URL}/api/workshops/{uuid.uuid4()}/checkins",
+            json={"payload": f"haggai:participant:{uuid.uuid4()}"}
+        )
+        assert response.status_code == 404
+        print("✓ Unknown workshop returns 404")
+
+
+class TestOfflineCheckinSync:
+    """Test batched upload of check-ins recorded offline"""
+
+    def test_sync_is_idempotent(self, workshop, participant):
+        """POST /api/workshops/:id/checkins/sync - same batch twice is stored once"""
+        session_id = f"TEST_session_{uuid.uuid4()}"
+        events = [
+            {
+                "id": str(uuid.uuid4()),
+                "payload": f"haggai:participant:{participant['id']}",
+                "session_id": session_id,
+                "scanned_at": "2026-05-01T09:05:00Z"
+            },
+            {
+                "id": str(uuid.uuid4()),
+                "payload": f"haggai:participant:{participant['id']}",
+                "session_id": session_id,
+                "scanned_at": "2026-05-01T09:01:00Z"
+            },
+            {
+                "id": str(uuid.uuid4()),
+                "payload": f"haggai:participant:{uuid.uuid4()}",
+                "scanned_at": "2026-05-01T09:02:00Z"
+            },
+        ]
+        url = f"{BASE_URL}/api/workshops/{workshop['id']}/checkins/sync"
+        response = requests.post(url, json={"scanner_id": "TEST_offline", "events": events})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["accepted"] == [events[1]["id"]], "Earliest scan of the session wins"
+        assert data["duplicates"] == [events[0]["id"]]
+        assert [r["id"] for r in data["rejected"]] == [events[2]["id"]]
+        assert data["roster"], "First sync returns the roster"
+        assert events[1]["id"] in [c["id"] for c in data["checkins"]]
+        print("✓ Offline batch applied, duplicate and unknown badge reported")
+
+        response = requests.post(url, json={"events": events, "sync_token": data["sync_token"]})
+        assert response.status_code == 200
+        again = response.json()
+        assert again["accepted"] == []
+        assert events[1]["id"] in again["duplicates"]
+        assert again["roster"] is None, "Unchanged roster is not sent again"
+        print("✓ Re-uploading the same batch stores nothing new")
+
+    def test_invalid_sync_token(self, workshop):
+        """POST /api/workshops/:id/checkins/sync - 400 for a malformed token"""
+        response = requests.post(
+            f"{BASE_URL}/api/workshops/{workshop['id']}/checkins/sync", json={"sync_token": "not-a-token"}
+        )
+        assert response.status_code == 400
+        print("✓ Invalid sync token returns 400")
+
+
+class TestAttendanceFromCheckins:
+    """Test attendance hour computation from check-ins"""
+
+    def test_compute_attendance(self, workshop):
+        """POST /api/workshops/:id/attendance/compute - hours per participant or 400 without check-ins"""
+        response = requests.post(f"{BASE_URL}/api/workshops/{workshop['id']}/attendance/compute")
+        if response.status_code == 404:
+            pytest.skip("Workshop has no agenda")
+        if response.status_code == 400:
+            print("✓ Workshop without session check-ins is left untouched")
+            return
+        assert response.status_code == 200
+        data = response.json()
+        assert data["participants"] == len(data["results"])
+        for result in data["results"]:
+            assert result["attendance_hours"] <= data["agenda_hours"]
+            if result["attendance_hours"] >= 21:
+                assert result["status"] == "completed"
+        print(f"✓ Attendance computed for {data['participants']} participants, {data['updated']} updated")
+
+    def test_compute_attendance_unknown_workshop(self):
+        """POST /api/workshops/:id/attendance/compute - 404 for unknown workshop"""
+        response = requests.post(f"{BASE_URL}/api/workshops/{uuid.uuid4()}/attendance/compute")
+        assert response.status_code == 404
+        print("✓ Unknown workshop returns 404")
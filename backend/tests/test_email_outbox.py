@@ -0,0 +1,308 @@
+"""
+Test suite for the email outbox
+Tests:
+- POST /api/contact-requests - Admin notification is queued instead of sent inline
+- GET /api/email-outbox - List queued emails with status
+- GET /api/email-outbox/:id - Delivery status of a single email
+- POST /api/email-outbox/:id/retry - Requeue unknown email returns 404
+- GET /api/email-outbox - Requires a board member token
+- EmailOutbox with FakeEmailTransport (in-process, needs MONGO_URL) - delivery,
+  retry with backoff, dead-lettering and no redelivery of sent messages
+- Email broadcasts (in-process) - delivery in chunks and resuming after a restart
+
+Run the backend with EMAIL_TRANSPORT=fake to exercise delivery without Resend.
+"""
+
+import pytest
+import requests
+import os
+import sys
+import uuid
+import asyncio
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'haggai_test')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def board_headers():
+    """Create a board member with a password and log in as them"""
+    test_id = str(uuid.uuid4())[:8]
+    email = f"test_outbox_board_{test_id}@example.com"
+    password = "TestPassword123!"
+    member = requests.post(f"{BASE_URL}/api/board-members", json={
+        "name": f"TEST_Outbox Board {test_id}",
+        "role": "Ledamot",
+        "email": email,
+        "term_start": "2026"
+    }).json()
+    requests.post(f"{BASE_URL}/api/board-auth/set-password", json={"email": email, "password": password})
+    token = requests.post(f"{BASE_URL}/api/board-auth/login", json={"email": email, "password": password}).json()["token"]
+    
+    yield {"Authorization": f"Bearer {token}"}
+    
+    requests.delete(f"{BASE_URL}/api/board-members/{member['id']}")
+
+
+class TestEmailOutbox:
+    """Test that emails go through the outbox"""
+
+    def test_contact_request_queues_admin_email(self, board_headers):
+        """POST /api/contact-requests - admin notification appears in the outbox"""
+        test_id = str(uuid.uuid4())[:8]
+        response = requests.post(f"{BASE_URL}/api/contact-requests", json={
+            "name": f"TEST_Outbox {test_id}",
+            "email": f"test_outbox_{test_id}@example.com",
+            "message": "TEST outbox message"
+        })
+        assert response.status_code == 200
+
+        response = requests.get(
+            f"{BASE_URL}/api/email-outbox", params={"tag": "contact_request", "limit": 20}, headers=board_headers
+        )
+        assert response.status_code == 200
+        messages = response.json()
+        assert isinstance(messages, list)
+
+        matching = [m for m in messages if test_id in (m.get("subject") or "")]
+        assert len(matching) == 1, "Contact request email should be queued once"
+        message = matching[0]
+        assert message["status"] in ["pending", "sending", "sent", "dead"]
+        assert "params" not in message
+        print(f"✓ Contact request email queued with status {message['status']}")
+
+        response = requests.get(f"{BASE_URL}/api/email-outbox/{message['id']}", headers=board_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == message["id"]
+        assert data["to"] == message["to"]
+        assert "params" not in data, "Email bodies must never be returned"
+        print(f"✓ GET /api/email-outbox/{message['id']} returned delivery status")
+
+    def test_get_outbox_filtered_by_status(self, board_headers):
+        """GET /api/email-outbox?status=dead - only dead-lettered emails"""
+        response = requests.get(f"{BASE_URL}/api/email-outbox", params={"status": "dead"}, headers=board_headers)
+        assert response.status_code == 200
+        for message in response.json():
+            assert message["status"] == "dead"
+        print("✓ GET /api/email-outbox?status=dead filters by status")
+
+    def test_get_nonexistent_outbox_message(self, board_headers):
+        """GET /api/email-outbox/:id - 404 for unknown id"""
+        response = requests.get(f"{BASE_URL}/api/email-outbox/{uuid.uuid4()}", headers=board_headers)
+        assert response.status_code == 404
+        print("✓ Unknown outbox message returns 404")
+
+    def test_retry_nonexistent_outbox_message(self, board_headers):
+        """POST /api/email-outbox/:id/retry - 404 for unknown id"""
+        response = requests.post(f"{BASE_URL}/api/email-outbox/{uuid.uuid4()}/retry", headers=board_headers)
+        assert response.status_code == 404
+        print("✓ Retrying unknown outbox message returns 404")
+
+    def test_outbox_requires_board_member(self):
+        """GET /api/email-outbox - 401 without a board member token"""
+        assert requests.get(f"{BASE_URL}/api/email-outbox").status_code == 401
+        assert requests.get(f"{BASE_URL}/api/email-outbox/{uuid.uuid4()}").status_code == 401
+        assert requests.post(f"{BASE_URL}/api/email-outbox/{uuid.uuid4()}/retry").status_code == 401
+        assert requests.get(f"{BASE_URL}/api/email-broadcasts").status_code == 401
+        print("✓ Outbox and broadcast endpoints require a board member token")
+
+
+def run_outbox(scenario, transport, **kwargs):
+    """Run scenario(outbox) against an EmailOutbox on a throwaway database"""
+    async def main():
+        client = server.AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db_name = f"haggai_test_outbox_{uuid.uuid4().hex[:8]}"
+        try:
+            outbox = server.EmailOutbox(client[db_name].email_outbox, transport, **kwargs)
+            return await scenario(outbox)
+        finally:
+            await client.drop_database(db_name)
+            client.close()
+    return asyncio.run(main())
+
+
+async def make_due(outbox, message_id: str):
+    """Skip the backoff wait of a pending message"""
+    await outbox.collection.update_one(
+        {"id": message_id},
+        {"$set": {"next_attempt_at": datetime.now(timezone.utc).isoformat()}}
+    )
+
+
+def email_params(subject: str) -> dict:
+    return {"from": "test@example.com", "to": ["recipient@example.com"], "subject": subject, "html": "<p>secret</p>"}
+
+
+class TestEmailOutboxWorker:
+    """Drive the outbox in-process with the fake transport"""
+
+    def test_delivers_and_never_resends(self):
+        """EmailOutbox - pending message is sent once, body is dropped after delivery"""
+        transport = server.FakeEmailTransport()
+
+        async def scenario(outbox):
+            message_id = await outbox.enqueue(email_params("Delivery"), tag="test")
+            assert await outbox.process_due() == 1
+            assert await outbox.process_due() == 0
+            return await outbox.collection.find_one({"id": message_id}, {"_id": 0})
+
+        message = run_outbox(scenario, transport)
+        assert message["status"] == "sent"
+        assert message["attempts"] == 1
+        assert message["provider_id"].startswith("fake-")
+        assert "html" not in message["params"]
+        assert len(transport.sent) == 1
+        print("✓ Message delivered once and its body removed")
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        """EmailOutbox - a failure schedules a retry in the future, then succeeds"""
+        transport = server.FakeEmailTransport(fail_times=1)
+
+        async def scenario(outbox):
+            message_id = await outbox.enqueue(email_params("Retry"))
+            before = datetime.now(timezone.utc)
+            assert await outbox.process_due() == 1
+            failed = await outbox.collection.find_one({"id": message_id}, {"_id": 0})
+            # Not due yet: the worker must not retry right away
+            assert await outbox.process_due() == 0
+            await make_due(outbox, message_id)
+            assert await outbox.process_due() == 1
+            sent = await outbox.collection.find_one({"id": message_id}, {"_id": 0})
+            return before, failed, sent
+
+        before, failed, sent = run_outbox(scenario, transport)
+        assert failed["status"] == "pending"
+        assert failed["attempts"] == 1
+        assert failed["last_error"] == "Simulated delivery failure"
+        min_delay = timedelta(seconds=server.EMAIL_RETRY_BASE_SECONDS * 0.8)
+        assert datetime.fromisoformat(failed["next_attempt_at"]) >= before + min_delay
+        assert sent["status"] == "sent"
+        assert sent["attempts"] == 2
+        assert len(transport.sent) == 1
+        print("✓ Failed delivery retried after backoff")
+
+    def test_dead_after_max_attempts(self):
+        """EmailOutbox - message is dead-lettered after max_attempts failures"""
+        transport = server.FakeEmailTransport(fail_times=10)
+
+        async def scenario(outbox):
+            message_id = await outbox.enqueue(email_params("Dead"))
+            for _ in range(3):
+                await outbox.process_due()
+                await make_due(outbox, message_id)
+            return await outbox.collection.find_one({"id": message_id}, {"_id": 0})
+
+        message = run_outbox(scenario, transport, max_attempts=3)
+        assert message["status"] == "dead"
+        assert message["attempts"] == 3
+        assert transport.sent == []
+        print("✓ Message dead-lettered after max attempts")
+
+
+def run_broadcasts(scenario, transport):
+    """Run scenario() with server.db on a throwaway database and broadcasts sent through transport"""
+    async def main():
+        client = server.AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db_name = f"haggai_test_broadcasts_{uuid.uuid4().hex[:8]}"
+        original_db, original_transport = server.db, server.email_transport
+        server.db, server.email_transport = client[db_name], transport
+        try:
+            return await scenario()
+        finally:
+            server.db, server.email_transport = original_db, original_transport
+            await client.drop_database(db_name)
+            client.close()
+    return asyncio.run(main())
+
+
+async def broadcasts_finished():
+    await asyncio.gather(*list(server._broadcast_tasks))
+
+
+def broadcast_message(number: int) -> dict:
+    return {"from": "test@example.com", "to": [f"recipient{number}@example.com"], "subject": "Broadcast", "html": "<p>Hi</p>"}
+
+
+class TestEmailBroadcasts:
+    """Drive broadcasts in-process with the fake transport"""
+
+    def test_broadcast_delivered_in_chunks(self):
+        """start_broadcast - every recipient is sent once and the chunks are cleaned up"""
+        transport = server.FakeEmailTransport()
+
+        async def scenario():
+            broadcast = await server.start_broadcast("test", [broadcast_message(n) for n in range(5)])
+            await broadcasts_finished()
+            stored = await server.db.email_broadcasts.find_one({"id": broadcast["id"]}, {"_id": 0})
+            chunks = await server.db.email_broadcast_chunks.count_documents({})
+            return stored, chunks
+
+        broadcast, chunks = run_broadcasts(scenario, transport)
+        assert broadcast["status"] == "completed"
+        assert broadcast["sent"] == 5
+        assert chunks == 0
+        assert sorted(m["to"][0] for m in transport.sent) == sorted(f"recipient{n}@example.com" for n in range(5))
+        print("✓ Broadcast delivered and chunks removed")
+
+    def test_resume_after_restart(self):
+        """resume_broadcasts - a cut-off broadcast continues with the chunks not yet done"""
+        transport = server.FakeEmailTransport()
+        now = datetime.now(timezone.utc)
+
+        async def scenario():
+            await server.db.email_broadcasts.insert_many([
+                {"id": "cut-off", "kind": "test", "status": "running", "total": 3, "sent": 1, "deferred": 0, "failed": 0},
+                {"id": "legacy", "kind": "test", "status": "running", "total": 2, "sent": 0, "deferred": 0, "failed": 0},
+            ])
+            await server.db.email_broadcast_chunks.insert_many([
+                {"id": "c0", "broadcast_id": "cut-off", "index": 0, "status": "done", "locked_until": None},
+                # Leased by the process that died
+                {"id": "c1", "broadcast_id": "cut-off", "index": 1, "status": "sending",
+                 "locked_until": (now - timedelta(seconds=1)).isoformat(), "messages": [broadcast_message(1)]},
+                {"id": "c2", "broadcast_id": "cut-off", "index": 2, "status": "pending",
+                 "locked_until": None, "messages": [broadcast_message(2)]},
+            ])
+
+            assert await server.resume_broadcasts() == 1
+            await broadcasts_finished()
+            cut_off = await server.db.email_broadcasts.find_one({"id": "cut-off"}, {"_id": 0})
+            legacy = await server.db.email_broadcasts.find_one({"id": "legacy"}, {"_id": 0})
+            return cut_off, legacy
+
+        cut_off, legacy = run_broadcasts(scenario, transport)
+        assert [m["to"][0] for m in transport.sent] == ["recipient1@example.com", "recipient2@example.com"]
+        assert cut_off["status"] == "completed"
+        assert cut_off["sent"] == 3
+        assert legacy["status"] == "interrupted", "Broadcasts without stored chunks cannot be resumed"
+        print("✓ Interrupted broadcast resumed from its remaining chunks")
+
+    def test_chunk_leased_elsewhere_is_left_alone(self):
+        """run_broadcast - a chunk another process is sending is not sent again"""
+        transport = server.FakeEmailTransport()
+        later = datetime.now(timezone.utc) + timedelta(minutes=1)
+
+        async def scenario():
+            await server.db.email_broadcasts.insert_one(
+                {"id": "shared", "kind": "test", "status": "running", "total": 2, "sent": 0, "deferred": 0, "failed": 0}
+            )
+            await server.db.email_broadcast_chunks.insert_many([
+                {"id": "c0", "broadcast_id": "shared", "index": 0, "status": "sending",
+                 "locked_until": later.isoformat(), "messages": [broadcast_message(0)]},
+                {"id": "c1", "broadcast_id": "shared", "index": 1, "status": "pending",
+                 "locked_until": None, "messages": [broadcast_message(1)]},
+            ])
+            await server.run_broadcast("shared", "test")
+            return await server.db.email_broadcasts.find_one({"id": "shared"}, {"_id": 0})
+
+        broadcast = run_broadcasts(scenario, transport)
+        assert [m["to"][0] for m in transport.sent] == ["recipient1@example.com"]
+        assert broadcast["status"] == "running", "The other process finishes the broadcast"
+        print("✓ Chunk leased by another process left alone")
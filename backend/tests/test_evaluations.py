@@ -1,14 +1,24 @@
 """
 Test suite for Evaluation System APIs
-Tests: evaluation questions CRUD, evaluation submission, statistics, leader detailed stats, feedback
+Tests: evaluation questions CRUD, evaluation submission, statistics, leader detailed stats, feedback,
+member pending evaluations (the seeding tests run in-process and need MONGO_URL)
 """
 import pytest
 import requests
 import os
+import sys
 import uuid
+import asyncio
+from pathlib import Path
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
 
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'haggai_test')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
 # Test data IDs
 TEST_WORKSHOP_ID = "f60eb66e-3956-428d-8060-181ceeb498f8"
 TEST_SESSION_ID = "54d20983-f04e-4a03-96ad-5c619a19600b"
@@ -324,6 +334,21 @@ class TestEvaluationStatistics:
         else:
             print("✓ Leaders comparison structure verified (no data to show)")
 
+    def test_rebuild_rollups_keeps_stats(self, api_client):
+        """POST /api/evaluations/rollups/rebuild - Stats are unchanged after a rebuild"""
+        before = api_client.get(f"{BASE_URL}/api/evaluations/stats?workshop_id={TEST_WORKSHOP_ID}").json()
+
+        response = api_client.post(f"{BASE_URL}/api/evaluations/rollups/rebuild")
+        assert response.status_code == 200
+        data = response.json()
+        assert data.get("success") == True
+        assert isinstance(data["groups"], int)
+
+        after = api_client.get(f"{BASE_URL}/api/evaluations/stats?workshop_id={TEST_WORKSHOP_ID}").json()
+        assert after["total_evaluations"] == before["total_evaluations"]
+        assert after["overall_average"] == before["overall_average"]
+        print(f"✓ POST /api/evaluations/rollups/rebuild - {data['groups']} groups rebuilt")
+
 
 class TestLeaderDetailedStats:
     """Tests for leader detailed statistics endpoint"""
@@ -516,5 +541,75 @@ class TestSessionEvaluations:
             print(f"  Verified: Participant info is hidden from leader (anonymous)")
 
 
+
+class TestPendingEvaluations:
+    """Test the member portal's pending evaluation list"""
+    
+    def test_pending_evaluations_invalid_token(self, api_client):
+        """GET /api/member/pending-evaluations - 401 for an invalid token"""
+        response = api_client.get(f"{BASE_URL}/api/member/pending-evaluations", params={"token": "invalid"})
+        assert response.status_code == 401
+        print("✓ GET /api/member/pending-evaluations - Invalid token returns 401")
+    
+    def test_seed_list_and_clear_on_submit(self):
+        """Publishing seeds pending rows, agenda edits prune them and submitting clears them"""
+        async def scenario():
+            await server.db.workshops.insert_one({"id": "ws-1", "title": "TEST_Workshop"})
+            await server.db.leaders.insert_one({"id": "leader-1", "name": "TEST_Leader"})
+            await server.db.members.insert_one({"id": "member-1", "email": "member@example.com"})
+            token = server.jwt.encode({"member_id": "member-1"}, server.JWT_SECRET, algorithm=server.JWT_ALGORITHM)
+            
+            def agenda(session_ids, version=None):
+                return server.WorkshopAgendaCreate(
+                    workshop_id="ws-1",
+                    is_published=True,
+                    notify_participants=False,
+                    version=version,
+                    days=[server.AgendaDayCreate(id="day-1", date="2026-05-01", day_number=1, sessions=[
+                        server.AgendaSessionCreate(
+                            id=session_id, start_time=f"{9 + i:02d}:00", end_time=f"{10 + i}:00",
+                            title=f"Session {i}", leader_id="leader-1"
+                        )
+                        for i, session_id in enumerate(session_ids)
+                    ] + [server.AgendaSessionCreate(start_time="12:00", end_time="13:00", title="Lunch", session_type="break")])]
+                )
+            
+            saved = await server.create_or_update_workshop_agenda("ws-1", agenda(["s-1", "s-2"]))
+            pending = await server.get_member_pending_evaluations(token)
+            assert [p["session_id"] for p in pending] == ["s-1", "s-2"]
+            
+            # A session removed from the agenda is no longer pending
+            await server.create_or_update_workshop_agenda("ws-1", agenda(["s-1"], saved["version"]))
+            pending = await server.get_member_pending_evaluations(token)
+            assert [p["session_id"] for p in pending] == ["s-1"]
+            assert await server.db.pending_evaluations.count_documents({}) == 1
+            
+            await server.submit_evaluation(server.SessionEvaluationCreate(
+                workshop_id="ws-1", session_id="s-1", leader_id="leader-1",
+                participant_email="member@example.com",
+                answers=[server.EvaluationAnswer(question_id="q-1", rating=8)]
+            ))
+            assert await server.get_member_pending_evaluations(token) == []
+        
+        run_in_test_db(scenario)
+        print("✓ Pending evaluations are seeded on publish, pruned on edit and cleared on submit")
+
+
+def run_in_test_db(scenario):
+    """Run scenario() with server.db pointing at a throwaway database"""
+    async def main():
+        client = server.AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db_name = f"haggai_test_evaluations_{uuid.uuid4().hex[:8]}"
+        original_db = server.db
+        server.db = client[db_name]
+        try:
+            return await scenario()
+        finally:
+            server.db = original_db
+            await client.drop_database(db_name)
+            client.close()
+    return asyncio.run(main())
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,108 @@
+"""
+Test suite for the member forum
+Tests:
+- GET /api/forum/:id - Requires a token
+- migrate_forum_replies - Embedded replies move to forum_replies (in-process, needs MONGO_URL)
+- GET /api/forum/:id - Replies are paged newest first with X-Next-Cursor (in-process)
+"""
+
+import pytest
+import requests
+import os
+import sys
+import uuid
+import asyncio
+from pathlib import Path
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'haggai_test')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+def run_in_test_db(scenario):
+    """Run scenario() with server.db pointing at a throwaway database"""
+    async def main():
+        client = server.AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db_name = f"haggai_test_forum_{uuid.uuid4().hex[:8]}"
+        original_db = server.db
+        server.db = client[db_name]
+        try:
+            return await scenario()
+        finally:
+            server.db = original_db
+            await client.drop_database(db_name)
+            client.close()
+    return asyncio.run(main())
+
+
+def make_reply(number: int) -> dict:
+    return {
+        "id": f"reply-{number:03d}",
+        "content": f"Reply {number}",
+        "author_id": "member-1",
+        "author_name": "TEST_Member",
+        "created_at": f"2026-01-01T10:{number // 60:02d}:{number % 60:02d}+00:00",
+    }
+
+
+class TestForum:
+    """Test forum reply storage and paging"""
+
+    def test_get_post_requires_token(self):
+        """GET /api/forum/:id - 401 without a token"""
+        response = requests.get(f"{BASE_URL}/api/forum/{uuid.uuid4()}")
+        assert response.status_code == 401
+        print("✓ GET /api/forum/:id - Missing token returns 401")
+
+    def test_migrate_embedded_replies(self):
+        """Replies embedded in a post move to forum_replies with count and last reply time"""
+        async def scenario():
+            replies = [make_reply(n) for n in range(3)]
+            await server.db.forum_posts.insert_one({"id": "post-1", "title": "TEST_Post", "replies": replies})
+            await server.db.forum_posts.insert_one({"id": "post-2", "title": "TEST_Empty", "replies": []})
+
+            assert await server.migrate_forum_replies() == 2
+            post = await server.db.forum_posts.find_one({"id": "post-1"}, {"_id": 0})
+            assert "replies" not in post
+            assert post["reply_count"] == 3
+            assert post["last_reply_at"] == replies[-1]["created_at"]
+            stored = await server.db.forum_replies.find({"post_id": "post-1"}, {"_id": 0}).sort("created_at", 1).to_list(None)
+            assert [reply["id"] for reply in stored] == [reply["id"] for reply in replies]
+            empty = await server.db.forum_posts.find_one({"id": "post-2"}, {"_id": 0})
+            assert empty["reply_count"] == 0 and empty["last_reply_at"] is None
+
+            # Running again finds nothing left to move
+            assert await server.migrate_forum_replies() == 0
+
+        run_in_test_db(scenario)
+        print("✓ Embedded replies migrated to forum_replies")
+
+    def test_replies_paged_newest_first(self):
+        """GET /api/forum/:id - The first page holds the newest replies, the cursor leads to older ones"""
+        async def scenario():
+            await server.db.forum_posts.insert_one({"id": "post-1", "title": "TEST_Post", "reply_count": 5})
+            await server.db.forum_replies.insert_many([{**make_reply(n), "post_id": "post-1"} for n in range(5)])
+            token = server.jwt.encode({"member_id": "member-1"}, server.JWT_SECRET, algorithm=server.JWT_ALGORITHM)
+
+            pages = []
+            cursor = None
+            while True:
+                response = server.Response()
+                post = await server.get_forum_post("post-1", response, token=token, limit=2, cursor=cursor)
+                pages.append([reply["id"] for reply in post["replies"]])
+                cursor = response.headers.get(server.NEXT_CURSOR_HEADER)
+                if not cursor:
+                    break
+            return pages
+
+        pages = run_in_test_db(scenario)
+        assert pages == [["reply-004", "reply-003"], ["reply-002", "reply-001"], ["reply-000"]]
+        print("✓ Replies paged newest first")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,69 @@
+"""
+Test suite for leader documents moved out of leader_registrations
+Tests:
+- migrate_leader_documents - Undecodable documents are flagged once, not retried (in-process, needs MONGO_URL)
+"""
+
+import pytest
+import os
+import sys
+import uuid
+import asyncio
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'haggai_test')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+def run_in_test_db(scenario):
+    """Run scenario() with server.db pointing at a throwaway database"""
+    async def main():
+        client = server.AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db_name = f"haggai_test_leader_documents_{uuid.uuid4().hex[:8]}"
+        original_db = server.db
+        server.db = client[db_name]
+        try:
+            return await scenario()
+        finally:
+            server.db = original_db
+            await client.drop_database(db_name)
+            client.close()
+    return asyncio.run(main())
+
+
+class TestLeaderDocumentMigration:
+    """Test moving embedded base64 documents into GridFS"""
+
+    def test_undecodable_document_flagged(self):
+        """A document that isn't valid base64 loses its data and is marked corrupt"""
+        async def scenario():
+            await server.db.leader_registrations.insert_one({
+                "id": "leader-1",
+                "documents": [{
+                    "id": "doc-1",
+                    "filename": "kvitto.pdf",
+                    "type": "receipt",
+                    "data": "not base64!",
+                    "uploaded_at": "2026-01-01T10:00:00+00:00",
+                }],
+            })
+
+            assert await server.migrate_leader_documents() == 0
+            registration = await server.db.leader_registrations.find_one({"id": "leader-1"}, {"_id": 0})
+            document = registration["documents"][0]
+            assert "data" not in document
+            assert document["corrupt"] is True
+            assert document["filename"] == "kvitto.pdf"
+
+            # Nothing embedded is left for the startup check to find
+            assert not await server.db.leader_registrations.find_one({"documents.data": {"$exists": True}})
+
+        run_in_test_db(scenario)
+        print("✓ Undecodable document flagged and not retried")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
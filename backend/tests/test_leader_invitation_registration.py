@@ -13,6 +13,9 @@ BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://membership-hub-30.pr
 # Test data prefix for cleanup
 TEST_PREFIX = "TEST_LEADER_"
 
+# 4x4 PNG
+TEST_PNG_BASE64 = "iVBORw0KGgoAAAANSUhEUgAAAAQAAAAECAIAAAAmkwkpAAAAFElEQVR4nGNk9C1mgAEmBiSAmwMAJkQAyW2TuXEAAAAASUVORK5CYII="
+
 class TestLeaderInvitationEndpoints:
     """Test leader invitation CRUD operations"""
     
@@ -612,6 +615,65 @@ class TestLeaderPortalEndpoints:
         data = response.json()
         assert isinstance(data, list)
         print(f"✓ GET /api/leaders/me/sessions returns list with {len(data)} sessions")
+    
+    def test_upload_and_download_document(self, authenticated_leader):
+        """POST/GET /api/leaders/me/documents - Multipart upload, metadata on profile, ranged download"""
+        headers = {"Authorization": f"Bearer {authenticated_leader['token']}"}
+        content = b"%PDF-1.4 test receipt " + os.urandom(4096)
+        
+        response = requests.post(
+            f"{BASE_URL}/api/leaders/me/documents",
+            params={"document_type": "receipt"},
+            files={"file": ("kvitto.pdf", content, "application/pdf")},
+            headers=headers
+        )
+        assert response.status_code == 200
+        document_id = response.json()["document_id"]
+        
+        profile = requests.get(f"{BASE_URL}/api/leaders/me", headers=headers).json()
+        document = next(d for d in profile["documents"] if d["id"] == document_id)
+        assert document["size"] == len(content)
+        assert document["content_type"] == "application/pdf"
+        assert "data" not in document
+        print("✓ Profile only carries document metadata")
+        
+        response = requests.get(f"{BASE_URL}/api/leaders/me/documents/{document_id}", headers=headers)
+        assert response.status_code == 200
+        assert response.content == content
+        
+        response = requests.get(
+            f"{BASE_URL}/api/leaders/me/documents/{document_id}",
+            headers={**headers, "Range": "bytes=10-19"}
+        )
+        assert response.status_code == 206
+        assert response.content == content[10:20]
+        assert response.headers["Content-Range"] == f"bytes 10-19/{len(content)}"
+        print("✓ Document download supports Range requests")
+        
+        response = requests.delete(f"{BASE_URL}/api/leaders/me/documents/{document_id}", headers=headers)
+        assert response.status_code == 200
+        response = requests.get(f"{BASE_URL}/api/leaders/me/documents/{document_id}", headers=headers)
+        assert response.status_code == 404
+        print("✓ Deleted document is no longer downloadable")
+    
+    def test_profile_image_served_as_thumbnail(self, authenticated_leader):
+        """PUT /api/leaders/me - data: URL image is replaced by a cached thumbnail URL"""
+        headers = {"Authorization": f"Bearer {authenticated_leader['token']}"}
+        response = requests.put(
+            f"{BASE_URL}/api/leaders/me",
+            headers=headers,
+            json={"image_url": f"data:image/png;base64,{TEST_PNG_BASE64}"}
+        )
+        assert response.status_code == 200
+        image_url = response.json()["image_url"]
+        assert image_url.startswith("/api/images/")
+        print(f"✓ Profile image stored as {image_url}")
+        
+        response = requests.get(f"{BASE_URL}{image_url}")
+        assert response.status_code == 200
+        assert response.headers["Content-Type"] == "image/webp"
+        assert "immutable" in response.headers["Cache-Control"]
+        print("✓ Thumbnail served as WebP with immutable cache headers")
 
 
 class TestFullLeaderFlow:
@@ -0,0 +1,150 @@
+"""
+Test suite for member direct messages
+Tests:
+- GET /api/messages - Requires a token
+- record_conversation_message - Unread counts per participant (in-process, needs MONGO_URL)
+- GET /api/messages/:partner_id - Reading a conversation decrements the unread count (in-process)
+- GET /api/messages - Inbox is paged most recent first with X-Next-Cursor (in-process)
+"""
+
+import pytest
+import requests
+import os
+import sys
+import uuid
+import asyncio
+from pathlib import Path
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'haggai_test')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+def run_in_test_db(scenario):
+    """Run scenario() with server.db pointing at a throwaway database"""
+    async def main():
+        client = server.AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db_name = f"haggai_test_messages_{uuid.uuid4().hex[:8]}"
+        original_db = server.db
+        server.db = client[db_name]
+        try:
+            return await scenario()
+        finally:
+            server.db = original_db
+            await client.drop_database(db_name)
+            client.close()
+    return asyncio.run(main())
+
+
+def member_token(member_id: str) -> str:
+    return server.jwt.encode({"member_id": member_id}, server.JWT_SECRET, algorithm=server.JWT_ALGORITHM)
+
+
+async def deliver(sender_id: str, recipient_id: str, content: str, minute: int) -> dict:
+    """Store a message the way POST /api/messages does"""
+    message = {
+        "id": str(uuid.uuid4()),
+        "sender_id": sender_id,
+        "recipient_id": recipient_id,
+        "content": content,
+        "read": False,
+        "created_at": f"2026-01-01T10:{minute:02d}:00+00:00",
+    }
+    await server.db.direct_messages.insert_one(dict(message))
+    await server.record_conversation_message(message)
+    return message
+
+
+async def unread(member_a: str, member_b: str) -> dict:
+    conversation = await server.db.conversations.find_one({"id": server.conversation_id(member_a, member_b)})
+    return conversation["unread"]
+
+
+class TestMessages:
+    """Test conversation summaries and unread counts"""
+
+    def test_inbox_requires_token(self):
+        """GET /api/messages - 401 without a token"""
+        response = requests.get(f"{BASE_URL}/api/messages")
+        assert response.status_code == 401
+        print("✓ GET /api/messages - Missing token returns 401")
+
+    def test_unread_counted_per_recipient(self):
+        """Each message counts as unread for its recipient only"""
+        async def scenario():
+            await deliver("anna", "bo", "Hej Bo", 1)
+            await deliver("anna", "bo", "Är du där?", 2)
+            last = await deliver("bo", "anna", "Hej Anna", 3)
+
+            conversation = await server.db.conversations.find_one({"id": server.conversation_id("anna", "bo")}, {"_id": 0})
+            assert conversation["unread"] == {"anna": 1, "bo": 2}
+            assert conversation["participant_ids"] == ["anna", "bo"]
+            assert conversation["last_message"]["id"] == last["id"]
+            assert conversation["updated_at"] == last["created_at"]
+            assert await server.db.conversations.count_documents({}) == 1
+
+            # A note to yourself is a conversation with a single participant
+            await deliver("anna", "anna", "Kom ihåg", 4)
+            assert await unread("anna", "anna") == {"anna": 1}
+
+        run_in_test_db(scenario)
+        print("✓ Unread counts kept per recipient")
+
+    def test_reading_decrements_unread(self):
+        """GET /api/messages/:partner_id - Only the reader's unread count drops"""
+        async def scenario():
+            await server.db.members.insert_many([
+                {"id": "anna", "full_name": "Anna", "email": "anna@example.com"},
+                {"id": "bo", "full_name": "Bo", "email": "bo@example.com"},
+            ])
+            await deliver("anna", "bo", "Hej Bo", 1)
+            await deliver("anna", "bo", "Är du där?", 2)
+            await deliver("bo", "anna", "Hej Anna", 3)
+
+            conversation = await server.get_conversation("anna", token=member_token("bo"))
+            assert [message["content"] for message in conversation["messages"]] == ["Hej Bo", "Är du där?", "Hej Anna"]
+            assert await unread("anna", "bo") == {"anna": 1, "bo": 0}
+
+            # Messages arriving after the read stay unread
+            await deliver("anna", "bo", "Bra!", 4)
+            assert await unread("anna", "bo") == {"anna": 1, "bo": 1}
+
+            inbox = await server.get_messages(server.Response(), token=member_token("bo"), limit=50)
+            assert inbox[0]["partner"]["id"] == "anna"
+            assert inbox[0]["unread_count"] == 1
+
+            # Reading again with nothing new leaves the count alone
+            await server.get_conversation("anna", token=member_token("bo"))
+            await server.get_conversation("anna", token=member_token("bo"))
+            assert await unread("anna", "bo") == {"anna": 1, "bo": 0}
+
+        run_in_test_db(scenario)
+        print("✓ Reading a conversation decrements the reader's unread count")
+
+    def test_inbox_paged_most_recent_first(self):
+        """GET /api/messages - The cursor walks the inbox from the most recent conversation"""
+        async def scenario():
+            for minute, partner in enumerate(["cecilia", "david", "erik"]):
+                await deliver(partner, "anna", f"Hej från {partner}", minute)
+
+            pages = []
+            cursor = None
+            while True:
+                response = server.Response()
+                inbox = await server.get_messages(response, token=member_token("anna"), limit=2, cursor=cursor)
+                pages.append([conversation["last_message"]["sender_id"] for conversation in inbox])
+                cursor = response.headers.get(server.NEXT_CURSOR_HEADER)
+                if not cursor:
+                    break
+            return pages
+
+        assert run_in_test_db(scenario) == [["erik", "david"], ["cecilia"]]
+        print("✓ Inbox paged most recent first")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -150,7 +150,34 @@ class TestNominationEndpoints:
             assert nomination["status"] == "pending"
         
         print(f"✓ GET /api/nominations?status=pending - Returned {len(data)} pending nominations")
-    
+
+    def test_get_nominations_paginated(self):
+        """GET /api/nominations?limit=2 - follow X-Next-Cursor without duplicates"""
+        seen_ids = []
+        cursor = None
+        for _ in range(5):
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{BASE_URL}/api/nominations", params=params)
+            assert response.status_code == 200
+            data = response.json()
+            assert isinstance(data, list)
+            assert len(data) <= 2
+            seen_ids.extend(n["id"] for n in data)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert len(seen_ids) == len(set(seen_ids)), "Pages should not overlap"
+        print(f"✓ GET /api/nominations?limit=2 - Walked {len(seen_ids)} nominations across pages")
+
+    def test_get_nominations_invalid_cursor(self):
+        """GET /api/nominations?cursor=... - reject malformed cursor"""
+        response = requests.get(f"{BASE_URL}/api/nominations", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        print("✓ GET /api/nominations with invalid cursor returns 400")
+
     def test_approve_nomination(self):
         """POST /api/nominations/{id}/approve - approve nomination and verify status change"""
         # First create a nomination
@@ -0,0 +1,108 @@
+"""
+Test suite for the member realtime event stream
+Tests:
+- GET /api/members/events - Requires a member token
+- GET /api/members/events - Rejects an invalid token
+- RealtimeHub (in-process) - Channel fan-out, unsubscribe and slow consumer eviction
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+from pathlib import Path
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'haggai_test')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+
+class TestMemberEvents:
+    """Test the Server-Sent Events push channel"""
+
+    def test_events_require_token(self):
+        """GET /api/members/events - 401 without a token"""
+        response = requests.get(f"{BASE_URL}/api/members/events", timeout=10)
+        assert response.status_code == 401
+        print("✓ Event stream requires a token")
+
+    def test_events_invalid_token(self):
+        """GET /api/members/events - 401 for an invalid token"""
+        response = requests.get(f"{BASE_URL}/api/members/events", params={"token": "invalid"}, timeout=10)
+        assert response.status_code == 401
+        print("✓ Event stream rejects an invalid token")
+
+
+def run_hub(scenario, **kwargs):
+    """Run scenario(hub) against a started RealtimeHub with the in-memory backend"""
+    async def main():
+        hub = server.RealtimeHub(server.MemoryEventBackend(), **kwargs)
+        await hub.start()
+        try:
+            return await scenario(hub)
+        finally:
+            await hub.stop()
+    return asyncio.run(main())
+
+
+def drain(queue: asyncio.Queue) -> list:
+    events = []
+    while not queue.empty():
+        event = queue.get_nowait()
+        events.append(event["type"] if event else None)
+    return events
+
+
+class TestRealtimeHub:
+    """Drive the hub in-process"""
+
+    def test_fan_out_by_channel(self):
+        """RealtimeHub - events reach every subscriber of their channels, once each"""
+        async def scenario(hub):
+            anna = hub.subscribe([server.member_channel("anna"), server.FORUM_CHANNEL])
+            bo = hub.subscribe([server.member_channel("bo"), server.FORUM_CHANNEL])
+            await hub.publish([server.member_channel("anna")], "message.created", {})
+            await hub.publish([server.FORUM_CHANNEL], "forum.post_created", {})
+            await hub.publish([server.member_channel("anna"), server.FORUM_CHANNEL], "forum.reply_created", {})
+            return drain(anna), drain(bo)
+
+        anna, bo = run_hub(scenario)
+        assert anna == ["message.created", "forum.post_created", "forum.reply_created"]
+        assert bo == ["forum.post_created", "forum.reply_created"]
+        print("✓ Events fanned out by channel without duplicates")
+
+    def test_unsubscribe(self):
+        """RealtimeHub - a closed stream gets no more events and leaves no empty channels"""
+        async def scenario(hub):
+            queue = hub.subscribe([server.member_channel("anna"), server.FORUM_CHANNEL])
+            hub.unsubscribe(queue)
+            await hub.publish([server.FORUM_CHANNEL], "forum.post_created", {})
+            return drain(queue), hub._subscribers, hub._channels
+
+        events, subscribers, channels = run_hub(scenario)
+        assert events == []
+        assert subscribers == {} and channels == {}
+        print("✓ Unsubscribed stream receives nothing")
+
+    def test_slow_consumer_evicted(self):
+        """RealtimeHub - a full queue is emptied, closed with None and unsubscribed"""
+        async def scenario(hub):
+            slow = hub.subscribe([server.FORUM_CHANNEL])
+            fast = hub.subscribe([server.FORUM_CHANNEL])
+            for _ in range(2):
+                await hub.publish([server.FORUM_CHANNEL], "forum.post_created", {})
+            drain(fast)
+            await hub.publish([server.FORUM_CHANNEL], "forum.reply_created", {})
+            await hub.publish([server.FORUM_CHANNEL], "forum.reply_created", {})
+            return drain(slow), drain(fast), hub._subscribers
+
+        slow, fast, subscribers = run_hub(scenario, queue_size=2)
+        assert slow == [None], "Stream of a slow client is closed"
+        assert fast == ["forum.reply_created", "forum.reply_created"]
+        assert len(subscribers[server.FORUM_CHANNEL]) == 1
+        print("✓ Slow consumer evicted with the None sentinel")
@@ -0,0 +1,26 @@
+import { useEffect, useRef } from 'react';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
+
+const EVENT_TYPES = ['ready', 'message.created', 'forum.post_created', 'forum.reply_created'];
+
+// Keeps the logged in member's event stream open while the component is mounted
+// and calls handlers[type](data) for each event. EventSource reconnects on its
+// own; "ready" is sent again after every reconnect, so refetch there.
+export function useMemberEvents(handlers) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    const token = localStorage.getItem('memberToken');
+    if (!token || typeof EventSource === 'undefined') return undefined;
+
+    const source = new EventSource(`${BACKEND_URL}/api/members/events?token=${encodeURIComponent(token)}`);
+    EVENT_TYPES.forEach((type) => {
+      source.addEventListener(type, (event) => {
+        handlersRef.current[type]?.(JSON.parse(event.data));
+      });
+    });
+    return () => source.close();
+  }, []);
+}
@@ -89,6 +89,7 @@ const AdminWorkshopAgenda = () => {
       confirmDelete: 'Är du säker?',
       agendaSaved: 'Agenda sparad!',
       agendaPublished: 'Agenda publicerad! Deltagare har meddelats.',
+      agendaConflict: 'Agendan har ändrats av någon annan. Ladda om sidan och försök igen.',
       reminderSent: 'Påminnelse skickad!',
       workshopInfo: 'Workshop-information',
       noWorkshop: 'Workshop hittades inte'
@@ -133,6 +134,7 @@ const AdminWorkshopAgenda = () => {
       confirmDelete: 'Are you sure?',
       agendaSaved: 'Agenda saved!',
       agendaPublished: 'Agenda published! Participants have been notified.',
+      agendaConflict: 'The agenda was changed by someone else. Reload the page and try again.',
       reminderSent: 'Reminder sent!',
       workshopInfo: 'Workshop information',
       noWorkshop: 'Workshop not found'
@@ -338,30 +340,38 @@ const AdminWorkshopAgenda = () => {
     }));
   };
 
+  // Days and sessions added in this editor carry temporary ids until saved
+  const storedId = (id) => (id && !String(id).startsWith('temp-') ? id : null);
+
+  const buildAgendaPayload = (isPublished, notifyParticipants) => ({
+    workshop_id: workshopId,
+    version: agenda.version ?? null,
+    days: agenda.days.map(day => ({
+      id: storedId(day.id),
+      date: day.date,
+      day_number: day.day_number,
+      title: day.title,
+      sessions: day.sessions.map(session => ({
+        id: storedId(session.id),
+        start_time: session.start_time,
+        end_time: session.end_time,
+        title: session.title,
+        title_en: session.title_en,
+        title_ar: session.title_ar,
+        description: session.description,
+        leader_id: session.leader_id || null,
+        session_type: session.session_type,
+        order: session.order || 0
+      }))
+    })),
+    is_published: isPublished,
+    notify_participants: notifyParticipants
+  });
+
   const saveAgenda = async () => {
     setSaving(true);
     try {
-      const payload = {
-        workshop_id: workshopId,
-        days: agenda.days.map(day => ({
-          date: day.date,
-          day_number: day.day_number,
-          title: day.title,
-          sessions: day.sessions.map(session => ({
-            start_time: session.start_time,
-            end_time: session.end_time,
-            title: session.title,
-            title_en: session.title_en,
-            title_ar: session.title_ar,
-            description: session.description,
-            leader_id: session.leader_id || null,
-            session_type: session.session_type,
-            order: session.order || 0
-          }))
-        })),
-        is_published: agenda.is_published,
-        notify_participants: false
-      };
+      const payload = buildAgendaPayload(agenda.is_published, false);
 
       const response = await fetch(`${BACKEND_URL}/api/workshops/${workshopId}/agenda`, {
         method: 'POST',
@@ -373,6 +383,8 @@ const AdminWorkshopAgenda = () => {
         const savedAgenda = await response.json();
         setAgenda(savedAgenda);
         toast.success(txt.agendaSaved);
+      } else if (response.status === 409) {
+        toast.error(txt.agendaConflict);
       } else {
         throw new Error('Failed to save');
       }
@@ -388,27 +400,7 @@ const AdminWorkshopAgenda = () => {
     setSaving(true);
     try {
       // First save the agenda
-      const payload = {
-        workshop_id: workshopId,
-        days: agenda.days.map(day => ({
-          date: day.date,
-          day_number: day.day_number,
-          title: day.title,
-          sessions: day.sessions.map(session => ({
-            start_time: session.start_time,
-            end_time: session.end_time,
-            title: session.title,
-            title_en: session.title_en,
-            title_ar: session.title_ar,
-            description: session.description,
-            leader_id: session.leader_id || null,
-            session_type: session.session_type,
-            order: session.order || 0
-          }))
-        })),
-        is_published: true,
-        notify_participants: true
-      };
+      const payload = buildAgendaPayload(true, true);
 
       const response = await fetch(`${BACKEND_URL}/api/workshops/${workshopId}/agenda`, {
         method: 'POST',
@@ -420,6 +412,8 @@ const AdminWorkshopAgenda = () => {
         const savedAgenda = await response.json();
         setAgenda(savedAgenda);
         toast.success(txt.agendaPublished);
+      } else if (response.status === 409) {
+        toast.error(txt.agendaConflict);
       } else {
         throw new Error('Failed to publish');
       }
@@ -290,32 +290,51 @@ const LeaderPortal = () => {
     const token = localStorage.getItem('leader_token');
     
     try {
-      const reader = new FileReader();
-      reader.onload = async (event) => {
-        const base64 = event.target.result.split(',')[1];
-        
-        const response = await fetch(`${BACKEND_URL}/api/leaders/me/documents?document_type=${uploadType}&filename=${file.name}&file_data=${encodeURIComponent(base64)}`, {
-          method: 'POST',
-          headers: { 'Authorization': `Bearer ${token}` }
-        });
-        
-        if (response.ok) {
-          toast.success(language === 'sv' ? 'Dokument uppladdat' : 'Document uploaded');
-          fetchLeaderData(token); // Refresh to get updated documents
-          setShowUploadDialog(false);
-        } else {
-          throw new Error('Upload failed');
-        }
-        setUploadingDoc(false);
-      };
-      reader.readAsDataURL(file);
+      const formData = new FormData();
+      formData.append('file', file);
+      
+      const response = await fetch(`${BACKEND_URL}/api/leaders/me/documents?document_type=${uploadType}`, {
+        method: 'POST',
+        headers: { 'Authorization': `Bearer ${token}` },
+        body: formData
+      });
+      
+      if (response.ok) {
+        toast.success(language === 'sv' ? 'Dokument uppladdat' : 'Document uploaded');
+        fetchLeaderData(token); // Refresh to get updated documents
+        setShowUploadDialog(false);
+      } else {
+        throw new Error('Upload failed');
+      }
     } catch (err) {
       console.error('Error uploading document:', err);
       toast.error(language === 'sv' ? 'Kunde inte ladda upp dokument' : 'Could not upload document');
+    } finally {
       setUploadingDoc(false);
     }
   };
 
+  const handleDownloadDocument = async (doc) => {
+    const token = localStorage.getItem('leader_token');
+    
+    try {
+      const response = await fetch(`${BACKEND_URL}/api/leaders/me/documents/${doc.id}`, {
+        headers: { 'Authorization': `Bearer ${token}` }
+      });
+      if (!response.ok) throw new Error('Download failed');
+      
+      const url = URL.createObjectURL(await response.blob());
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = doc.filename;
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (err) {
+      console.error('Error downloading document:', err);
+      toast.error(language === 'sv' ? 'Kunde inte hämta dokument' : 'Could not download document');
+    }
+  };
+
   const handleDeleteDocument = async (docId) => {
     if (!window.confirm(language === 'sv' ? 'Vill du radera detta dokument?' : 'Delete this document?')) return;
     
@@ -694,7 +713,13 @@ const LeaderPortal = () => {
                         <div className="flex items-center gap-3">
                           <FileText className="h-8 w-8 text-haggai" />
                           <div>
-                            <p className="font-medium text-stone-800">{doc.filename}</p>
+                            <button
+                              type="button"
+                              className="font-medium text-stone-800 hover:text-haggai hover:underline text-left"
+                              onClick={() => handleDownloadDocument(doc)}
+                            >
+                              {doc.filename}
+                            </button>
                             <p className="text-xs text-stone-500">
                               {txt.documents.types[doc.type] || doc.type} • {txt.documents.uploadedAt}: {new Date(doc.uploaded_at).toLocaleDateString()}
                             </p>
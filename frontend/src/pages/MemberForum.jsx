@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate, useParams, Link } from 'react-router-dom';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Button } from '../components/ui/button';
@@ -8,6 +8,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogFooter } from '
 import { toast } from 'sonner';
 import { useLanguage } from '../context/LanguageContext';
 import { ArrowLeft, User, MessageCircle, Plus, Send, Loader2, Clock } from 'lucide-react';
+import { useMemberEvents } from '../hooks/use-member-events';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -24,6 +25,9 @@ const MemberForum = () => {
   const [replyContent, setReplyContent] = useState('');
   const [submitting, setSubmitting] = useState(false);
   const [currentMemberId, setCurrentMemberId] = useState(null);
+  const [olderRepliesCursor, setOlderRepliesCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
+  const streamOpenedRef = useRef(false);
 
   const translations = {
     sv: {
@@ -44,7 +48,8 @@ const MemberForum = () => {
       backToForum: 'Tillbaka till forumet',
       postedBy: 'Skrivet av',
       creating: 'Skapar...',
-      sending: 'Skickar...'
+      sending: 'Skickar...',
+      olderReplies: 'Visa tidigare svar'
     },
     en: {
       title: 'Discussion Forum',
@@ -64,7 +69,8 @@ const MemberForum = () => {
       backToForum: 'Back to forum',
       postedBy: 'Posted by',
       creating: 'Creating...',
-      sending: 'Sending...'
+      sending: 'Sending...',
+      olderReplies: 'Show earlier replies'
     },
     ar: {
       title: 'منتدى النقاش',
@@ -84,7 +90,8 @@ const MemberForum = () => {
       backToForum: 'العودة للمنتدى',
       postedBy: 'بواسطة',
       creating: 'جاري الإنشاء...',
-      sending: 'جاري الإرسال...'
+      sending: 'جاري الإرسال...',
+      olderReplies: 'عرض الردود السابقة'
     }
   };
 
@@ -110,11 +117,11 @@ const MemberForum = () => {
       }
 
       if (postId) {
-        // Fetch single post
-        const postRes = await fetch(`${BACKEND_URL}/api/forum/${postId}?token=${token}`);
-        if (postRes.ok) {
-          const postData = await postRes.json();
-          setCurrentPost(postData);
+        // Fetch single post with its newest replies
+        const page = await fetchPostPage(token);
+        if (page) {
+          setCurrentPost(page.post);
+          setOlderRepliesCursor(page.olderCursor);
         }
       } else {
         // Fetch all posts
@@ -132,6 +139,58 @@ const MemberForum = () => {
     }
   };
 
+  // Replies come newest first, one page at a time; pages are shown oldest first
+  const fetchPostPage = async (token, cursor) => {
+    const params = new URLSearchParams({ token });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${BACKEND_URL}/api/forum/${postId}?${params}`);
+    if (!response.ok) return null;
+    const post = await response.json();
+    return {
+      post: { ...post, replies: [...post.replies].reverse() },
+      olderCursor: response.headers.get('X-Next-Cursor')
+    };
+  };
+
+  const loadOlderReplies = async () => {
+    setLoadingOlder(true);
+    try {
+      const page = await fetchPostPage(localStorage.getItem('memberToken'), olderRepliesCursor);
+      if (page) {
+        setCurrentPost(prev => ({ ...prev, replies: [...page.post.replies, ...prev.replies] }));
+        setOlderRepliesCursor(page.olderCursor);
+      }
+    } catch (error) {
+      console.error('Error fetching replies:', error);
+      toast.error('Kunde inte hämta svar');
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
+  useMemberEvents({
+    ready: () => {
+      // Sent on every connect; only a reconnect can have missed posts and replies
+      if (streamOpenedRef.current) fetchData();
+      streamOpenedRef.current = true;
+    },
+    'forum.post_created': ({ post }) => {
+      setPosts(prev => (prev.some(p => p.id === post.id) ? prev : [post, ...prev]));
+    },
+    'forum.reply_created': ({ post_id, reply }) => {
+      setPosts(prev => prev.map(p => (
+        p.id === post_id ? { ...p, reply_count: (p.reply_count || 0) + 1, last_reply_at: reply.created_at } : p
+      )));
+      if (post_id === postId) {
+        setCurrentPost(prev => (
+          !prev || prev.replies.some(r => r.id === reply.id)
+            ? prev
+            : { ...prev, reply_count: (prev.reply_count || 0) + 1, replies: [...prev.replies, reply] }
+        ));
+      }
+    }
+  });
+
   const handleCreatePost = async () => {
     if (!newPostTitle.trim() || !newPostContent.trim()) return;
 
@@ -247,10 +306,18 @@ const MemberForum = () => {
 
           {/* Replies */}
           <h3 className="text-lg font-bold text-stone-800 mb-4">
-            {currentPost.replies?.length || 0} {txt.replies}
+            {currentPost.reply_count || 0} {txt.replies}
           </h3>
 
           <div className="space-y-4 mb-6">
+            {olderRepliesCursor && (
+              <div className="text-center">
+                <Button variant="outline" onClick={loadOlderReplies} disabled={loadingOlder}>
+                  {loadingOlder && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+                  {txt.olderReplies}
+                </Button>
+              </div>
+            )}
             {currentPost.replies?.map((reply) => (
               <Card key={reply.id} className="border-0 shadow">
                 <CardContent className="p-4">
@@ -367,7 +434,7 @@ const MemberForum = () => {
                           <span>•</span>
                           <span className="flex items-center gap-1">
                             <MessageCircle className="h-4 w-4" />
-                            {post.replies?.length || 0} {txt.replies}
+                            {post.reply_count || 0} {txt.replies}
                           </span>
                         </div>
                       </div>
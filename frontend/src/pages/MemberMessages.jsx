@@ -7,6 +7,7 @@ import { Badge } from '../components/ui/badge';
 import { toast } from 'sonner';
 import { useLanguage } from '../context/LanguageContext';
 import { ArrowLeft, User, Send, MessageSquare, Loader2 } from 'lucide-react';
+import { useMemberEvents } from '../hooks/use-member-events';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -21,7 +22,10 @@ const MemberMessages = () => {
   const [loading, setLoading] = useState(true);
   const [sending, setSending] = useState(false);
   const [currentMemberId, setCurrentMemberId] = useState(null);
+  const [conversationsCursor, setConversationsCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const messagesEndRef = useRef(null);
+  const streamOpenedRef = useRef(false);
 
   const translations = {
     sv: {
@@ -35,7 +39,8 @@ const MemberMessages = () => {
       send: 'Skicka',
       unread: 'olästa',
       startConversation: 'Starta en konversation',
-      selectConversation: 'Välj en konversation från listan'
+      selectConversation: 'Välj en konversation från listan',
+      loadMore: 'Visa fler konversationer'
     },
     en: {
       title: 'Messages',
@@ -48,7 +53,8 @@ const MemberMessages = () => {
       send: 'Send',
       unread: 'unread',
       startConversation: 'Start a conversation',
-      selectConversation: 'Select a conversation from the list'
+      selectConversation: 'Select a conversation from the list',
+      loadMore: 'Show more conversations'
     },
     ar: {
       title: 'الرسائل',
@@ -61,7 +67,8 @@ const MemberMessages = () => {
       send: 'إرسال',
       unread: 'غير مقروء',
       startConversation: 'ابدأ محادثة',
-      selectConversation: 'اختر محادثة من القائمة'
+      selectConversation: 'اختر محادثة من القائمة',
+      loadMore: 'عرض المزيد من المحادثات'
     }
   };
 
@@ -94,21 +101,11 @@ const MemberMessages = () => {
         setCurrentMemberId(meData.id);
       }
 
-      // Get all conversations
-      const convRes = await fetch(`${BACKEND_URL}/api/messages?token=${token}`);
-      if (convRes.ok) {
-        const convData = await convRes.json();
-        setConversations(convData);
-      }
+      await fetchConversations(token);
 
       // If partnerId is provided, fetch that conversation
       if (partnerId) {
-        const msgRes = await fetch(`${BACKEND_URL}/api/messages/${partnerId}?token=${token}`);
-        if (msgRes.ok) {
-          const msgData = await msgRes.json();
-          setMessages(msgData.messages);
-          setCurrentConversation(msgData.partner);
-        }
+        await fetchConversation(token);
       }
     } catch (error) {
       console.error('Error fetching messages:', error);
@@ -118,6 +115,69 @@ const MemberMessages = () => {
     }
   };
 
+  // Get the most recent conversations
+  const fetchConversations = async (token) => {
+    const convRes = await fetch(`${BACKEND_URL}/api/messages?token=${token}`);
+    if (convRes.ok) {
+      const convData = await convRes.json();
+      setConversations(convData);
+      setConversationsCursor(convRes.headers.get('X-Next-Cursor'));
+    }
+  };
+
+  // Reading the conversation also marks it as read
+  const fetchConversation = async (token) => {
+    const msgRes = await fetch(`${BACKEND_URL}/api/messages/${partnerId}?token=${token}`);
+    if (msgRes.ok) {
+      const msgData = await msgRes.json();
+      setMessages(msgData.messages);
+      setCurrentConversation(msgData.partner);
+    }
+  };
+
+  const refreshFromEvent = async (withPartner) => {
+    const token = localStorage.getItem('memberToken');
+    try {
+      await fetchConversations(token);
+      if (partnerId && withPartner) {
+        await fetchConversation(token);
+      }
+    } catch (error) {
+      console.error('Error refreshing messages:', error);
+    }
+  };
+
+  useMemberEvents({
+    ready: () => {
+      // Sent on every connect; only a reconnect can have missed messages
+      if (streamOpenedRef.current) refreshFromEvent(true);
+      streamOpenedRef.current = true;
+    },
+    'message.created': ({ message }) => {
+      refreshFromEvent(message.sender_id === partnerId || message.recipient_id === partnerId);
+    }
+  });
+
+  const loadMoreConversations = async () => {
+    setLoadingMore(true);
+    const token = localStorage.getItem('memberToken');
+
+    try {
+      const params = new URLSearchParams({ token, cursor: conversationsCursor });
+      const convRes = await fetch(`${BACKEND_URL}/api/messages?${params}`);
+      if (convRes.ok) {
+        const convData = await convRes.json();
+        setConversations(prev => [...prev, ...convData]);
+        setConversationsCursor(convRes.headers.get('X-Next-Cursor'));
+      }
+    } catch (error) {
+      console.error('Error fetching conversations:', error);
+      toast.error('Kunde inte hämta meddelanden');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSendMessage = async (e) => {
     e.preventDefault();
     if (!newMessage.trim() || !partnerId) return;
@@ -138,11 +198,7 @@ const MemberMessages = () => {
       if (response.ok) {
         setNewMessage('');
         // Refresh messages
-        const msgRes = await fetch(`${BACKEND_URL}/api/messages/${partnerId}?token=${token}`);
-        if (msgRes.ok) {
-          const msgData = await msgRes.json();
-          setMessages(msgData.messages);
-        }
+        await fetchConversation(token);
       } else {
         const error = await response.json();
         toast.error(error.detail || 'Kunde inte skicka meddelande');
@@ -233,6 +289,14 @@ const MemberMessages = () => {
                       </div>
                     </Link>
                   ))}
+                  {conversationsCursor && (
+                    <div className="p-4 text-center">
+                      <Button variant="outline" size="sm" onClick={loadMoreConversations} disabled={loadingMore}>
+                        {loadingMore && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+                        {txt.loadMore}
+                      </Button>
+                    </div>
+                  )}
                 </div>
               )}
             </CardContent>